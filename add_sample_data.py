@@ -1,84 +1,205 @@
 #!/usr/bin/env python3
 """
-Script to add sample data to the kanban database for testing.
+Load data into the kanban database: a few demo tasks, generated data at any
+scale, or users/tasks/assignments imported from CSV or NDJSON files.
+
+    python add_sample_data.py
+    python add_sample_data.py generate --users 1000 --tasks 1000000 --fast
+    python add_sample_data.py import --users users.csv --tasks tasks.ndjson
+
+Rows are streamed and written with executemany() in committed batches, so
+memory stays flat however large the input is.
 """
 
+import argparse
+import random
+import sys
 import time
-from src.database import SessionLocal, init_db
-from src.models import Task
+
+from sqlalchemy.exc import IntegrityError
+
+from src.bulk import (
+    DEFAULT_BATCH_SIZE, InvalidRecord, assignment_row, generate_tasks, generate_users, load,
+    read_records, task_row, user_row, validated
+)
+from src.database import SessionLocal, engine, init_db
+from src.models import Task, User
+from src.passwords import hash_password
+
+# Password of generated users, and of imported users without a password_hash
+DEFAULT_PASSWORD = 'password'
+
+SAMPLE_TASKS = [
+    {
+        'title': "Пример задачи 1",
+        'description': "Это примерная задача для демонстрации интерфейса lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et dolore magna aliqua",
+        'priority': "high",
+        'deadline': "2025-07-15",
+        'current_column': "todo",
+    },
+    {
+        'title': "Изучить Vue 3",
+        'description': "Освоить основы Vue 3 и Composition API",
+        'priority': "medium",
+        'current_column': "todo",
+    },
+    {
+        'title': "Разработка компонентов",
+        'description': "Создание переиспользуемых компонентов для канбан-доски",
+        'priority': "high",
+        'deadline': "2025-07-12",
+        'current_column': "progress",
+    },
+    {
+        'title': "Код-ревью",
+        'description': "Проверка кода новых функций",
+        'priority': "medium",
+        'current_column': "review",
+    },
+    {
+        'title': "Настройка проекта",
+        'description': "Первоначальная настройка Vue проекта с TypeScript",
+        'priority': "low",
+        'current_column': "done",
+        'date_completed': int(time.time()),
+    },
+]
+
 
 def add_sample_tasks():
-    """Add sample tasks to the database."""
-    # Initialize database first
-    init_db()
-    
+    """Add a handful of demo tasks to an empty database."""
     db = SessionLocal()
     try:
         # Check if we already have tasks
         existing_tasks = db.query(Task).count()
-        if existing_tasks > 0:
-            print(f"Database already has {existing_tasks} tasks. Skipping sample data creation.")
-            return
-
-        # Create sample tasks
-        sample_tasks = [
-            Task(
-                title="Пример задачи 1",
-                description="Это примерная задача для демонстрации интерфейса lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et dolore magna aliqua",
-                priority="high",
-                deadline="2025-07-15",
-                current_column="todo",
-                date_created=int(time.time())
-            ),
-            Task(
-                title="Изучить Vue 3",
-                description="Освоить основы Vue 3 и Composition API",
-                priority="medium",
-                current_column="todo",
-                date_created=int(time.time())
-            ),
-            Task(
-                title="Разработка компонентов",
-                description="Создание переиспользуемых компонентов для канбан-доски",
-                priority="high",
-                deadline="2025-07-12",
-                current_column="progress",
-                date_created=int(time.time())
-            ),
-            Task(
-                title="Код-ревью",
-                description="Проверка кода новых функций",
-                priority="medium",
-                current_column="review",
-                date_created=int(time.time())
-            ),
-            Task(
-                title="Настройка проекта",
-                description="Первоначальная настройка Vue проекта с TypeScript",
-                priority="low",
-                current_column="done",
-                date_created=int(time.time()),
-                date_completed=int(time.time())
-            ),
-        ]
-
-        # Add tasks to database
-        for task in sample_tasks:
-            db.add(task)
-        
-        db.commit()
-        print(f"Successfully added {len(sample_tasks)} sample tasks to the database.")
-        
-        # Print added tasks
-        for task in sample_tasks:
-            print(f"- {task.title} ({task.current_column})")
-
-    except Exception as e:
-        db.rollback()
-        print(f"Error adding sample tasks: {e}")
-        raise
     finally:
         db.close()
+    if existing_tasks > 0:
+        print(f"Database already has {existing_tasks} tasks. Skipping sample data creation.")
+        return
+
+    now = int(time.time())
+    load(engine, tasks=(task_row(task, now) for task in SAMPLE_TASKS), defer=False)
+    print(f"Successfully added {len(SAMPLE_TASKS)} sample tasks to the database.")
+    for task in SAMPLE_TASKS:
+        print(f"- {task['title']} ({task['current_column']})")
+
+
+class Progress:
+    """Prints loaded row counts and rates as batches commit."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+
+    def __call__(self, table, total):
+        elapsed = time.perf_counter() - self.start
+        print(f"\r{table}: {total} rows, {elapsed:.1f} s ({total / max(elapsed, 1e-9):,.0f} rows/s)   ",
+              end='', flush=True)
+
+    def done(self, counts):
+        elapsed = time.perf_counter() - self.start
+        print(f"\rLoaded {counts['users']} users, {counts['tasks']} tasks and {counts['assignments']} "
+              f"assignments in {elapsed:.1f} s" + ' ' * 20)
+
+
+def generate(args):
+    """Generate users and tasks with random assignees."""
+    rng = random.Random(args.seed)
+    password_hash = hash_password(DEFAULT_PASSWORD)
+    users = list(generate_users(args.users, password_hash, rng, args.username_prefix))
+    user_ids = [user['id'] for user in users]
+    if not user_ids and args.assignees_per_task:
+        db = SessionLocal()
+        try:
+            # Assign generated tasks to the existing users
+            user_ids = [user_id for (user_id,) in db.query(User.id)]
+        finally:
+            db.close()
+    tasks = generate_tasks(args.tasks, user_ids, args.assignees_per_task, rng)
+    return users, tasks, ()
+
+
+def import_files(args):
+    """Stream validated rows from the given files."""
+    now = int(time.time())
+    skipped = {} if args.skip_invalid else None
+    password_hash = hash_password(DEFAULT_PASSWORD) if args.users else None
+    users = tasks = assignments = ()
+    if args.users:
+        users = validated(read_records(args.users, args.format), lambda record: user_row(record, password_hash, now),
+                          args.users, skipped)
+    if args.tasks:
+        tasks = validated(read_records(args.tasks, args.format), lambda record: task_row(record, now),
+                          args.tasks, skipped)
+    if args.assignments:
+        assignments = validated(read_records(args.assignments, args.format), assignment_row,
+                                args.assignments, skipped)
+    return users, tasks, assignments, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load demo, generated or imported data into the kanban database')
+    subparsers = parser.add_subparsers(dest='command')
+
+    load_options = argparse.ArgumentParser(add_help=False)
+    load_options.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                              help=f'Rows per transaction (default: {DEFAULT_BATCH_SIZE})')
+    load_options.add_argument('--fast', action='store_true',
+                              help='Relax SQLite durability pragmas on the loading connection')
+    load_options.add_argument('--no-defer', action='store_true',
+                              help='Keep indexes and insert triggers live instead of rebuilding them after the load '
+                                   '(faster for small loads into large databases). Required while the API is '
+                                   'serving: without it, tasks created or assigned through the API during the load '
+                                   'skip their version bump and their cached fragments can go stale')
+
+    generate_parser = subparsers.add_parser('generate', parents=[load_options], help='Generate random data')
+    generate_parser.add_argument('--users', type=int, default=100, help='Users to create (default: 100)')
+    generate_parser.add_argument('--tasks', type=int, default=10000, help='Tasks to create (default: 10000)')
+    generate_parser.add_argument('--assignees-per-task', type=int, default=1, help='Assignees per task (default: 1)')
+    generate_parser.add_argument('--username-prefix',
+                                 help='Usernames <prefix>0, <prefix>1, ... (default: user-<id>)')
+    generate_parser.add_argument('--seed', type=int, help='Random seed for repeatable data')
+
+    import_parser = subparsers.add_parser('import', parents=[load_options], help='Import CSV or NDJSON files')
+    import_parser.add_argument('--users', help='Users: username, display_name, password_hash, is_admin, ...')
+    import_parser.add_argument('--tasks', help='Tasks in the GET /api/tasks/export format, assignees included')
+    import_parser.add_argument('--assignments', help='Extra assignments: task_id, user_id')
+    import_parser.add_argument('--format', choices=('csv', 'ndjson', 'jsonl'),
+                               help='Input format (default: from the file extension)')
+    import_parser.add_argument('--skip-invalid', action='store_true',
+                               help='Skip and count invalid records instead of stopping at the first one')
+
+    args = parser.parse_args()
+
+    # Initialize database first
+    init_db()
+
+    if args.command is None:
+        add_sample_tasks()
+        return 0
+
+    skipped = None
+    if args.command == 'generate':
+        users, tasks, assignments = generate(args)
+    else:
+        if not (args.users or args.tasks or args.assignments):
+            import_parser.error('Give at least one of --users, --tasks or --assignments')
+        users, tasks, assignments, skipped = import_files(args)
+
+    progress = Progress()
+    try:
+        counts = load(engine, users, tasks, assignments, batch_size=args.batch_size,
+                      defer=not args.no_defer, fast=args.fast, on_batch=progress)
+    except (InvalidRecord, OSError, IntegrityError) as e:
+        # An IntegrityError's own message carries the whole batch of parameters
+        print(f"\nError: {e.orig if isinstance(e, IntegrityError) else e}", file=sys.stderr)
+        print("Batches before the error were committed.", file=sys.stderr)
+        return 1
+    progress.done(counts)
+    for source, count in (skipped or {}).items():
+        print(f"Skipped {count} invalid records in {source}")
+    return 0
+
 
 if __name__ == "__main__":
-    add_sample_tasks()
+    sys.exit(main())
@@ -1,4 +1,8 @@
 -- SQLite database schema for Kanban Flask application
+-- Tables and indexes only. The full-text search index and the triggers that
+-- keep it, the board stats and task versions current are installed by
+-- `python main.py migrate` (src/migrations.py), which also indexes and counts
+-- the sample data below
 -- Create users table
 CREATE TABLE users (
     id INTEGER PRIMARY KEY,
@@ -21,7 +25,8 @@ CREATE TABLE tasks (
     date_created INTEGER NOT NULL,
     date_completed INTEGER,
     current_column VARCHAR(20) NOT NULL DEFAULT 'todo' CHECK(current_column IN ('todo', 'progress', 'review', 'done')),  -- Updated column names and default
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    version INTEGER NOT NULL DEFAULT 0  -- Bumped when the task or its assignees change (serialized task cache)
 );
 
 -- Create bridge table for user-task assignments (many-to-many relationship)
@@ -35,11 +40,44 @@ CREATE TABLE user_task_assignments (
     UNIQUE(user_id, task_id) -- Prevent duplicate assignments
 );
 
+-- Create change log for delta sync (GET /api/tasks/changes)
+-- AUTOINCREMENT so sequence numbers are never reused after compaction
+CREATE TABLE task_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id INTEGER NOT NULL,
+    kind VARCHAR(10) NOT NULL CHECK(kind IN ('upsert', 'delete')),
+    date_created INTEGER NOT NULL
+);
+
+-- Create table of revoked session tokens (logout and refresh rotation)
+CREATE TABLE revoked_tokens (
+    jti VARCHAR(32) PRIMARY KEY,
+    expires_at INTEGER NOT NULL
+);
+
+-- Create table of snowflake instance IDs leased by worker processes
+CREATE TABLE id_leases (
+    instance_id INTEGER PRIMARY KEY CHECK(instance_id BETWEEN 0 AND 1023),
+    owner VARCHAR(255) NOT NULL,
+    expires_at INTEGER NOT NULL
+);
+
+-- Create board stats aggregates (GET /api/stats)
+-- Kept current by triggers generated from src/stats.py
+CREATE TABLE task_stats (
+    metric VARCHAR(20) NOT NULL,  -- 'column', 'priority', 'wip', 'cycle_time' or 'throughput'
+    key VARCHAR(40) NOT NULL,  -- Column, priority, user ID, histogram bucket or week start
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, key)
+);
+
 -- Create indexes for better performance
 CREATE INDEX idx_tasks_column ON tasks(current_column);
+CREATE INDEX idx_tasks_column_created ON tasks(current_column, date_created);
 CREATE INDEX idx_tasks_priority ON tasks(priority);  -- Added index for priority
 CREATE INDEX idx_tasks_deadline ON tasks(deadline);  -- Changed from date_deadline to deadline
 CREATE INDEX idx_tasks_completed ON tasks(date_completed);
+CREATE INDEX idx_tasks_created ON tasks(date_created);
 CREATE INDEX idx_assignments_user ON user_task_assignments(user_id);
 CREATE INDEX idx_assignments_task ON user_task_assignments(task_id);
 
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API against a freshly seeded database.
+
+Seeds users, tasks and assignments at the requested scale into a temporary
+directory, then drives every endpoint, or a weighted mix of them, either
+in-process through Flask's test client or over HTTP against `main.py serve`
+(or uvicorn). Reports throughput, p50/p95/p99 latency and SQL statements
+per request, optionally stores the results as JSON and exits non-zero when
+they regress against a stored baseline.
+
+    python benchmark.py --tasks 5000 --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.25
+    python benchmark.py --driver http --workers 4 --concurrency 16 --profile board-heavy
+
+GET /api/events is not benchmarked; it is a stream, not a request.
+"""
+
+import argparse
+import datetime
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+# Neither reads settings, so both can be imported before configure_environment()
+from src.environment import configure_environment
+from src.types.task import SAMPLE_WORDS, VALID_COLUMNS, VALID_PRIORITIES
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+BENCH_PASSWORD = 'bench-password'
+BENCH_SECRET_KEY = 'benchmark-secret-key'
+
+# Result format version, bumped when fields change meaning
+RESULTS_VERSION = 1
+
+# Weighted endpoint mixes for --profile; weights are relative
+PROFILES = {
+    'board-heavy': {'board': 95, 'tasks.move': 5},
+    'list-heavy': {'tasks.list': 60, 'tasks.list_filtered': 20, 'tasks.get': 15, 'tasks.update': 5},
+    'sync': {'tasks.changes': 70, 'tasks.move': 20, 'tasks.create': 10},
+    'mixed': {
+        'board': 30, 'tasks.list': 20, 'tasks.get': 15, 'tasks.search': 5, 'stats': 5, 'users.list': 5,
+        'tasks.move': 8, 'tasks.update': 5, 'tasks.create': 3, 'tasks.assign': 2, 'tasks.delete': 2,
+    },
+}
+
+
+class BoardState:
+    """IDs the request generator picks from, updated as requests are planned."""
+
+    def __init__(self, users, tasks, assignments):
+        self.users = users  # [(user_id, username)]
+        self.tasks = tasks
+        self.assignees = {}  # task_id -> set of user IDs
+        for task_id, user_id in assignments:
+            self.assignees.setdefault(task_id, set()).add(user_id)
+        self.spare_tasks = []  # Seeded for tasks.delete
+        self.token_pairs = []  # Issued for auth.refresh and auth.logout
+        self.access_token = None
+        self.created = 0
+
+
+def seed_database(users, tasks, assignees_per_task, rng):
+    """Bulk load generated users, tasks and assignments; returns a BoardState."""
+    from src.bulk import generate_tasks, generate_users, load
+    from src.database import engine, init_db
+    from src.passwords import hash_password
+
+    init_db()
+    # One hash for everyone; hashing every user would dominate seeding
+    user_rows = list(generate_users(users, hash_password(BENCH_PASSWORD), rng, username_prefix='bench-user-'))
+    task_rows = list(generate_tasks(tasks, [row['id'] for row in user_rows], assignees_per_task, rng))
+    # Before load(), which takes the assignees off the rows
+    assignments = [(row['id'], user_id) for row in task_rows for user_id in row['assignees']]
+    load(engine, users=user_rows, tasks=task_rows)
+    return BoardState(
+        [(row['id'], row['username']) for row in user_rows],
+        [row['id'] for row in task_rows],
+        assignments,
+    )
+
+
+def prepare_state(state, spare_tasks, token_pairs, rng):
+    """Seed the tasks and tokens that requests consume (deletes, refreshes, logouts)."""
+    from src import config
+    from src.bulk import generate_tasks, load
+    from src.database import engine
+    from src.models import User
+    from src.tokens import issue_token_pair
+
+    if spare_tasks:
+        rows = list(generate_tasks(spare_tasks, [], 0, rng))
+        load(engine, tasks=rows, defer=False)
+        state.spare_tasks += [row['id'] for row in rows]
+
+    user_id, username = state.users[0]
+    user = User(id=user_id, username=username, is_admin=False)
+    state.access_token = state.access_token or issue_token_pair(user, config.SECRET_KEY)['access_token']
+    state.token_pairs += [issue_token_pair(user, config.SECRET_KEY) for _ in range(token_pairs)]
+
+
+def _new_assignment(state, rng):
+    for _ in range(100):
+        task_id, (user_id, _) = rng.choice(state.tasks), rng.choice(state.users)
+        if user_id not in state.assignees.get(task_id, ()):
+            state.assignees.setdefault(task_id, set()).add(user_id)
+            return task_id, user_id
+    raise RuntimeError('No free task/user pair left to assign')
+
+
+def _existing_assignment(state, rng):
+    for _ in range(100):
+        task_id = rng.choice(state.tasks)
+        if state.assignees.get(task_id):
+            user_id = rng.choice(sorted(state.assignees[task_id]))
+            state.assignees[task_id].discard(user_id)
+            return task_id, user_id
+    raise RuntimeError('No assignment left to remove; seed with --assignees-per-task > 0')
+
+
+def _replace_assignees(state, rng):
+    task_id = rng.choice(state.tasks)
+    user_ids = {user_id for user_id, _ in rng.sample(state.users, min(2, len(state.users)))}
+    state.assignees[task_id] = user_ids
+    return f'/api/tasks/{task_id}/assignees', {'assignees': [str(user_id) for user_id in user_ids]}
+
+
+def _create_user(state, rng):
+    state.created += 1
+    return {'username': f'bench-new-{state.created}-{rng.getrandbits(32):08x}',
+            'password': BENCH_PASSWORD, 'display_name': 'Bench'}
+
+
+def _create_task(state, rng):
+    state.created += 1
+    return {'title': f'Bench task {state.created} {rng.choice(SAMPLE_WORDS)}', 'description': rng.choice(SAMPLE_WORDS),
+            'priority': rng.choice(VALID_PRIORITIES), 'assignees': [str(rng.choice(state.users)[0])]}
+
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+# name -> function(state, rng) returning (method, path, json body, headers)
+SCENARIOS = {
+    'health': lambda s, r: ('GET', '/api/health', None, {}),
+    'metrics': lambda s, r: ('GET', '/api/metrics', None, {}),
+    'users.list': lambda s, r: ('GET', '/api/users?limit=50', None, {}),
+    'users.get': lambda s, r: ('GET', f'/api/users/{r.choice(s.users)[0]}', None, {}),
+    'users.create': lambda s, r: ('POST', '/api/users', _create_user(s, r), {}),
+    'users.update': lambda s, r: ('PUT', f'/api/users/{r.choice(s.users)[0]}', {'display_name': f'Bench {r.random():.6f}'}, {}),
+    'tasks.list': lambda s, r: ('GET', '/api/tasks?limit=50', None, {}),
+    'tasks.list_filtered': lambda s, r: (
+        'GET', f'/api/tasks?column={r.choice(VALID_COLUMNS)}&priority={r.choice(VALID_PRIORITIES)}&sort=-date_created&limit=50',
+        None, {}),
+    'tasks.get': lambda s, r: ('GET', f'/api/tasks/{r.choice(s.tasks)}', None, {}),
+    'tasks.create': lambda s, r: ('POST', '/api/tasks', _create_task(s, r), {}),
+    'tasks.update': lambda s, r: ('PUT', f'/api/tasks/{r.choice(s.tasks)}', {'title': f'Renamed {r.choice(SAMPLE_WORDS)}'}, {}),
+    'tasks.move': lambda s, r: ('PUT', f'/api/tasks/{r.choice(s.tasks)}', {'current_column': r.choice(VALID_COLUMNS)}, {}),
+    'tasks.delete': lambda s, r: ('DELETE', f'/api/tasks/{s.spare_tasks.pop()}', None, {}),
+    'tasks.batch': lambda s, r: ('POST', '/api/tasks/batch', {'operations': [
+        {'op': 'move', 'id': str(task_id), 'current_column': r.choice(VALID_COLUMNS)} for task_id in r.sample(s.tasks, min(20, len(s.tasks)))
+    ]}, {}),
+    'tasks.changes': lambda s, r: ('GET', '/api/tasks/changes?since=latest', None, {}),
+    'tasks.search': lambda s, r: ('GET', f'/api/tasks/search?q={quote(r.choice(SAMPLE_WORDS))}', None, {}),
+    'tasks.assign': lambda s, r: (lambda pair: ('POST', f'/api/tasks/{pair[0]}/assign', {'user_id': str(pair[1])}, {}))(_new_assignment(s, r)),
+    'tasks.unassign': lambda s, r: (lambda pair: ('POST', f'/api/tasks/{pair[0]}/unassign', {'user_id': str(pair[1])}, {}))(_existing_assignment(s, r)),
+    'tasks.assignees': lambda s, r: ('PUT', *_replace_assignees(s, r), {}),
+    'assignments.list': lambda s, r: ('GET', '/api/assignments', None, {}),
+    'board': lambda s, r: ('GET', '/api/board', None, {}),
+    'stats': lambda s, r: ('GET', '/api/stats', None, {}),
+    'auth.login': lambda s, r: ('POST', '/api/auth/login', {'username': r.choice(s.users)[1], 'password': BENCH_PASSWORD}, {}),
+    'auth.refresh': lambda s, r: ('POST', '/api/auth/refresh', {'refresh_token': s.token_pairs.pop()['refresh_token']}, {}),
+    'auth.me': lambda s, r: ('GET', '/api/auth/me', None, _bearer(s.access_token)),
+    'auth.logout': lambda s, r: ('POST', '/api/auth/logout', None, _bearer(s.token_pairs.pop()['access_token'])),
+}
+
+# Argon2 bound; they get --expensive-requests instead of --requests
+EXPENSIVE_SCENARIOS = ('users.create', 'auth.login')
+# Scenarios consuming seeded spare tasks or token pairs
+SPARE_TASK_SCENARIOS = ('tasks.delete',)
+TOKEN_PAIR_SCENARIOS = ('auth.refresh', 'auth.logout')
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def _queries(server_timing):
+    match = _QUERIES.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+class InProcessDriver:
+    """Calls the Flask app through its test client, one request at a time."""
+
+    name = 'inprocess'
+
+    def __init__(self):
+        from src.routes import create_app
+
+        app = create_app()
+        app.config['TESTING'] = False
+        self.client = app.test_client()
+
+    def run(self, plan):
+        """Execute (scenario, request) pairs; returns ([(scenario, status, seconds, queries)], wall seconds)."""
+        results = []
+        wall_start = time.perf_counter()
+        for scenario, (method, path, body, headers) in plan:
+            start = time.perf_counter()
+            response = self.client.open(path, method=method, json=body, headers=headers)
+            response.get_data()
+            elapsed = time.perf_counter() - start
+            results.append((scenario, response.status_code, elapsed, _queries(response.headers.get('Server-Timing'))))
+        return results, time.perf_counter() - wall_start
+
+    def close(self):
+        pass
+
+
+class HttpDriver:
+    """Starts a server process on the benchmark database and calls it over HTTP from client threads."""
+
+    name = 'http'
+
+    def __init__(self, server, workers, concurrency, workdir):
+        self.server = server
+        self.workers = workers
+        self.concurrency = concurrency
+        self.port = _free_port()
+        if server == 'uvicorn':
+            command = [sys.executable, '-m', 'uvicorn', 'src.asgi:app', '--host', '127.0.0.1',
+                       '--port', str(self.port), '--workers', str(workers), '--log-level', 'warning', '--no-access-log']
+        else:
+            command = [sys.executable, os.path.join(ROOT, 'main.py'), 'serve', '--host', '127.0.0.1',
+                       '--port', str(self.port), '--workers', str(workers)]
+        # Server output goes to the work directory; keep it with --keep
+        self.log = open(os.path.join(workdir, 'server.log'), 'wb')
+        self.process = subprocess.Popen(command, cwd=ROOT, env=os.environ.copy(),
+                                        stdout=self.log, stderr=subprocess.STDOUT)
+        self._local = threading.local()
+        self._wait_until_ready()
+
+    def _wait_until_ready(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'{self.server} exited with status {self.process.returncode}')
+            try:
+                if self._request('GET', '/api/health', None, {})[0] == 200:
+                    return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError(f'{self.server} did not start within {timeout} seconds')
+
+    def _request(self, method, path, body, headers):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        payload = None
+        headers = dict(headers)
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        try:
+            connection.request(method, path, payload, headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            raise
+        if response.will_close:
+            # HTTP/1.0 servers close after every response; reconnect next time
+            connection.close()
+        return response.status, response.getheader('Server-Timing')
+
+    def _timed(self, item):
+        scenario, (method, path, body, headers) = item
+        start = time.perf_counter()
+        try:
+            status, server_timing = self._request(method, path, body, headers)
+        except (OSError, http.client.HTTPException):
+            status, server_timing = 0, None
+        return scenario, status, time.perf_counter() - start, _queries(server_timing)
+
+    def run(self, plan):
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(self._timed, plan))
+        return results, time.perf_counter() - wall_start
+
+    def close(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))]
+
+
+def summarize(results, wall_seconds):
+    """Throughput, latency percentiles (ms) and SQL statements per request for one group of results."""
+    latencies = sorted(elapsed for _, _, elapsed, _ in results)
+    queries = [count for _, _, _, count in results if count is not None]
+    return {
+        'requests': len(results),
+        'errors': sum(1 for _, status, _, _ in results if not 200 <= status < 400),
+        'statuses': dict(sorted(Counter(str(status) for _, status, _, _ in results).items())),
+        'throughput_rps': round(len(results) / wall_seconds, 2) if wall_seconds > 0 else None,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def run_endpoints(driver, state, scenarios, requests, expensive_requests, warmup, rng):
+    """Benchmark each scenario on its own; returns {scenario: summary}."""
+    summaries = {}
+    for scenario in scenarios:
+        count = expensive_requests if scenario in EXPENSIVE_SCENARIOS else requests
+        warm = min(warmup, count)
+        prepare_state(state, count + warm if scenario in SPARE_TASK_SCENARIOS else 0,
+                      count + warm if scenario in TOKEN_PAIR_SCENARIOS else 0, rng)
+        plan = [(scenario, SCENARIOS[scenario](state, rng)) for _ in range(count + warm)]
+        driver.run(plan[:warm])
+        results, wall_seconds = driver.run(plan[warm:])
+        summaries[scenario] = summarize(results, wall_seconds)
+        print(_format_row(scenario, summaries[scenario]), flush=True)
+    return summaries
+
+
+def run_profile(driver, state, profile, requests, warmup, rng):
+    """Benchmark a weighted mix of scenarios; returns per-scenario summaries plus 'total'."""
+    weights = PROFILES[profile]
+    names = list(weights)
+    picks = rng.choices(names, weights=[weights[name] for name in names], k=requests + warmup)
+    prepare_state(state, picks.count('tasks.delete'),
+                  sum(picks.count(name) for name in TOKEN_PAIR_SCENARIOS), rng)
+    plan = [(scenario, SCENARIOS[scenario](state, rng)) for scenario in picks]
+    driver.run(plan[:warmup])
+    results, wall_seconds = driver.run(plan[warmup:])
+
+    summaries = {}
+    for scenario in names:
+        scenario_results = [result for result in results if result[0] == scenario]
+        if scenario_results:
+            # Throughput of a scenario is its share of the mixed run
+            summaries[scenario] = summarize(scenario_results, wall_seconds)
+            print(_format_row(scenario, summaries[scenario]), flush=True)
+    summaries['total'] = summarize(results, wall_seconds)
+    print(_format_row('total', summaries['total']), flush=True)
+    return summaries
+
+
+def _format_row(name, summary):
+    def number(value, digits=2):
+        return '-' if value is None else f'{value:.{digits}f}'
+    return (f'{name:<22} {summary["requests"]:>7} {summary["errors"]:>6} {number(summary["throughput_rps"], 1):>10} '
+            f'{number(summary["p50_ms"]):>9} {number(summary["p95_ms"]):>9} {number(summary["p99_ms"]):>9} '
+            f'{number(summary["queries_per_request"]):>8}')
+
+
+HEADER = (f'{"scenario":<22} {"reqs":>7} {"errors":>6} {"req/s":>10} '
+          f'{"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"queries":>8}')
+
+
+def compare_to_baseline(results, baseline, tolerance, min_delta_ms):
+    """Return the regressions of results against a baseline results document.
+
+    p95 latency may grow and throughput may drop by `tolerance` (a fraction)
+    before counting as a regression; latency changes under min_delta_ms are
+    noise. SQL statements per request are deterministic, so any increase counts.
+    """
+    regressions = []
+    for scenario, base in baseline['results'].items():
+        current = results['results'].get(scenario)
+        if current is None:
+            continue
+        if base.get('p95_ms') is not None and current['p95_ms'] is not None:
+            if (current['p95_ms'] > base['p95_ms'] * (1 + tolerance)
+                    and current['p95_ms'] - base['p95_ms'] >= min_delta_ms):
+                regressions.append(f'{scenario}: p95 {base["p95_ms"]:.2f} ms -> {current["p95_ms"]:.2f} ms')
+        if base.get('throughput_rps') and current['throughput_rps'] is not None:
+            if current['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+                regressions.append(
+                    f'{scenario}: throughput {base["throughput_rps"]:.1f} -> {current["throughput_rps"]:.1f} req/s')
+        if base.get('queries_per_request') is not None and current['queries_per_request'] is not None:
+            if current['queries_per_request'] > base['queries_per_request'] + 0.5:
+                regressions.append(f'{scenario}: queries per request '
+                                   f'{base["queries_per_request"]} -> {current["queries_per_request"]}')
+        if current['errors'] > base.get('errors', 0):
+            regressions.append(f'{scenario}: errors {base.get("errors", 0)} -> {current["errors"]}')
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the kanban API on a freshly seeded database')
+    scale = parser.add_argument_group('scale')
+    scale.add_argument('--users', type=int, default=200, help='Seeded users (default: 200)')
+    scale.add_argument('--tasks', type=int, default=5000, help='Seeded tasks (default: 5000)')
+    scale.add_argument('--assignees-per-task', type=int, default=2, help='Assignees per seeded task (default: 2)')
+    scale.add_argument('--seed', type=int, default=1, help='Random seed for data and requests (default: 1)')
+
+    run = parser.add_argument_group('run')
+    run.add_argument('--driver', choices=('inprocess', 'http'), default='inprocess',
+                     help='Call create_app() in-process or a server over HTTP (default: inprocess)')
+    run.add_argument('--server', choices=('serve', 'uvicorn'), default='serve',
+                     help='Server started by the http driver (default: serve)')
+    run.add_argument('--workers', type=int, default=2, help='Server worker processes (http driver, default: 2)')
+    run.add_argument('--concurrency', type=int, default=8, help='Client threads (http driver, default: 8)')
+    run.add_argument('--profile', choices=sorted(PROFILES), help='Run a weighted endpoint mix instead of each endpoint')
+    run.add_argument('--scenarios', help=f'Comma separated scenarios (default: all). Known: {", ".join(SCENARIOS)}')
+    run.add_argument('--requests', type=int, default=200,
+                     help='Requests per scenario, or in total with --profile (default: 200)')
+    run.add_argument('--expensive-requests', type=int, default=10,
+                     help=f'Requests for Argon2-bound scenarios ({", ".join(EXPENSIVE_SCENARIOS)}) (default: 10)')
+    run.add_argument('--warmup', type=int, default=20, help='Untimed requests first (default: 20)')
+
+    output = parser.add_argument_group('results')
+    output.add_argument('--output', help='Write the results as JSON to this file')
+    output.add_argument('--baseline', help='Fail if results regress against this results file')
+    output.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed p95/throughput change as a fraction (default: 0.2)')
+    output.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore p95 changes smaller than this (default: 1.0)')
+    output.add_argument('--keep', action='store_true', help='Keep the temporary database directory')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = list(SCENARIOS)
+    if args.scenarios:
+        scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+        unknown = [name for name in scenarios if name not in SCENARIOS]
+        if unknown:
+            print(f"Unknown scenarios: {', '.join(unknown)}", file=sys.stderr)
+            return 2
+    if args.users < 1 or args.tasks < 1:
+        print('Need at least one user and one task', file=sys.stderr)
+        return 2
+
+    workdir = tempfile.mkdtemp(prefix='kanban-bench-')
+    configure_environment(workdir, BENCH_SECRET_KEY)
+    rng = random.Random(args.seed)
+
+    print(f'Seeding {args.users} users, {args.tasks} tasks and {args.assignees_per_task} assignees per task '
+          f'in {workdir}...', flush=True)
+    start = time.perf_counter()
+    state = seed_database(args.users, args.tasks, args.assignees_per_task, rng)
+    print(f'Seeded in {time.perf_counter() - start:.1f} s', flush=True)
+
+    driver = None
+    try:
+        driver = HttpDriver(args.server, args.workers, args.concurrency, workdir) if args.driver == 'http' else InProcessDriver()
+        print(HEADER)
+        if args.profile:
+            summaries = run_profile(driver, state, args.profile, args.requests, args.warmup, rng)
+        else:
+            summaries = run_endpoints(driver, state, scenarios, args.requests, args.expensive_requests, args.warmup, rng)
+    finally:
+        if driver is not None:
+            driver.close()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'driver': driver.name,
+            'server': args.server if args.driver == 'http' else None,
+            'workers': args.workers if args.driver == 'http' else None,
+            'concurrency': args.concurrency if args.driver == 'http' else 1,
+            'profile': args.profile,
+            'scale': {'users': args.users, 'tasks': args.tasks, 'assignees_per_task': args.assignees_per_task},
+            'seed': args.seed,
+        },
+        'results': summaries,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f'Results written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for key in ('driver', 'server', 'workers', 'concurrency', 'profile', 'scale'):
+            if baseline['meta'].get(key) != results['meta'][key]:
+                print(f"Warning: baseline {key} {baseline['meta'].get(key)!r} differs from {results['meta'][key]!r}",
+                      file=sys.stderr)
+        regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f'Regressions against {args.baseline}:', file=sys.stderr)
+            for regression in regressions:
+                print(f'  {regression}', file=sys.stderr)
+            return 1
+        print(f'No regressions against {args.baseline}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,129 @@
-from src.database import init_db
+import argparse
+import sys
+
+from src.database import init_db, engine, SessionLocal
+from src import config, migrations
+from src.metrics import reset_metrics
 from src.routes import create_app
 
-def main():
-    """Initialize the db and configure app."""
+def run_dev_server():
+    """Initialize the db and run the development server."""
     # Initialize database
     init_db()
+    reset_metrics()
     
     # Create and configure the app
-    app = create_app()
-    app.config['DEBUG'] = True
+    app = create_app(debug=True)
     app.config['TESTING'] = False
     
     # Run the application
     app.run(host='0.0.0.0', port=5000, debug=True)
 
+def serve(args):
+    """Initialize the db and run the preforking production server."""
+    from src.server import Arbiter
+    
+    init_db()
+    # Counters start from zero with every server start, not per worker
+    reset_metrics()
+    
+    # Workers are forked from here, so the app and its imports are loaded once
+    app = create_app()
+    app.config['TESTING'] = False
+    
+    Arbiter(
+        app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout
+    ).run()
+
+def migrate():
+    """Create missing tables and apply pending schema migrations."""
+    init_db()
+    for version, description, applied in migrations.status(engine):
+        print(f"{version:>4}  {'applied' if applied else 'pending'}  {description}")
+
+def explain():
+    """Print the query plan of every hot API query; fails on unexpected full scans."""
+    from src.query_plans import print_query_plan_report
+    
+    if engine.dialect.name != 'sqlite':
+        print("Query plan report is only available for SQLite")
+        return 0
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        problems = print_query_plan_report(db)
+    finally:
+        db.close()
+    if problems:
+        print(f"{problems} hot queries do a full scan")
+        return 1
+    return 0
+
+def reindex():
+    """Rebuild the full-text search index from the tasks table."""
+    from src.search import SearchUnavailable, rebuild_search_index
+    
+    init_db()
+    try:
+        count = rebuild_search_index(engine)
+    except SearchUnavailable as e:
+        print(e)
+        return 1
+    print(f"Indexed {count} tasks")
+    return 0
+
+def recompute_stats():
+    """Rebuild the board stats from the tasks and assignments tables."""
+    from src.stats import StatsUnavailable, recompute_stats as recompute
+    
+    init_db()
+    try:
+        count = recompute(engine)
+    except StatsUnavailable as e:
+        print(e)
+        return 1
+    print(f"Recomputed stats for {count} tasks")
+    return 0
+
+def main():
+    """Parse the command line and run the requested command."""
+    parser = argparse.ArgumentParser(description="Kanban Flask API")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('run', help="run the development server (default)")
+    serve_parser = commands.add_parser('serve', help="run the multi-process production server")
+    serve_parser.add_argument('--host', default=config.HOST)
+    serve_parser.add_argument('--port', type=int, default=config.PORT)
+    serve_parser.add_argument('--workers', type=int, default=config.WORKERS)
+    serve_parser.add_argument('--max-requests', type=int, default=config.MAX_REQUESTS,
+                              help="recycle a worker after this many requests (0 = never)")
+    serve_parser.add_argument('--max-requests-jitter', type=int, default=config.MAX_REQUESTS_JITTER)
+    serve_parser.add_argument('--graceful-timeout', type=int, default=config.GRACEFUL_TIMEOUT,
+                              help="seconds workers get to finish in-flight requests")
+    commands.add_parser('migrate', help="upgrade the database schema in place")
+    commands.add_parser('explain', help="print EXPLAIN QUERY PLAN for the hot API queries")
+    commands.add_parser('reindex', help="rebuild the full-text search index")
+    commands.add_parser('recompute-stats', help="rebuild the board stats from scratch")
+    args = parser.parse_args()
+    
+    if args.command == 'serve':
+        serve(args)
+    elif args.command == 'migrate':
+        migrate()
+    elif args.command == 'explain':
+        sys.exit(explain())
+    elif args.command == 'reindex':
+        sys.exit(reindex())
+    elif args.command == 'recompute-stats':
+        sys.exit(recompute_stats())
+    else:
+        run_dev_server()
+
 if __name__ == "__main__":
     main()
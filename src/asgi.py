@@ -0,0 +1,214 @@
+import asyncio
+import contextvars
+import os
+import re
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_etags, quote_etag
+
+from src import config, reads
+from src.compression import CODECS, compress_body, compressed_bodies, negotiate
+from src.metrics import compressed_responses, fold_exited_processes
+from src.counters import change_counters
+from src.database import create_async_db_engine, init_db
+from src.instrumentation import finish_request, instrument_engine, start_request
+from src.routes import create_app
+
+# ASGI entry point: `uvicorn src.asgi:app`. The read-heavy GET endpoints are
+# served here on an asyncio engine, so an idle or slow client costs a
+# coroutine instead of a thread. Every other request goes to the Flask app,
+# which asgiref runs on its thread pool.
+
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+instrument_engine(async_engine.sync_engine)
+
+# A forked worker must open its own connections, like the sync engine
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lambda: async_engine.sync_engine.dispose(close=False))
+
+flask_app = create_app()
+flask_app.config['TESTING'] = False
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def _task_list(db, args, params):
+    return await db.run_sync(reads.list_tasks, args)
+
+
+async def _task(db, args, params):
+    return await db.run_sync(reads.get_task, int(params['task_id']))
+
+
+async def _user_list(db, args, params):
+    return await db.run_sync(reads.list_users, args)
+
+
+async def _user(db, args, params):
+    return await db.run_sync(reads.get_user, int(params['user_id']))
+
+
+async def _assignments(db, args, params):
+    return await db.run_sync(reads.list_assignments)
+
+
+# (path, Flask rule used as the metrics route label, handler, ETag tables,
+# not found message); anything else is left to Flask. Non-numeric IDs fall
+# through too, so /api/tasks/changes etc. keep working.
+ROUTES = [
+    (re.compile(r'/api/tasks'), '/api/tasks', _task_list, ('tasks', 'assignments'), None),
+    (re.compile(r'/api/tasks/(?P<task_id>\d+)'), '/api/tasks/<task_id>', _task, None, 'Task not found'),
+    (re.compile(r'/api/users'), '/api/users', _user_list, ('users', 'assignments'), None),
+    (re.compile(r'/api/users/(?P<user_id>\d+)'), '/api/users/<int:user_id>', _user, None, 'User not found'),
+    (re.compile(r'/api/assignments'), '/api/assignments', _assignments, ('assignments',), None),
+]
+
+
+def match_route(scope):
+    """Return (rule, handler, params, etag_tables, not_found) for async GET routes, else None."""
+    if scope['type'] != 'http' or scope['method'] != 'GET':
+        return None
+    for pattern, rule, handler, tables, not_found in ROUTES:
+        match = pattern.fullmatch(scope['path'])
+        if match:
+            return rule, handler, match.groupdict(), tables, not_found
+    return None
+
+
+def _header(headers, name):
+    """First value of a request header, decoded as latin-1 like WSGI does."""
+    for key, value in headers:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+async def send_json(send, status, body, headers=(), timings=None, etag=None, encoding=None):
+    """Send a complete JSON response with the same encoding as flask.jsonify.
+
+    body may also be already encoded JSON bytes. With an encoding from
+    negotiate(), the body is compressed like compress_response() does for the
+    Flask app, and etag is sent in its weak form. With request timings, the
+    request metrics are recorded and the Server-Timing header added, like
+    the Flask after_request hook does.
+    """
+    json_provider = flask_app.json
+    if (json_provider.compact is None and flask_app.debug) or json_provider.compact is False:
+        dump_args = {'indent': 2}
+    else:
+        dump_args = {'separators': (',', ':')}
+    if body is None:
+        payload = b''
+    elif isinstance(body, bytes):
+        payload = body
+    else:
+        payload = f'{json_provider.dumps(body, **dump_args)}\n'.encode('utf-8')
+    headers = list(headers)
+    etag_header = quote_etag(etag) if etag is not None else None
+    if body is not None and CODECS:
+        headers.append(('Vary', 'Accept-Encoding'))
+        if encoding is not None and len(payload) >= config.COMPRESSION_MIN_SIZE:
+            compressed = compressed_bodies.get(etag, encoding) if etag is not None else None
+            if compressed is None:
+                # Big bodies take milliseconds to compress, too long for the event loop
+                compressed = await asyncio.to_thread(compress_body, payload, encoding, etag)
+            payload = compressed
+            headers.append(('Content-Encoding', encoding))
+            compressed_responses.inc(encoding=encoding)
+            if etag is not None:
+                etag_header = quote_etag(etag, weak=True)
+    if etag_header is not None:
+        headers.append(('ETag', etag_header))
+    response_headers = [(b'content-length', str(len(payload)).encode('latin-1'))]
+    if body is not None:
+        response_headers.append((b'content-type', b'application/json'))
+    if timings is not None:
+        headers.append(('Server-Timing', finish_request(timings, status, len(payload))))
+    response_headers += [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+async def handle_read(scope, send, route):
+    """Serve one async read endpoint."""
+    rule, handler, params, tables, not_found = route
+    headers = scope['headers']
+    timings = start_request('GET', rule)
+
+    # Same CORS headers flask-cors adds for origins='*'
+    origin = _header(headers, b'origin')
+    response_headers = [('Access-Control-Allow-Origin', origin), ('Vary', 'Origin')] if origin else \
+        [('Access-Control-Allow-Origin', '*')]
+
+    query_string = scope['query_string'].decode('latin-1')
+    # Like etag_cached: 304 before touching the database, ETag only on 200
+    etag = None
+    if tables:
+        etag = change_counters.etag(tables, f"{scope['path']}?{query_string}".encode())
+        if parse_etags(_header(headers, b'if-none-match')).contains_weak(etag):
+            await send_json(send, 304, None, response_headers, timings=timings, etag=etag)
+            return
+    encoding = negotiate(_header(headers, b'accept-encoding'))
+
+    args = MultiDict(parse_qsl(query_string, keep_blank_values=True))
+    try:
+        async with AsyncSessionLocal() as db:
+            body = await handler(db, args, params)
+    except ValueError as e:
+        await send_json(send, 400, {'error': str(e)}, response_headers, timings=timings, encoding=encoding)
+        return
+    except Exception:
+        flask_app.logger.exception('Error serving %s', scope['path'])
+        await send_json(send, 500, {'error': 'Internal server error'}, response_headers, timings=timings,
+                        encoding=encoding)
+        return
+
+    if body is None:
+        await send_json(send, 404, {'error': not_found}, response_headers, timings=timings, encoding=encoding)
+        return
+    await send_json(send, 200, body, response_headers, timings=timings, etag=etag, encoding=encoding)
+
+
+async def lifespan(receive, send):
+    """Create the schema and fold old metric files on startup, close the async pool on shutdown."""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await asyncio.to_thread(init_db)
+                # Files of exited workers and previous runs; every worker may
+                # run this, the metrics directory lock keeps it safe
+                await asyncio.to_thread(fold_exited_processes)
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def dispatch(scope, receive, send):
+    """Serve one request natively or through the Flask app."""
+    route = match_route(scope)
+    if route is None:
+        await wsgi_app(scope, receive, send)
+        return
+    await handle_read(scope, send, route)
+
+
+async def app(scope, receive, send):
+    """ASGI application."""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    # Every request runs in a fresh context. uvicorn starts the next request
+    # of a keep-alive connection from inside the previous response's send(),
+    # which asgiref calls with its per-request executor in the context; an
+    # inherited, finished executor breaks the next Flask call.
+    await asyncio.create_task(dispatch(scope, receive, send), context=contextvars.Context())
@@ -0,0 +1,57 @@
+from sqlalchemy import and_, delete, exists, insert
+
+from src.models import Task, User, UserTaskAssignment
+
+
+def parse_user_ids(raw_ids):
+    """Parse user IDs sent as ints or strings, dropping duplicates and malformed ones."""
+    user_ids = []
+    for raw_id in raw_ids:
+        try:
+            user_ids.append(int(raw_id))
+        except (TypeError, ValueError):
+            continue
+    return list(dict.fromkeys(user_ids))
+
+
+def resolve_user_ids(db, user_ids):
+    """Keep the user IDs that exist, in request order, using a single IN query."""
+    if not user_ids:
+        return []
+    known = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids))}
+    return [user_id for user_id in user_ids if user_id in known]
+
+
+def check_assignment(db, task_id, user_id):
+    """Return (task_exists, user_exists, already_assigned) in one round trip."""
+    return db.query(
+        exists().where(Task.id == task_id),
+        exists().where(User.id == user_id),
+        exists().where(and_(UserTaskAssignment.task_id == task_id, UserTaskAssignment.user_id == user_id))
+    ).one()
+
+
+def replace_task_assignees(db, task_id, user_ids):
+    """Make user_ids the exact assignee set of a task.
+
+    Only the difference is written: one executemany insert for new assignees
+    and one IN delete for removed ones. Returns (added, removed, assignee_ids)
+    where assignee_ids is the resulting set in assignment order.
+    """
+    current = [
+        user_id for (user_id,) in
+        db.query(UserTaskAssignment.user_id).filter(UserTaskAssignment.task_id == task_id).order_by(UserTaskAssignment.id)
+    ]
+    wanted = set(user_ids)
+    assigned = set(current)
+    added = [user_id for user_id in user_ids if user_id not in assigned]
+    removed = [user_id for user_id in current if user_id not in wanted]
+
+    if added:
+        db.execute(insert(UserTaskAssignment), [{'user_id': user_id, 'task_id': task_id} for user_id in added])
+    if removed:
+        db.execute(
+            delete(UserTaskAssignment)
+            .where(UserTaskAssignment.task_id == task_id, UserTaskAssignment.user_id.in_(removed))
+        )
+    return added, removed, [user_id for user_id in current if user_id in wanted] + added
@@ -0,0 +1,167 @@
+import time
+
+from sqlalchemy import delete, insert, update
+
+from src.changelog import CHANGE_DELETE, record_task_changes
+from src.models import Task, User, UserTaskAssignment
+from src.types.task import VALID_PRIORITIES, VALID_COLUMNS, PRIORITY_MEDIUM, COLUMN_TODO, COLUMN_DONE
+
+# Max operations accepted by POST /api/tasks/batch
+MAX_BATCH_SIZE = 500
+
+OP_CREATE = 'create'
+OP_UPDATE = 'update'
+OP_MOVE = 'move'
+OP_DELETE = 'delete'
+VALID_OPS = [OP_CREATE, OP_UPDATE, OP_MOVE, OP_DELETE]
+
+# Task fields a batch update may set
+UPDATABLE_FIELDS = ('title', 'description', 'priority', 'deadline', 'date_completed', 'current_column')
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def validate_operation(operation):
+    """Return an error message for a malformed operation, or None if it is valid."""
+    if not isinstance(operation, dict):
+        return 'Operation must be an object'
+
+    op = operation.get('op')
+    if op not in VALID_OPS:
+        return f'Invalid op. Must be one of: {VALID_OPS}'
+
+    if op == OP_CREATE:
+        if 'title' not in operation:
+            return 'Missing required field: title'
+        assignees = operation.get('assignees') or []
+        if not isinstance(assignees, list) or any(_parse_id(user_id) is None for user_id in assignees):
+            return 'Invalid assignees'
+    elif _parse_id(operation.get('id')) is None:
+        return 'Invalid task ID'
+
+    if op == OP_MOVE and 'current_column' not in operation:
+        return 'Missing required field: current_column'
+
+    if 'priority' in operation and operation['priority'] not in VALID_PRIORITIES:
+        return f'Invalid priority. Must be one of: {VALID_PRIORITIES}'
+    if 'current_column' in operation and operation['current_column'] not in VALID_COLUMNS:
+        return f'Invalid column. Must be one of: {VALID_COLUMNS}'
+    return None
+
+
+def apply_task_batch(db, operations, new_id):
+    """Apply a list of task operations with set-based statements in one transaction.
+
+    new_id is called to mint snowflake IDs for created tasks. Returns
+    (results, created_ids, updated_ids, moved, deleted_ids) where results has one
+    entry per operation; moved maps task ID -> previous column. Invalid
+    operations get an error result and are skipped, the rest are committed
+    together.
+    """
+    results = [None] * len(operations)
+    seen_ids = set()
+    creates, changes, deletes = [], [], []
+
+    for index, operation in enumerate(operations):
+        error = validate_operation(operation)
+        if error is None and operation['op'] != OP_CREATE:
+            task_id = _parse_id(operation['id'])
+            if task_id in seen_ids:
+                error = 'Duplicate task ID in batch'
+            seen_ids.add(task_id)
+        if error is not None:
+            results[index] = {'status': 400, 'error': error}
+        elif operation['op'] == OP_CREATE:
+            creates.append((index, operation))
+        elif operation['op'] == OP_DELETE:
+            deletes.append((index, _parse_id(operation['id'])))
+        else:
+            changes.append((index, _parse_id(operation['id']), operation))
+
+    # One lookup for every task the batch modifies or deletes
+    existing = {}
+    if seen_ids:
+        rows = db.query(Task.id, Task.current_column, Task.date_completed).filter(Task.id.in_(seen_ids))
+        existing = {row.id: row for row in rows}
+
+    now = int(time.time())
+
+    # Creates: one executemany for tasks, one IN query for assignees and one for assignments
+    task_rows = []
+    assignee_rows = []
+    wanted_users = {_parse_id(user_id) for _, operation in creates for user_id in operation.get('assignees') or []}
+    known_users = set()
+    if wanted_users:
+        known_users = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(wanted_users))}
+    created_ids = []
+    for index, operation in creates:
+        task_id = new_id()
+        task_rows.append({
+            'id': task_id,
+            'title': operation['title'],
+            'description': operation.get('description', ''),
+            'priority': operation.get('priority', PRIORITY_MEDIUM),
+            'deadline': operation.get('deadline'),
+            'date_created': now,
+            'date_completed': operation.get('date_completed'),
+            'current_column': operation.get('current_column', COLUMN_TODO)
+        })
+        # Unknown users are skipped, like in create_task
+        for user_id in dict.fromkeys(_parse_id(user_id) for user_id in operation.get('assignees') or []):
+            if user_id in known_users:
+                assignee_rows.append({'user_id': user_id, 'task_id': task_id})
+        created_ids.append(task_id)
+        results[index] = {'status': 201, 'id': task_id}
+
+    # Updates and moves: ORM bulk UPDATE by primary key, executemany per key set
+    update_rows = []
+    updated_ids = []
+    moved = {}
+    for index, task_id, operation in changes:
+        current = existing.get(task_id)
+        if current is None:
+            results[index] = {'status': 404, 'error': 'Task not found'}
+            continue
+        row = {'id': task_id}
+        for field in UPDATABLE_FIELDS:
+            if field in operation:
+                row[field] = operation[field]
+        # If moving to done, set completion time
+        date_completed = row.get('date_completed', current.date_completed)
+        if row.get('current_column') == COLUMN_DONE and not date_completed:
+            row['date_completed'] = now
+        if 'current_column' in row and row['current_column'] != current.current_column:
+            moved[task_id] = current.current_column
+        update_rows.append(row)
+        updated_ids.append(task_id)
+        results[index] = {'status': 200, 'id': task_id}
+
+    deleted_ids = []
+    for index, task_id in deletes:
+        if task_id not in existing:
+            results[index] = {'status': 404, 'error': 'Task not found'}
+            continue
+        deleted_ids.append(task_id)
+        results[index] = {'status': 200, 'id': task_id}
+
+    if task_rows:
+        db.execute(insert(Task), task_rows)
+    if assignee_rows:
+        db.execute(insert(UserTaskAssignment), assignee_rows)
+    if update_rows:
+        db.execute(update(Task), update_rows)
+    if deleted_ids:
+        # Bulk deletes bypass the ORM cascade, so assignments go explicitly
+        db.execute(delete(UserTaskAssignment).where(UserTaskAssignment.task_id.in_(deleted_ids)))
+        db.execute(delete(Task).where(Task.id.in_(deleted_ids)))
+
+    record_task_changes(db, created_ids + updated_ids)
+    record_task_changes(db, deleted_ids, CHANGE_DELETE)
+    db.commit()
+
+    return results, created_ids, updated_ids, moved, deleted_ids
@@ -0,0 +1,344 @@
+import csv
+import datetime
+import itertools
+import json
+import os
+import time
+
+from sqlalchemy import insert, select, text, update
+
+from src.changelog import record_task_changes
+from src.counters import change_counters
+from src.ids import next_id
+from src.models import Task, User, UserTaskAssignment
+from src.search import index_all_tasks
+from src.stats import recompute_stats
+from src.types.task import COLUMN_DONE, COLUMN_TODO, PRIORITY_MEDIUM, SAMPLE_WORDS, VALID_COLUMNS, VALID_PRIORITIES
+
+# Rows per executemany() and per committed transaction
+DEFAULT_BATCH_SIZE = 10000
+
+# Pragmas for the loading connection only; a large cache makes index and
+# search index rebuilds several times faster on big tables
+LOAD_PRAGMAS = {
+    'cache_size': str(-512 * 1024),  # KiB
+    'temp_store': 'MEMORY',
+}
+# Added by load(fast=True); a crash mid-load may lose the last batches but
+# cannot corrupt the database in WAL mode
+FAST_PRAGMAS = {
+    'synchronous': 'OFF',
+}
+
+# Tables whose secondary indexes and insert triggers are dropped during a deferred load
+DEFERRED_TABLES = ('tasks', 'user_task_assignments')
+
+_CSV_LIST_SEPARATORS = (';', ',', ' ')
+
+
+class InvalidRecord(ValueError):
+    """An input record that cannot be loaded."""
+
+
+def generate_users(count, password_hash, rng, username_prefix=None, now=None):
+    """Yield count user rows; usernames are unique per ID unless a prefix is given."""
+    now = int(now if now is not None else time.time())
+    for index in range(count):
+        user_id = next_id()
+        username = f'{username_prefix}{index}' if username_prefix is not None else f'user-{user_id}'
+        yield {
+            'id': user_id, 'username': username, 'password': password_hash,
+            'display_name': f'User {index}', 'profile_picture': None, 'is_admin': False,
+            'date_created': now - rng.randrange(365 * 24 * 3600),
+        }
+
+
+def generate_tasks(count, user_ids, assignees_per_task, rng, now=None):
+    """Yield count task rows spread over the last 180 days, with 'assignees' picked from user_ids."""
+    now = int(now if now is not None else time.time())
+    today = datetime.date.today()
+    assignees_per_task = min(assignees_per_task, len(user_ids))
+    for _ in range(count):
+        column = rng.choice(VALID_COLUMNS)
+        date_created = now - rng.randrange(180 * 24 * 3600)
+        deadline = None
+        if rng.random() < 0.5:
+            deadline = (today + datetime.timedelta(days=rng.randrange(-30, 90))).isoformat()
+        yield {
+            'id': next_id(),
+            'title': ' '.join(rng.choices(SAMPLE_WORDS, k=rng.randint(2, 5))).capitalize(),
+            'description': ' '.join(rng.choices(SAMPLE_WORDS, k=rng.randint(5, 40))),
+            'priority': rng.choice(VALID_PRIORITIES),
+            'deadline': deadline,
+            'date_created': date_created,
+            'date_completed': rng.randint(date_created, now) if column == COLUMN_DONE else None,
+            'current_column': column,
+            'assignees': rng.sample(user_ids, assignees_per_task) if assignees_per_task else [],
+        }
+
+
+def read_records(path, file_format=None):
+    """Yield (line number, dict) from a CSV or NDJSON file, one record at a time.
+
+    The format defaults to the file extension (.csv, .ndjson or .jsonl).
+    """
+    file_format = file_format or os.path.splitext(path)[1].lstrip('.').lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        elif file_format in ('ndjson', 'jsonl'):
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise InvalidRecord(f'{path} line {line_number}: {e}')
+        else:
+            raise ValueError(f'Unknown format of {path}. Use .csv, .ndjson or .jsonl')
+
+
+def _blank(value):
+    return value is None or value == ''
+
+
+def _int(record, name, default=None):
+    value = record.get(name)
+    if _blank(value):
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidRecord(f'Invalid {name}: {value!r}')
+
+
+def _id_list(value):
+    """Assignee IDs from an NDJSON list or a CSV cell separated by ';', ',' or spaces."""
+    if _blank(value):
+        return []
+    if isinstance(value, str):
+        for separator in _CSV_LIST_SEPARATORS:
+            if separator in value:
+                value = value.split(separator)
+                break
+        else:
+            value = [value]
+    try:
+        return list(dict.fromkeys(int(user_id) for user_id in value if not _blank(user_id)))
+    except (TypeError, ValueError):
+        raise InvalidRecord(f'Invalid assignees: {value!r}')
+
+
+def user_row(record, password_hash, now):
+    """Validate an input record into a users row (missing password_hash: the default hash)."""
+    username = record.get('username')
+    if _blank(username):
+        raise InvalidRecord('Missing username')
+    is_admin = record.get('is_admin', False)
+    if isinstance(is_admin, str):
+        is_admin = is_admin.strip().lower() in ('1', 'true', 'yes')
+    return {
+        'id': _int(record, 'id') or next_id(),
+        'username': username,
+        'password': record.get('password_hash') or password_hash,
+        'display_name': record.get('display_name') or username,
+        'profile_picture': record.get('profile_picture') or None,
+        'is_admin': bool(is_admin),
+        'date_created': _int(record, 'date_created', now),
+    }
+
+
+def task_row(record, now):
+    """Validate an input record (the format of GET /api/tasks/export) into a tasks row with 'assignees'."""
+    title = record.get('title')
+    if _blank(title):
+        raise InvalidRecord('Missing title')
+    priority = record.get('priority') or PRIORITY_MEDIUM
+    if priority not in VALID_PRIORITIES:
+        raise InvalidRecord(f'Invalid priority. Must be one of: {VALID_PRIORITIES}')
+    column = record.get('current_column') or COLUMN_TODO
+    if column not in VALID_COLUMNS:
+        raise InvalidRecord(f'Invalid column. Must be one of: {VALID_COLUMNS}')
+    deadline = record.get('deadline') or None
+    if deadline is not None:
+        try:
+            datetime.date.fromisoformat(deadline)
+        except (TypeError, ValueError):
+            raise InvalidRecord('Invalid deadline. Use YYYY-MM-DD')
+    return {
+        'id': _int(record, 'id') or next_id(),
+        'title': title,
+        'description': record.get('description') or '',
+        'priority': priority,
+        'deadline': deadline,
+        'date_created': _int(record, 'date_created', now),
+        'date_completed': _int(record, 'date_completed'),
+        'current_column': column,
+        'assignees': _id_list(record.get('assignees')),
+    }
+
+
+def assignment_row(record):
+    """Validate an input record into a user_task_assignments row."""
+    task_id, user_id = _int(record, 'task_id'), _int(record, 'user_id')
+    if task_id is None or user_id is None:
+        raise InvalidRecord('Missing task_id or user_id')
+    return {'task_id': task_id, 'user_id': user_id}
+
+
+def validated(records, to_row, source, skipped):
+    """Turn (line number, record) pairs into rows; invalid ones raise, or are counted in skipped if it is a dict."""
+    for line_number, record in records:
+        try:
+            yield to_row(record)
+        except InvalidRecord as e:
+            if skipped is None:
+                raise InvalidRecord(f'{source} line {line_number}: {e}')
+            skipped[source] = skipped.get(source, 0) + 1
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+
+def _insert_many(conn, table, rows, or_ignore=False):
+    """executemany() an INSERT of rows (dicts with the same keys) into table.
+
+    On SQLite the rows go to the driver as plain tuples, skipping the per-row
+    parameter processing of Core inserts, which dominates the load time.
+    """
+    if conn.dialect.name != 'sqlite':
+        statement = insert(table)
+        conn.execute(statement.prefix_with('OR IGNORE') if or_ignore else statement, rows)
+        return
+    columns = list(rows[0])
+    names, values, defaults = list(columns), ['?'] * len(columns), ()
+    for column in table.columns:
+        # Column defaults that Core would have filled in
+        if column.name not in columns and column.default is not None:
+            names.append(column.name)
+            if column.default.is_scalar:
+                values.append('?')
+                defaults += (column.default.arg,)
+            else:
+                values.append(str(column.default.arg.compile(dialect=conn.dialect)))
+    conn.exec_driver_sql(
+        f'INSERT {"OR IGNORE " if or_ignore else ""}INTO {table.name} ({", ".join(names)}) '
+        f'VALUES ({", ".join(values)})',
+        [tuple(row[column] for column in columns) + defaults for row in rows]
+    )
+
+
+def _drop_deferred(conn):
+    """Drop the secondary indexes and insert triggers of DEFERRED_TABLES; returns their SQL."""
+    placeholders = ', '.join(f"'{table}'" for table in DEFERRED_TABLES)
+    saved = conn.execute(text(
+        f"SELECT type, name, sql FROM sqlite_master WHERE tbl_name IN ({placeholders}) AND sql IS NOT NULL "
+        "AND (type = 'index' OR (type = 'trigger' AND sql LIKE '%AFTER INSERT ON%'))"
+    )).all()
+    for object_type, name, _ in saved:
+        conn.execute(text(f'DROP {object_type.upper()} IF EXISTS "{name}"'))
+    return saved
+
+
+def load(db_engine, users=(), tasks=(), assignments=(), batch_size=DEFAULT_BATCH_SIZE,
+         defer=True, fast=False, on_batch=None):
+    """Bulk insert users, then tasks (with their 'assignees'), then assignments.
+
+    Rows are iterated lazily and written with executemany() in committed
+    batches, so memory stays constant whatever the input size. New tasks and
+    tasks that get assignees get change log entries so delta sync clients
+    pick them up.
+
+    With defer on SQLite, secondary indexes and insert triggers are dropped
+    for the load and the search index and stats are rebuilt afterwards, which
+    is much faster for large loads than maintaining them row by row. The
+    triggers are gone for every connection until the load ends, so tasks
+    created or assigned through the API meanwhile skip their version bump
+    and can be served from stale fragment caches: only defer while nothing
+    else writes. fast turns off synchronous writes on the loading
+    connection. on_batch(table, total) is called after every committed
+    batch.
+
+    Returns {'users': n, 'tasks': n, 'assignments': n}.
+    """
+    counts = {'users': 0, 'tasks': 0, 'assignments': 0}
+    sqlite = db_engine.dialect.name == 'sqlite'
+    with db_engine.connect() as conn:
+        if sqlite:
+            for name, value in {**LOAD_PRAGMAS, **(FAST_PRAGMAS if fast else {})}.items():
+                conn.execute(text(f'PRAGMA {name} = {value}'))
+            conn.commit()
+
+        saved = []
+        if defer and sqlite:
+            with conn.begin():
+                saved = _drop_deferred(conn)
+        try:
+            known_users = set(conn.execute(select(User.id)).scalars())
+            conn.commit()
+
+            for batch in _batches(users, batch_size):
+                with conn.begin():
+                    _insert_many(conn, User.__table__, batch)
+                known_users.update(row['id'] for row in batch)
+                counts['users'] += len(batch)
+                if on_batch:
+                    on_batch('users', counts['users'])
+
+            for batch in _batches(tasks, batch_size):
+                assigned = []
+                for row in batch:
+                    for user_id in row.pop('assignees', None) or ():
+                        if user_id not in known_users:
+                            raise InvalidRecord(f'Task {row["id"]} is assigned to unknown user {user_id}')
+                        assigned.append({'task_id': row['id'], 'user_id': user_id})
+                with conn.begin():
+                    _insert_many(conn, Task.__table__, batch)
+                    if assigned:
+                        # Repeated pairs in the input are skipped instead of failing the batch
+                        _insert_many(conn, UserTaskAssignment.__table__, assigned, or_ignore=True)
+                    record_task_changes(conn, [row['id'] for row in batch])
+                counts['tasks'] += len(batch)
+                counts['assignments'] += len(assigned)
+                if on_batch:
+                    on_batch('tasks', counts['tasks'])
+
+            for batch in _batches(assignments, batch_size):
+                unknown = next((row['user_id'] for row in batch if row['user_id'] not in known_users), None)
+                if unknown is not None:
+                    raise InvalidRecord(f'Assignment to unknown user {unknown}')
+                task_ids = list({row['task_id'] for row in batch})
+                with conn.begin():
+                    known_tasks = set(conn.execute(select(Task.id).where(Task.id.in_(task_ids))).scalars())
+                    unknown = next((row['task_id'] for row in batch if row['task_id'] not in known_tasks), None)
+                    if unknown is not None:
+                        raise InvalidRecord(f'Assignment to unknown task {unknown}')
+                    _insert_many(conn, UserTaskAssignment.__table__, batch, or_ignore=True)
+                    if saved:
+                        # The dropped insert triggers would have bumped the versions of existing tasks
+                        conn.execute(update(Task).where(Task.id.in_(task_ids)).values(version=Task.version + 1))
+                    record_task_changes(conn, task_ids)
+                counts['assignments'] += len(batch)
+                if on_batch:
+                    on_batch('assignments', counts['assignments'])
+        finally:
+            conn.rollback()
+            if saved:
+                # Indexes first, so rebuilding and later triggers can use them
+                with conn.begin():
+                    for _, _, sql in sorted(saved, key=lambda item: item[0] != 'index'):
+                        conn.execute(text(sql))
+                    conn.execute(text('ANALYZE'))
+                    # On this connection for its cache size, which matters a lot for large tables
+                    index_all_tasks(conn, optimize=False)
+            if sqlite:
+                # Never hand the reconfigured connection back to the pool
+                conn.invalidate()
+            if saved:
+                recompute_stats(db_engine)
+            change_counters.bump('tasks', 'users', 'assignments')
+    return counts
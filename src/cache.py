@@ -0,0 +1,44 @@
+import threading
+
+from src.counters import change_counters
+
+
+class VersionedCache:
+    """Single-value cache keyed on a monotonically increasing version.
+
+    version_source returns the current version; write paths move it forward
+    by bumping change counters after they commit, and readers rebuild the
+    value at most once per version.
+    """
+
+    def __init__(self, version_source):
+        self._version_source = version_source
+        self._lock = threading.Lock()
+        self._cached_version = None
+        self._value = None
+
+    @property
+    def version(self):
+        """Current version of the underlying data."""
+        return self._version_source()
+
+    def get_or_build(self, builder):
+        """Return the cached value for the current version, building it if needed.
+
+        builder receives the version it is building for. A value built while a
+        write moved the version on is returned to the caller but not stored.
+        """
+        version = self._version_source()
+        if self._cached_version == version:
+            return self._value
+
+        value = builder(version)
+        with self._lock:
+            if self._version_source() == version:
+                self._value = value
+                self._cached_version = version
+        return value
+
+
+# Serialized GET /api/board response, rebuilt after any task/user/assignment write
+board_cache = VersionedCache(lambda: change_counters.version('tasks', 'users', 'assignments'))
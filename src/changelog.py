@@ -0,0 +1,92 @@
+import os
+import time
+
+from sqlalchemy import func, insert
+
+from src.models import TaskChange
+
+CHANGE_UPSERT = 'upsert'
+CHANGE_DELETE = 'delete'
+
+# How long change log entries are kept before compaction (seconds)
+CHANGE_RETENTION = int(os.environ.get('KANBAN_CHANGE_RETENTION', 7 * 24 * 3600))
+# Minimum time between opportunistic compactions in one process (seconds)
+COMPACT_INTERVAL = 60
+# Max log entries consumed by a single delta request
+MAX_CHANGES_PER_REQUEST = 500
+
+_last_compacted = 0.0
+
+
+class ChangeLogExpired(Exception):
+    """Raised when a client asks for changes that were already compacted away."""
+
+
+def record_task_changes(db, task_ids, kind=CHANGE_UPSERT):
+    """Insert change log rows in the session's transaction so they commit with the mutation."""
+    if not task_ids:
+        return
+    now = int(time.time())
+    db.execute(insert(TaskChange), [{'task_id': task_id, 'kind': kind, 'date_created': now} for task_id in task_ids])
+
+
+def current_seq(db):
+    """Highest sequence number written to the change log (0 when empty)."""
+    return db.query(func.max(TaskChange.seq)).scalar() or 0
+
+
+def load_changes(db, since, limit=MAX_CHANGES_PER_REQUEST):
+    """Collapse log entries after since into the latest change per task.
+
+    Returns (upserted_ids, deleted_ids, last_seq, has_more). Raises
+    ChangeLogExpired when entries after since were already compacted.
+    """
+    # Compaction always keeps the newest entry, so the oldest retained seq
+    # tells us exactly which prefix of the log is gone
+    oldest = db.query(func.min(TaskChange.seq)).scalar()
+    if oldest is not None and since < oldest - 1:
+        raise ChangeLogExpired()
+
+    entries = (
+        db.query(TaskChange.seq, TaskChange.task_id, TaskChange.kind)
+        .filter(TaskChange.seq > since)
+        .order_by(TaskChange.seq)
+        .limit(limit)
+        .all()
+    )
+
+    latest = {}
+    for seq, task_id, kind in entries:
+        latest[task_id] = kind
+
+    upserted = [task_id for task_id, kind in latest.items() if kind == CHANGE_UPSERT]
+    deleted = [task_id for task_id, kind in latest.items() if kind == CHANGE_DELETE]
+    last_seq = entries[-1].seq if entries else max(since, current_seq(db))
+    return upserted, deleted, last_seq, len(entries) == limit
+
+
+def compact_changes(db, retention=CHANGE_RETENTION):
+    """Delete log entries older than the retention window, keeping the newest one.
+
+    Returns the number of deleted entries.
+    """
+    cutoff = int(time.time()) - retention
+    newest = current_seq(db)
+    deleted = (
+        db.query(TaskChange)
+        .filter(TaskChange.date_created < cutoff, TaskChange.seq < newest)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+def maybe_compact_changes(db):
+    """Run compact_changes at most once per COMPACT_INTERVAL in this process."""
+    global _last_compacted
+    now = time.monotonic()
+    if now - _last_compacted < COMPACT_INTERVAL:
+        return
+    _last_compacted = now
+    compact_changes(db)
+
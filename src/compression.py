@@ -0,0 +1,227 @@
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+
+from werkzeug.http import parse_accept_header
+
+from src import config
+from src.metrics import compressed_responses, compression_cache_lookups
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: pip install zstandard
+    zstandard = None
+
+# zlib window bits for a gzip header and trailer
+GZIP_WBITS = 31
+
+# Bodies worth compressing besides text/*
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson')
+
+
+class Gzip:
+    """gzip through zlib."""
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self.level, wbits=GZIP_WBITS)
+
+    def stream(self):
+        """Return (write, finish) functions of an incremental compressor."""
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, GZIP_WBITS)
+        return (lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+class Brotli:
+    """Brotli through the brotli package."""
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return (lambda data: compressor.process(data) + compressor.flush()), compressor.finish
+
+
+class Zstd:
+    """Zstandard through the zstandard package."""
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        # Compressor objects are not thread safe, and cheap to create
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return (lambda data: compressor.compress(data) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)), \
+            compressor.flush
+
+
+def _codecs(names):
+    """Codecs for the configured encodings, in order of preference, skipping uninstalled ones."""
+    available = {
+        'gzip': lambda: Gzip(config.GZIP_LEVEL),
+        'br': lambda: Brotli(config.BROTLI_LEVEL) if brotli is not None else None,
+        'zstd': lambda: Zstd(config.ZSTD_LEVEL) if zstandard is not None else None,
+    }
+    codecs = {}
+    for name in (names or '').split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in available:
+            raise ValueError(f'Unknown compression encoding {name!r}. Must be one of: {tuple(available)}')
+        codec = available[name]()
+        if codec is not None:
+            codecs[name] = codec
+    return codecs
+
+
+# Encoding name -> codec; empty when compression is off
+CODECS = _codecs(config.COMPRESSION_ENCODINGS)
+
+
+def compressible(mimetype):
+    return bool(CODECS) and (mimetype in COMPRESSIBLE_TYPES or mimetype.startswith('text/'))
+
+
+def negotiate(accept_encoding):
+    """Best encoding for an Accept-Encoding header value, or None to send the body as is.
+
+    The client's quality values decide; our order of preference breaks ties.
+    """
+    if not CODECS or not accept_encoding:
+        return None
+    qualities = {value.lower(): quality for value, quality in parse_accept_header(accept_encoding)}
+    best, best_quality = None, 0
+    for name in CODECS:
+        quality = qualities.get(name, qualities.get('*', 0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressedBodies:
+    """LRU cache of compressed bodies, keyed by (strong ETag, encoding).
+
+    A strong ETag identifies the exact bytes of a response, so a body with a
+    known ETag only has to be compressed once per encoding and process, not
+    once per request. max_bytes 0 disables the cache.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (etag, encoding) -> body, least recently used first
+        self._bytes = 0
+
+    def get(self, etag, encoding):
+        if self.max_bytes <= 0:
+            return None
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is not None:
+                self._entries.move_to_end((etag, encoding))
+        compression_cache_lookups.inc(result='hit' if body is not None else 'miss')
+        return body
+
+    def put(self, etag, encoding, body):
+        size = sys.getsizeof(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((etag, encoding), None)
+            if previous is not None:
+                self._bytes -= sys.getsizeof(previous)
+            self._entries[(etag, encoding)] = body
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= sys.getsizeof(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Compressed bodies of responses with an ETag, per process
+compressed_bodies = CompressedBodies(config.COMPRESSION_CACHE_BYTES)
+
+
+def compress_body(data, encoding, etag=None):
+    """Compress a complete body, keeping the result for later requests when it has a strong ETag."""
+    body = CODECS[encoding].compress(data)
+    if etag is not None:
+        compressed_bodies.put(etag, encoding, body)
+    return body
+
+
+def compress_stream(chunks, encoding):
+    """Compress a streamed body incrementally.
+
+    Every chunk is flushed through the compressor, so the client can decode
+    each event or export batch as soon as it arrives. Closing the generator
+    closes the original iterable, which runs its cleanup.
+    """
+    write, finish = CODECS[encoding].stream()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield write(chunk)
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response, accept_encoding):
+    """Compress a Flask response for the client's Accept-Encoding, in place.
+
+    Streamed bodies are always compressed; others only from
+    KANBAN_COMPRESSION_MIN_SIZE bytes. A compressed response's ETag becomes
+    weak, because its bytes differ from the uncompressed representation.
+    """
+    if not compressible(response.mimetype) or 'Content-Encoding' in response.headers:
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return response
+    encoding = negotiate(accept_encoding)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+    else:
+        data = response.get_data()
+        if len(data) < config.COMPRESSION_MIN_SIZE:
+            return response
+        etag, weak = response.get_etag()
+        if weak:
+            etag = None
+        body = compressed_bodies.get(etag, encoding) if etag is not None else None
+        if body is None:
+            body = compress_body(data, encoding, etag)
+        response.set_data(body)
+        if etag is not None:
+            response.set_etag(etag, weak=True)
+    response.headers['Content-Encoding'] = encoding
+    compressed_responses.inc(encoding=encoding)
+    return response
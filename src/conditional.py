@@ -0,0 +1,29 @@
+from functools import wraps
+
+from flask import current_app, request
+
+from src.counters import change_counters
+
+
+def etag_cached(*tables):
+    """Tag GET responses with an ETag derived from the tables' change counters.
+
+    A request whose If-None-Match matches the current ETag is answered with
+    304 before the view runs, so no rows are queried or serialized. The
+    comparison is weak, so the W/ form sent with compressed bodies matches too.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = change_counters.etag(tables, request.full_path.encode())
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,99 @@
+import os
+
+
+def env_int(name, default):
+    """Read an integer setting from the environment."""
+    value = os.environ.get(name)
+    return default if value in (None, '') else int(value)
+
+
+def env_str(name, default):
+    """Read a string setting from the environment; an empty value disables it."""
+    value = os.environ.get(name)
+    return default if value is None else (value or None)
+
+
+def env_bool(name, default):
+    """Read a boolean setting from the environment (1/true/yes/on)."""
+    value = os.environ.get(name)
+    return default if value in (None, '') else value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Flask; signs tokens, so every worker and restart must share it. Required
+# unless debugging, see create_app()
+SECRET_KEY = env_str('KANBAN_SECRET_KEY', None)
+DEBUG = env_bool('KANBAN_DEBUG', False)
+
+# Production server (python main.py serve)
+HOST = os.environ.get('KANBAN_HOST', '0.0.0.0')
+PORT = env_int('KANBAN_PORT', 5000)
+WORKERS = env_int('KANBAN_WORKERS', os.cpu_count() or 1)
+MAX_REQUESTS = env_int('KANBAN_MAX_REQUESTS', 10000)  # Recycle a worker after this many requests, 0 = never
+MAX_REQUESTS_JITTER = env_int('KANBAN_MAX_REQUESTS_JITTER', 1000)  # Spread recycling out over time
+GRACEFUL_TIMEOUT = env_int('KANBAN_GRACEFUL_TIMEOUT', 30)  # Seconds to finish in-flight requests
+
+# Database connection; any SQLAlchemy URL works, e.g. postgresql+psycopg://...
+DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///./assets/main.db')
+# Same database for the async app (src/asgi.py); derived from DATABASE_URL when unset
+ASYNC_DATABASE_URL = env_str('KANBAN_ASYNC_DATABASE_URL', None)
+
+# Connection pool, used for file-backed SQLite and server databases
+DB_POOL_SIZE = env_int('KANBAN_DB_POOL_SIZE', 5)
+DB_MAX_OVERFLOW = env_int('KANBAN_DB_MAX_OVERFLOW', 10)
+DB_POOL_RECYCLE = env_int('KANBAN_DB_POOL_RECYCLE', 3600)  # Seconds
+DB_POOL_TIMEOUT = env_int('KANBAN_DB_POOL_TIMEOUT', 30)  # Seconds
+
+# SQLite pragmas applied to every new connection, in this order
+SQLITE_PRAGMAS = {
+    # WAL lets readers run alongside the single writer
+    'journal_mode': env_str('KANBAN_SQLITE_JOURNAL_MODE', 'WAL'),
+    # NORMAL only fsyncs at checkpoints, which is durable enough in WAL mode
+    'synchronous': env_str('KANBAN_SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': env_str('KANBAN_SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),  # Bytes
+    'cache_size': env_str('KANBAN_SQLITE_CACHE_SIZE', str(-64 * 1024)),  # Negative means KiB
+    'temp_store': env_str('KANBAN_SQLITE_TEMP_STORE', 'MEMORY'),
+    # Wait for the write lock instead of failing with "database is locked"
+    'busy_timeout': env_str('KANBAN_SQLITE_BUSY_TIMEOUT', '5000'),  # Milliseconds
+}
+
+# Argon2id cost parameters; existing hashes are upgraded on the next login
+ARGON2_TIME_COST = env_int('KANBAN_ARGON2_TIME_COST', 3)
+ARGON2_MEMORY_COST = env_int('KANBAN_ARGON2_MEMORY_COST', 64 * 1024)  # KiB
+ARGON2_PARALLELISM = env_int('KANBAN_ARGON2_PARALLELISM', 4)
+
+# Password hashing pool: concurrent hashes, and how many more may wait before 503
+HASH_WORKERS = env_int('KANBAN_HASH_WORKERS', min(4, os.cpu_count() or 1))
+HASH_QUEUE_DEPTH = env_int('KANBAN_HASH_QUEUE_DEPTH', 16)
+
+# Session tokens
+ACCESS_TOKEN_TTL = env_int('KANBAN_ACCESS_TOKEN_TTL', 15 * 60)  # Seconds
+REFRESH_TOKEN_TTL = env_int('KANBAN_REFRESH_TOKEN_TTL', 14 * 24 * 3600)  # Seconds
+TOKEN_CACHE_SIZE = env_int('KANBAN_TOKEN_CACHE_SIZE', 4096)  # Decoded tokens kept per process
+
+# Serialized tasks kept per process for list responses, 0 = no caching
+FRAGMENT_CACHE_BYTES = env_int('KANBAN_FRAGMENT_CACHE_BYTES', 64 * 1024 * 1024)
+
+# Response compression: encodings offered, in order of preference, or empty to
+# disable; br and zstd are skipped unless the brotli/zstandard packages are installed
+COMPRESSION_ENCODINGS = env_str('KANBAN_COMPRESSION', 'zstd,br,gzip')
+COMPRESSION_MIN_SIZE = env_int('KANBAN_COMPRESSION_MIN_SIZE', 1024)  # Bytes; streamed bodies always compress
+GZIP_LEVEL = env_int('KANBAN_GZIP_LEVEL', 6)  # 1-9
+BROTLI_LEVEL = env_int('KANBAN_BROTLI_LEVEL', 4)  # 0-11
+ZSTD_LEVEL = env_int('KANBAN_ZSTD_LEVEL', 3)  # 1-22
+# Compressed bodies of ETag'd responses kept per process, 0 = no caching
+COMPRESSION_CACHE_BYTES = env_int('KANBAN_COMPRESSION_CACHE_BYTES', 16 * 1024 * 1024)
+
+# Rate limiting of expensive endpoints: 'enforce', 'dry-run' (log and count only) or 'off'
+RATE_LIMIT_MODE = os.environ.get('KANBAN_RATE_LIMIT_MODE', 'enforce')
+# Token buckets shared by all worker processes on this host
+RATE_LIMIT_DB = os.environ.get('KANBAN_RATE_LIMIT_DB', './assets/ratelimit.db')
+
+# Snowflake instance ID leases, one per worker process
+ID_LEASE_TTL = env_int('KANBAN_ID_LEASE_TTL', 60)  # Seconds before an unrenewed lease can be taken over
+ID_CLOCK_SKEW = env_int('KANBAN_ID_CLOCK_SKEW', 5)  # Seconds an expired or released lease stays unclaimable
+
+# Metrics (GET /api/metrics); each process writes its own file in this directory
+METRICS_DIR = os.environ.get('KANBAN_METRICS_DIR', './assets/metrics')
+# Log statements and requests slower than this, 0 = never
+SLOW_QUERY_MS = env_int('KANBAN_SLOW_QUERY_MS', 100)
+SLOW_REQUEST_MS = env_int('KANBAN_SLOW_REQUEST_MS', 1000)
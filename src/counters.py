@@ -0,0 +1,112 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to per-process counters
+    fcntl = None
+
+# Tables whose writes are tracked; the order fixes the slot layout of the file,
+# so new tables are only ever appended
+COUNTER_TABLES = ('tasks', 'users', 'assignments', 'revoked_tokens')
+
+# File shared by all worker processes on this host, next to the database
+COUNTERS_PATH = os.environ.get('KANBAN_COUNTERS_PATH', './assets/counters.bin')
+
+_SLOT = struct.Struct('<Q')
+
+
+class ChangeCounters:
+    """Per-table write counters shared between processes through an mmap'd file.
+
+    Slot 0 holds a random generation that is picked when the file is created,
+    so ETags issued before the file was reset can never match again. Reads are
+    plain memory loads; bumps take an exclusive flock on the file.
+    """
+
+    def __init__(self, path, tables):
+        self.path = path
+        self.tables = tables
+        self._slots = {table: index + 1 for index, table in enumerate(tables)}
+        self._size = _SLOT.size * (len(tables) + 1)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+        # Used when the platform has no flock
+        self._local = [int.from_bytes(os.urandom(8), 'little')] + [0] * len(tables)
+
+    def _ensure_open(self):
+        """Open (or re-open after fork) the shared counters file."""
+        if fcntl is None or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # A forked child must not share the parent's open file description,
+            # otherwise flock would not exclude the two processes from each other
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(fd).st_size
+                if size < self._size:
+                    # New file, or one written before a table was added
+                    os.ftruncate(fd, self._size)
+                    if size < _SLOT.size:
+                        os.pwrite(fd, os.urandom(_SLOT.size), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._fd = fd
+            self._map = mmap.mmap(fd, self._size)
+            self._pid = os.getpid()
+
+    def _read(self, slot):
+        if fcntl is None:
+            return self._local[slot]
+        return _SLOT.unpack_from(self._map, slot * _SLOT.size)[0]
+
+    def get(self, table):
+        """Current counter value for a table."""
+        self._ensure_open()
+        return self._read(self._slots[table])
+
+    @property
+    def generation(self):
+        self._ensure_open()
+        return self._read(0)
+
+    def bump(self, *tables):
+        """Record a committed write to the given tables."""
+        self._ensure_open()
+        if fcntl is None:
+            with self._lock:
+                for table in tables:
+                    self._local[self._slots[table]] += 1
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            for table in tables:
+                offset = self._slots[table] * _SLOT.size
+                _SLOT.pack_into(self._map, offset, _SLOT.unpack_from(self._map, offset)[0] + 1)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def version(self, *tables):
+        """Monotonically increasing version covering the given tables."""
+        return sum(self.get(table) for table in tables)
+
+    def etag(self, tables, variant=b''):
+        """Strong ETag for a representation built from the given tables.
+
+        variant distinguishes representations of the same data, e.g. the
+        query string of a paginated or filtered list.
+        """
+        counters = '.'.join(str(self.get(table)) for table in tables)
+        digest = hashlib.blake2s(variant, digest_size=6).hexdigest()
+        return f'{self.generation:x}-{counters}-{digest}'
+
+
+change_counters = ChangeCounters(COUNTERS_PATH, COUNTER_TABLES)
@@ -1,13 +1,86 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from src import config, migrations
 from src.models import Base
 
 # Database configuration
-DATABASE_URL = "sqlite:///./assets/main.db"
+DATABASE_URL = config.DATABASE_URL
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the configured pragmas to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in config.SQLITE_PRAGMAS.items():
+            if value is not None:
+                cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+def create_db_engine(url=DATABASE_URL):
+    """Create an engine with the configured pool settings and, for SQLite, pragmas."""
+    url = make_url(url)
+    pool_args = {
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_recycle': config.DB_POOL_RECYCLE,
+        'pool_timeout': config.DB_POOL_TIMEOUT,
+    }
+    
+    if url.get_backend_name() != 'sqlite':
+        return create_engine(url, pool_pre_ping=True, **pool_args)
+    
+    # In-memory databases live in a single connection, so they get no pool settings
+    if url.database in (None, '', ':memory:'):
+        pool_args = {}
+    db_engine = create_engine(url, connect_args={"check_same_thread": False}, **pool_args)
+    event.listen(db_engine, 'connect', apply_sqlite_pragmas)
+    return db_engine
+
+# Async drivers for the dialects whose default driver is synchronous
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'psycopg',
+    'mysql': 'aiomysql',
+}
+
+def async_database_url(url=DATABASE_URL):
+    """Return the URL with its driver swapped for the dialect's async driver."""
+    url = make_url(url)
+    if url.get_backend_name() in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}")
+    return url
+
+def create_async_db_engine(url=None):
+    """Create an asyncio engine with the same pool settings and pragmas as create_db_engine."""
+    # Imported here so the synchronous app does not need greenlet or an async driver
+    from sqlalchemy.ext.asyncio import create_async_engine
+    
+    url = make_url(url or config.ASYNC_DATABASE_URL or async_database_url())
+    pool_args = {
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_recycle': config.DB_POOL_RECYCLE,
+        'pool_timeout': config.DB_POOL_TIMEOUT,
+    }
+    
+    if url.get_backend_name() != 'sqlite':
+        return create_async_engine(url, pool_pre_ping=True, **pool_args)
+    
+    if url.database in (None, '', ':memory:'):
+        pool_args = {}
+    db_engine = create_async_engine(url, **pool_args)
+    event.listen(db_engine.sync_engine, 'connect', apply_sqlite_pragmas)
+    return db_engine
 
 # Create engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_db_engine()
+
+# A forked worker must open its own connections; close=False leaves the
+# parent's connections untouched instead of closing them from the child
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -21,5 +94,6 @@ def get_db():
         db.close()
 
 def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and apply pending schema migrations."""
     Base.metadata.create_all(bind=engine)
+    migrations.upgrade(engine)
@@ -0,0 +1,24 @@
+import os
+
+# Modules under src read their settings when they are imported, so this one
+# imports none of them
+
+
+def configure_environment(workdir, secret_key):
+    """Point every file the app writes into workdir, with rate limits and slow logs off.
+
+    Used by the tests and benchmark.py; must run before anything imports
+    src.config.
+    """
+    os.environ.update({
+        'DATABASE_URL': f'sqlite:///{os.path.join(workdir, "kanban.db")}',
+        'KANBAN_COUNTERS_PATH': os.path.join(workdir, 'counters.bin'),
+        'KANBAN_EVENTS_DIR': os.path.join(workdir, 'events'),
+        'KANBAN_RATE_LIMIT_DB': os.path.join(workdir, 'ratelimit.db'),
+        'KANBAN_METRICS_DIR': os.path.join(workdir, 'metrics'),
+        'KANBAN_RATE_LIMIT_MODE': 'off',
+        'KANBAN_SECRET_KEY': secret_key,
+        # Slow logs would be noise in the output
+        'KANBAN_SLOW_QUERY_MS': '0',
+        'KANBAN_SLOW_REQUEST_MS': '0',
+    })
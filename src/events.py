@@ -0,0 +1,193 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before it is considered too slow and evicted
+SUBSCRIBER_QUEUE_SIZE = 256
+# Upper bound on concurrent SSE connections per process
+MAX_SUBSCRIBERS = 1000
+# Seconds between heartbeat comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+# Directory holding one datagram socket per worker process for the relay
+EVENTS_DIR = os.environ.get('KANBAN_EVENTS_DIR', './assets/events')
+# Largest relayed event; bigger ones are only delivered in the publishing process
+MAX_DATAGRAM_SIZE = 1 << 16
+
+HEARTBEAT = ': heartbeat\n\n'
+EVICTED = 'event: evicted\ndata: {}\n\n'
+
+
+def format_event(event_type, data):
+    """Format an event as a server-sent events message."""
+    return f'event: {event_type}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+class Subscriber:
+    """A single SSE connection with a bounded queue of pending messages."""
+
+    def __init__(self, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.evicted = False
+
+    def next_message(self, timeout=HEARTBEAT_INTERVAL):
+        """Block for the next message; a heartbeat when idle, None once evicted."""
+        if self.evicted:
+            return None
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return HEARTBEAT
+
+
+class EventBroker:
+    """In-process fan-out of event messages to SSE subscribers."""
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE, max_subscribers=MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        """Register a new subscriber, or return None when the process is at capacity."""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscriber = Subscriber(self.queue_size)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def deliver(self, message):
+        """Queue a message for every subscriber, evicting the ones that fell behind."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(message)
+            except queue.Full:
+                # The client resyncs through /api/tasks/changes after reconnecting
+                subscriber.evicted = True
+                self.unsubscribe(subscriber)
+
+
+class SocketRelay:
+    """Forward events between worker processes over Unix datagram sockets.
+
+    Every process that has subscribers binds <directory>/<pid>.sock and runs a
+    receiver thread that feeds its local broker. Publishing sends the message
+    to every other socket in the directory; sockets of dead processes are
+    removed on the first failed send.
+    """
+
+    def __init__(self, directory, broker):
+        self.directory = directory
+        self.broker = broker
+        self._lock = threading.Lock()
+        self._pid = None
+        self._path = None
+        self._sender = None
+        self.enabled = hasattr(socket, 'AF_UNIX')
+
+    def _get_sender(self):
+        if self._pid != os.getpid():
+            # Sockets are never shared with a forked parent
+            self._pid = os.getpid()
+            self._path = None
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, MAX_DATAGRAM_SIZE)
+            self._sender.setblocking(False)
+        return self._sender
+
+    def start(self):
+        """Bind this process' socket and start its receiver thread (idempotent)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._get_sender()
+            if self._path is not None:
+                return
+            path = os.path.join(self.directory, f'{os.getpid()}.sock')
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                if os.path.exists(path):
+                    os.unlink(path)
+                receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MAX_DATAGRAM_SIZE)
+                receiver.bind(path)
+            except OSError:
+                # Platform without Unix datagram sockets: stay process-local
+                self.enabled = False
+                return
+            self._path = path
+            atexit.register(self._cleanup, path)
+            threading.Thread(target=self._receive, args=(receiver,), daemon=True).start()
+
+    def _receive(self, receiver):
+        while True:
+            data = receiver.recv(MAX_DATAGRAM_SIZE)
+            self.broker.deliver(data.decode('utf-8'))
+
+    @staticmethod
+    def _cleanup(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def send(self, message):
+        """Send a message to every other process' receiver."""
+        if not self.enabled:
+            return
+        data = message.encode('utf-8')
+        if len(data) > MAX_DATAGRAM_SIZE:
+            return
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        sender = self._get_sender()
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if not name.endswith('.sock') or path == self._path:
+                continue
+            try:
+                sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._cleanup(path)
+            except OSError:
+                # Receiver buffer full: that process' subscribers miss this event
+                pass
+
+
+broker = EventBroker()
+relay = SocketRelay(EVENTS_DIR, broker)
+
+
+def subscribe():
+    """Subscribe to events from every worker process on this host."""
+    relay.start()
+    return broker.subscribe()
+
+
+def publish_event(event_type, data):
+    """Publish an event to local subscribers and to the other worker processes.
+
+    Called after the write committed, so a failure is logged instead of
+    raised; clients that miss an event catch up through delta sync.
+    """
+    try:
+        message = format_event(event_type, data)
+        broker.deliver(message)
+        relay.send(message)
+    except Exception:
+        logger.exception('Publishing %s failed', event_type)
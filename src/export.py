@@ -0,0 +1,75 @@
+import csv
+import io
+import itertools
+import json
+
+from src.database import SessionLocal
+from src.filters import parse_task_filters
+from src.models import Task
+from src.serializers import serialize_tasks
+
+EXPORT_NDJSON = 'ndjson'
+EXPORT_CSV = 'csv'
+EXPORT_FORMATS = (EXPORT_NDJSON, EXPORT_CSV)
+
+MIMETYPES = {
+    EXPORT_NDJSON: 'application/x-ndjson',
+    EXPORT_CSV: 'text/csv',
+}
+
+# Query string parameters of GET /api/tasks/export other than the filters
+EXPORT_PARAMS = ('format',)
+
+# Tasks fetched from the cursor, serialized and sent per chunk
+EXPORT_BATCH_SIZE = 1000
+
+# CSV header, in the order of Task.to_dict(); assignees are joined with ';'
+CSV_FIELDS = ('id', 'title', 'description', 'priority', 'deadline', 'date_created', 'date_completed',
+              'current_column', 'created_at', 'assignees')
+
+
+def parse_export_args(args):
+    """Return (format, filter conditions) for GET /api/tasks/export. Raises ValueError on bad arguments."""
+    file_format = args.get('format', EXPORT_NDJSON)
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f'Invalid format. Must be one of: {EXPORT_FORMATS}')
+    return file_format, parse_task_filters(args, other_params=EXPORT_PARAMS)
+
+
+def export_query(db, conditions):
+    """Matching tasks in ID order, so an export can be diffed or resumed."""
+    return db.query(Task).filter(*conditions).order_by(Task.id)
+
+
+def _ndjson_chunk(records):
+    return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+
+
+def _csv_chunk(records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        record['assignees'] = ';'.join(record['assignees'])
+        writer.writerow([record[field] for field in CSV_FIELDS])
+    return buffer.getvalue()
+
+
+def stream_tasks(file_format, conditions, batch_size=EXPORT_BATCH_SIZE):
+    """Yield the export body in chunks of batch_size tasks.
+
+    The generator owns its session because it runs after the request context
+    is gone. Tasks come from a server-side cursor and go out batch by batch,
+    so memory use does not depend on the number of tasks.
+    """
+    to_chunk = _csv_chunk if file_format == EXPORT_CSV else _ndjson_chunk
+    db = SessionLocal()
+    try:
+        if file_format == EXPORT_CSV:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(CSV_FIELDS)
+            yield buffer.getvalue()
+        tasks = iter(export_query(db, conditions).yield_per(batch_size))
+        while batch := list(itertools.islice(tasks, batch_size)):
+            yield to_chunk(serialize_tasks(db, batch))
+    finally:
+        db.close()
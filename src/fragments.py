@@ -0,0 +1,103 @@
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+from src import config
+from src.metrics import fragment_cache_bytes, fragment_cache_entries, fragment_cache_evictions, fragment_cache_lookups
+
+# Estimated bytes per entry besides the fragment itself: the OrderedDict
+# slot, the (version, fragment) tuple and the int key
+ENTRY_OVERHEAD = 150
+
+
+def encode_fragment(value):
+    """JSON bytes of a value, encoded like flask.jsonify in production (sorted keys, compact)."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class FragmentCache:
+    """LRU cache of serialized tasks, keyed by task ID and row version.
+
+    A lookup only hits when the cached version equals the version read from
+    the database. Every write bumps the version, so entries can never be
+    stale, even when another worker process made the change. Write handlers
+    also discard the entries of the tasks they change, so memory is not held
+    by versions nobody will ask for again. max_bytes 0 disables the cache.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # task ID -> (version, fragment), least recently used first
+        self._bytes = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def _size(fragment):
+        return sys.getsizeof(fragment) + ENTRY_OVERHEAD
+
+    def get_many(self, keys):
+        """Return ({task_id: fragment} for the (task_id, version) keys that hit, [missed task IDs])."""
+        found, missing = {}, []
+        with self._lock:
+            for task_id, version in keys:
+                entry = self._entries.get(task_id)
+                if entry is not None and entry[0] == version:
+                    self._entries.move_to_end(task_id)
+                    found[task_id] = entry[1]
+                else:
+                    missing.append(task_id)
+        if found:
+            fragment_cache_lookups.inc(len(found), result='hit')
+        if missing:
+            fragment_cache_lookups.inc(len(missing), result='miss')
+        return found, missing
+
+    def put_many(self, items):
+        """Store (task_id, version, fragment) items, evicting the least recently used beyond max_bytes."""
+        if not self.enabled:
+            return
+        evicted = 0
+        with self._lock:
+            for task_id, version, fragment in items:
+                previous = self._entries.pop(task_id, None)
+                if previous is not None:
+                    self._bytes -= self._size(previous[1])
+                self._entries[task_id] = (version, fragment)
+                self._bytes += self._size(fragment)
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, fragment) = self._entries.popitem(last=False)
+                self._bytes -= self._size(fragment)
+                evicted += 1
+            self._update_gauges()
+        if evicted:
+            fragment_cache_evictions.inc(evicted)
+
+    def discard(self, task_ids):
+        """Drop the entries of tasks that were changed or deleted."""
+        if not self.enabled:
+            return
+        with self._lock:
+            for task_id in task_ids:
+                entry = self._entries.pop(task_id, None)
+                if entry is not None:
+                    self._bytes -= self._size(entry[1])
+            self._update_gauges()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._update_gauges()
+
+    def _update_gauges(self):
+        fragment_cache_bytes.set(self._bytes)
+        fragment_cache_entries.set(len(self._entries))
+
+
+# Serialized tasks for GET /api/tasks, per process
+task_fragments = FragmentCache(config.FRAGMENT_CACHE_BYTES)
@@ -0,0 +1,213 @@
+import atexit
+import os
+import random
+import secrets
+import socket
+import threading
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from src import config
+from src.database import engine
+from src.models import IdLease
+
+# Snowflake layout, compatible with IDs issued by the snowflake-id package's defaults (Unix epoch):
+# 41 bits of milliseconds | 10 bits of instance ID | 12 bits of sequence
+INSTANCE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_INSTANCE = (1 << INSTANCE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Clock steps backwards up to this many milliseconds are waited out; larger
+# ones stop ID generation until the clock catches up
+MAX_CLOCK_WAIT_MS = 10
+# Seconds acquire() retries contended claims before giving up
+ACQUIRE_TIMEOUT = 10
+
+
+class LeaseLost(RuntimeError):
+    """Raised when this process no longer holds (or cannot get) an instance ID lease."""
+
+
+class ClockMovedBackwards(RuntimeError):
+    """Raised when the clock is too far behind the timestamp of the last issued ID."""
+
+
+class InstanceLease:
+    """A snowflake instance ID leased through the id_leases table.
+
+    The lease is renewed in the background every third of its TTL and
+    expired at exit. If renewal fails long enough for the lease to expire,
+    another process may take the instance ID over, so ID generation stops.
+    An expired lease is only taken over clock_skew seconds later, so the
+    new owner's clock is past every timestamp the old owner issued.
+    """
+
+    def __init__(self, db_engine, ttl, clock_skew):
+        self.engine = db_engine
+        self.ttl = ttl
+        self.clock_skew = clock_skew
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}'
+        self.instance_id = None
+        self.expires_at = 0
+        self._stop = threading.Event()
+
+    def acquire(self):
+        """Lease the lowest free (or long expired) instance ID."""
+        deadline = time.monotonic() + ACQUIRE_TIMEOUT
+        while True:
+            now = int(time.time())
+            try:
+                with self.engine.begin() as conn:
+                    instance_id = self._claim(conn, now)
+            except (IntegrityError, OperationalError):
+                # Another process claimed the same ID or held the write lock first
+                instance_id = None
+            if instance_id is None:
+                if time.monotonic() >= deadline:
+                    raise LeaseLost(f'No snowflake instance ID could be leased within {ACQUIRE_TIMEOUT}s')
+                time.sleep(random.uniform(0.001, 0.02))
+                continue
+            self.instance_id = instance_id
+            self.expires_at = now + self.ttl
+            threading.Thread(target=self._renew_loop, daemon=True, name='id-lease').start()
+            atexit.register(self.release)
+            return instance_id
+
+    def _claim(self, conn, now):
+        """Try to claim an instance ID; None if another process won the race."""
+        leases = dict(conn.execute(select(IdLease.instance_id, IdLease.expires_at)).all())
+        free = [i for i in range(MAX_INSTANCE + 1) if i not in leases]
+        if free:
+            conn.execute(IdLease.__table__.insert().values(
+                instance_id=free[0], owner=self.owner, expires_at=now + self.ttl))
+            return free[0]
+
+        reusable_before = now - self.clock_skew
+        expired = [i for i, expires_at in leases.items() if expires_at < reusable_before]
+        if not expired:
+            raise LeaseLost('All snowflake instance IDs are leased or were released too recently')
+        instance_id = min(expired)
+        # Only take it over if nobody renewed it in the meantime
+        taken = conn.execute(
+            update(IdLease)
+            .where(IdLease.instance_id == instance_id, IdLease.expires_at < reusable_before)
+            .values(owner=self.owner, expires_at=now + self.ttl)
+        ).rowcount
+        return instance_id if taken else None
+
+    def renew(self):
+        """Extend the lease; returns False if it was lost."""
+        now = int(time.time())
+        with self.engine.begin() as conn:
+            renewed = conn.execute(
+                update(IdLease)
+                .where(IdLease.instance_id == self.instance_id, IdLease.owner == self.owner)
+                .values(expires_at=now + self.ttl)
+            ).rowcount
+        if renewed:
+            self.expires_at = now + self.ttl
+        return bool(renewed)
+
+    def _renew_loop(self):
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                if not self.renew():
+                    return
+            except Exception:
+                # Keep trying while the lease is still valid
+                continue
+
+    def release(self):
+        """Give the instance ID back (called at exit).
+
+        The row is kept, expiring now, so the ID is reused only after the
+        clock skew margin like any expired lease.
+        """
+        self._stop.set()
+        if self.instance_id is None:
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    update(IdLease)
+                    .where(IdLease.instance_id == self.instance_id, IdLease.owner == self.owner)
+                    .values(expires_at=int(time.time()))
+                )
+        except Exception:
+            pass
+        self.instance_id = None
+
+    @property
+    def valid(self):
+        return self.instance_id is not None and time.time() < self.expires_at
+
+
+class IdAllocator:
+    """Per-process snowflake generator backed by an instance ID lease.
+
+    The lease is taken lazily on first use, so a preforking parent never
+    holds one and every forked worker leases its own.
+    """
+
+    def __init__(self, db_engine, ttl, clock_skew):
+        self.engine = db_engine
+        self.ttl = ttl
+        self.clock_skew = clock_skew
+        self._lock = threading.Lock()
+        self._pid = None
+        self._lease = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _ensure_lease(self):
+        if self._pid != os.getpid():
+            self._lease = InstanceLease(self.engine, self.ttl, self.clock_skew)
+            self._lease.acquire()
+            self._pid = os.getpid()
+            self._last_ms = -1
+            self._sequence = 0
+        elif not self._lease.valid and not self._lease.renew():
+            raise LeaseLost(f'Snowflake instance {self._lease.instance_id} lease expired')
+
+    def next_id(self):
+        """Return a new unique snowflake ID."""
+        with self._lock:
+            self._ensure_lease()
+            now_ms = self._wait_for_clock()
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                # Same millisecond
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    # Never issue timestamps ahead of the clock: wait for the next millisecond
+                    self._last_ms = self._wait_for_clock(self._last_ms + 1)
+                    self._sequence = 0
+
+            return (self._last_ms << (INSTANCE_BITS + SEQUENCE_BITS)) | \
+                (self._lease.instance_id << SEQUENCE_BITS) | self._sequence
+
+
+    def _wait_for_clock(self, target_ms=None):
+        """Current time in milliseconds, once it has reached target_ms (default: the last issued timestamp)."""
+        target_ms = self._last_ms if target_ms is None else target_ms
+        now_ms = int(time.time() * 1000)
+        while now_ms < target_ms:
+            if target_ms - now_ms > MAX_CLOCK_WAIT_MS:
+                raise ClockMovedBackwards(
+                    f'Clock is {target_ms - now_ms} ms behind the last issued snowflake ID')
+            time.sleep((target_ms - now_ms) / 1000)
+            now_ms = int(time.time() * 1000)
+        return now_ms
+
+
+id_allocator = IdAllocator(engine, config.ID_LEASE_TTL, config.ID_CLOCK_SKEW)
+
+
+def next_id():
+    """Return a new unique snowflake ID for this worker process."""
+    return id_allocator.next_id()
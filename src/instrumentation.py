@@ -0,0 +1,106 @@
+import contextvars
+import logging
+import time
+
+from sqlalchemy import event
+
+from src import config, metrics
+
+logger = logging.getLogger(__name__)
+
+# Route label for work outside any request (CLI commands, background threads)
+NO_ROUTE = 'none'
+# Route label for requests that matched no URL rule
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class RequestTimings:
+    """Time spent on behalf of one request, reported in Server-Timing."""
+
+    __slots__ = ('method', 'route', 'start', 'queries', 'db_time', 'argon2_time')
+
+    def __init__(self, method, route):
+        self.method = method
+        self.route = route
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.argon2_time = 0.0
+
+
+# Timings of the request running in this thread or task
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+def start_request(method, route):
+    """Start timing a request; statements and hashes until finish_request() count towards it."""
+    timings = RequestTimings(method, route)
+    _current.set(timings)
+    return timings
+
+
+def current_timings():
+    return _current.get()
+
+
+def finish_request(timings, status, size=None):
+    """Record the request metrics and return its Server-Timing header value."""
+    _current.set(None)
+    duration = time.perf_counter() - timings.start
+    metrics.http_requests.inc(method=timings.method, route=timings.route, status=str(status))
+    metrics.http_request_duration.observe(duration, method=timings.method, route=timings.route)
+    if size is not None:
+        metrics.http_response_size.observe(size, route=timings.route)
+    metrics.db_queries_per_request.observe(timings.queries, route=timings.route)
+    metrics.db_time_per_request.observe(timings.db_time, route=timings.route)
+
+    if config.SLOW_REQUEST_MS and duration * 1000 >= config.SLOW_REQUEST_MS:
+        metrics.slow_requests.inc(route=timings.route)
+        logger.warning(
+            'Slow request (%.1f ms) %s %s: %d statements took %.1f ms, Argon2 %.1f ms',
+            duration * 1000, timings.method, timings.route,
+            timings.queries, timings.db_time * 1000, timings.argon2_time * 1000
+        )
+
+    server_timing = [f'app;dur={duration * 1000:.2f}',
+                     f'db;dur={timings.db_time * 1000:.2f};desc="{timings.queries} queries"']
+    if timings.argon2_time:
+        server_timing.append(f'argon2;dur={timings.argon2_time * 1000:.2f}')
+    return ', '.join(server_timing)
+
+
+def record_argon2(operation, compute_time, total_time):
+    """Record one hash or verify; the request is charged the wait for a pool slot too."""
+    metrics.argon2_duration.observe(compute_time, operation=operation)
+    timings = _current.get()
+    if timings is not None:
+        timings.argon2_time += total_time
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._kanban_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_kanban_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    timings = _current.get()
+    if timings is not None:
+        timings.queries += 1
+        timings.db_time += elapsed
+
+    if config.SLOW_QUERY_MS and elapsed * 1000 >= config.SLOW_QUERY_MS:
+        route = timings.route if timings is not None else NO_ROUTE
+        metrics.slow_queries.inc(route=route)
+        # Parameters are left out; they may hold password hashes or tokens
+        logger.warning('Slow query (%.1f ms) in %s: %s', elapsed * 1000, route, ' '.join(statement.split()))
+
+
+def instrument_engine(db_engine):
+    """Count and time every statement of a (sync) engine; safe to call more than once."""
+    if not event.contains(db_engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(db_engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db_engine, 'after_cursor_execute', _after_cursor_execute)
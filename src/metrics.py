@@ -0,0 +1,409 @@
+import contextlib
+import glob
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import threading
+from collections import defaultdict
+
+try:
+    import fcntl
+except ImportError:  # Windows: no directory lock, files of exited processes are never folded
+    fcntl = None
+
+from src import config
+
+# Histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Seconds
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)  # Bytes
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+ARGON2_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)  # Seconds
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_USED = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+_INITIAL_FILE_SIZE = 1 << 16
+
+# Values of exited processes, as {"values": {key: value}, "folded": [file names]}
+AGGREGATE_FILE = 'exited.json'
+# flock()ed while folding or reading, so no file is counted twice
+_LOCK_FILE = '.lock'
+
+
+class ProcessValues:
+    """Float values of this process, keyed by sample, in an mmap'd file.
+
+    Every process writes only its own file in the metrics directory, so
+    updates need no cross-process lock; /api/metrics sums all files. Files
+    of exited processes are folded into AGGREGATE_FILE, so counters never go
+    backwards and the directory does not grow as workers are recycled.
+
+    Layout: an 8 byte count of used bytes, then records of a 4 byte key
+    length, the key padded to 8 bytes and an 8 byte double. A record is
+    complete before the used count covers it, so readers never see half
+    written keys.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._path = None
+        self._map = None
+        self._used = 0
+        self._positions = {}
+
+    def _ensure_open(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # A forked child starts its own file instead of writing into the parent's
+            os.makedirs(self.directory, exist_ok=True)
+            self._path = os.path.join(self.directory, f'{os.getpid()}-{os.urandom(4).hex()}.bin')
+            self._positions = {}
+            self._open(_INITIAL_FILE_SIZE)
+            self._used = _USED.size
+            _USED.pack_into(self._map, 0, self._used)
+            self._pid = os.getpid()
+
+    def _open(self, size):
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def _append(self, key):
+        encoded = key.encode('utf-8')
+        padded = _LENGTH.size + len(encoded)
+        padded += -padded % 8
+        needed = self._used + padded + _VALUE.size
+        if needed > len(self._map):
+            size = len(self._map)
+            while size < needed:
+                size *= 2
+            self._map.close()
+            self._open(size)
+
+        _LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[self._used + _LENGTH.size:self._used + _LENGTH.size + len(encoded)] = encoded
+        position = self._used + padded
+        _VALUE.pack_into(self._map, position, 0.0)
+        self._used = needed
+        _USED.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def inc(self, key, amount=1.0):
+        self._ensure_open()
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            _VALUE.pack_into(self._map, position, _VALUE.unpack_from(self._map, position)[0] + amount)
+
+    def set(self, key, value):
+        self._ensure_open()
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            _VALUE.pack_into(self._map, position, value)
+
+
+def _process_alive(path):
+    """Whether the process that wrote a metrics file (named <pid>-<random>.bin) still runs."""
+    if fcntl is None:
+        # Folding without the directory lock could count a file twice, and
+        # os.kill(pid, 0) sends CTRL_C_EVENT on Windows: keep summing every file
+        return True
+    try:
+        os.kill(int(os.path.basename(path).split('-', 1)[0]), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+
+
+def _read_file(path):
+    """(key, value) records of one process file; empty if it cannot be read."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+    if len(data) < _USED.size:
+        return []
+    records = []
+    used = min(_USED.unpack_from(data, 0)[0], len(data))
+    position = _USED.size
+    while position + _LENGTH.size <= used:
+        length = _LENGTH.unpack_from(data, position)[0]
+        padded = _LENGTH.size + length
+        padded += -padded % 8
+        if position + padded + _VALUE.size > used:
+            break
+        key = data[position + _LENGTH.size:position + _LENGTH.size + length].decode('utf-8')
+        records.append((key, _VALUE.unpack_from(data, position + padded)[0]))
+        position += padded + _VALUE.size
+    return records
+
+
+def _live_prefixes(live_only):
+    # Sample keys start with the JSON encoded metric name (see _sample_key)
+    return tuple(f'[{json.dumps(name)},' for name in live_only)
+
+
+def _load_aggregate(directory):
+    """(values, folded file names) of AGGREGATE_FILE."""
+    try:
+        with open(os.path.join(directory, AGGREGATE_FILE)) as f:
+            aggregate = json.load(f)
+    except FileNotFoundError:
+        return {}, set()
+    return aggregate['values'], set(aggregate['folded'])
+
+
+@contextlib.contextmanager
+def _directory_lock(directory):
+    """Hold an exclusive lock of the metrics directory, shared by every process of the host."""
+    os.makedirs(directory, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, _LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _fold_exited(directory, live_only):
+    """Add the files of exited processes to AGGREGATE_FILE, then delete them (directory lock held).
+
+    Their samples of the metric names in live_only are dropped. Files are
+    listed as folded before they are deleted, so a crash in between cannot
+    count them twice.
+    """
+    live_prefixes = _live_prefixes(live_only)
+    values, folded = _load_aggregate(directory)
+    paths = {os.path.basename(path): path for path in glob.glob(os.path.join(directory, '*.bin'))}
+    exited = [name for name in paths if name not in folded and not _process_alive(paths[name])]
+    if exited:
+        totals = defaultdict(float, values)
+        for name in exited:
+            for key, value in _read_file(paths[name]):
+                if not key.startswith(live_prefixes):
+                    totals[key] += value
+        folded = (folded & paths.keys()) | set(exited)
+        path = os.path.join(directory, AGGREGATE_FILE)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump({'values': totals, 'folded': sorted(folded)}, f)
+        os.replace(f'{path}.tmp', path)
+    for name in folded & paths.keys():
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(paths[name])
+
+
+def fold_exited_processes(directory=None):
+    """Fold the metric files of exited processes into one aggregate file.
+
+    Called by the arbiter when it reaps workers, on ASGI startup and by
+    every scrape.
+    """
+    directory = directory or config.METRICS_DIR
+    with _directory_lock(directory):
+        _fold_exited(directory, _gauge_names())
+
+
+def read_values(directory, live_only=()):
+    """Sum the values of every process file in the directory and of exited processes.
+
+    Samples of the metric names in live_only are only summed over processes
+    that are still running.
+    """
+    live_prefixes = _live_prefixes(live_only)
+    values, folded = _load_aggregate(directory)
+    totals = defaultdict(float, values)
+    for path in glob.glob(os.path.join(directory, '*.bin')):
+        if os.path.basename(path) in folded:
+            continue
+        alive = not live_prefixes or _process_alive(path)
+        for key, value in _read_file(path):
+            if alive or not key.startswith(live_prefixes):
+                totals[key] += value
+    return totals
+
+
+def reset_metrics(directory=None):
+    """Remove the files of previous runs; call once before any worker starts."""
+    shutil.rmtree(directory or config.METRICS_DIR, ignore_errors=True)
+
+
+process_values = ProcessValues(config.METRICS_DIR)
+
+# name -> metric, in registration order
+_registry = {}
+
+
+def _gauge_names():
+    return [name for name, metric in _registry.items() if metric.kind == 'gauge']
+
+
+def _sample_key(name, labels):
+    return json.dumps([name, sorted(labels.items())], separators=(',', ':'))
+
+
+class Counter:
+    """Monotonic counter, summed across worker processes."""
+
+    kind = 'counter'
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        _registry[name] = self
+
+    def inc(self, amount=1, **labels):
+        process_values.inc(_sample_key(self.name, labels), amount)
+
+    def samples(self, values):
+        """Yield (sample_name, labels, value) from the summed values of this counter."""
+        for (name, labels), value in sorted(values.items()):
+            yield name, labels, value
+
+
+class Histogram:
+    """Histogram with fixed buckets, summed across worker processes.
+
+    An observation writes only its own bucket plus sum and count; buckets
+    are made cumulative when rendered.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        _registry[name] = self
+
+    def observe(self, value, **labels):
+        bound = next((bound for bound in self.buckets if value <= bound), math.inf)
+        process_values.inc(_sample_key(f'{self.name}_bucket', {**labels, 'le': bound}))
+        process_values.inc(_sample_key(f'{self.name}_sum', labels), value)
+        process_values.inc(_sample_key(f'{self.name}_count', labels))
+
+    def samples(self, values):
+        series = defaultdict(dict)
+        for (name, labels), value in values.items():
+            plain = tuple(label for label in labels if label[0] != 'le')
+            suffix = name[len(self.name):]
+            if suffix == '_bucket':
+                series[plain].setdefault('buckets', {})[dict(labels)['le']] = value
+            else:
+                series[plain][suffix] = value
+        for labels, parts in sorted(series.items()):
+            cumulative = 0
+            counts = parts.get('buckets', {})
+            for bound in self.buckets + (math.inf,):
+                cumulative += counts.get(bound, 0)
+                yield f'{self.name}_bucket', labels + (('le', bound),), cumulative
+            yield f'{self.name}_sum', labels, parts.get('_sum', 0)
+            yield f'{self.name}_count', labels, parts.get('_count', 0)
+
+
+class Gauge:
+    """Current value per process, summed across the worker processes that are still running."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        _registry[name] = self
+
+    def set(self, value, **labels):
+        process_values.set(_sample_key(self.name, labels), value)
+
+    def samples(self, values):
+        for (name, labels), value in sorted(values.items()):
+            yield name, labels, value
+
+
+def _format_number(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics(directory=None):
+    """All metrics of every worker process in Prometheus text format."""
+    directory = directory or config.METRICS_DIR
+    gauges = _gauge_names()
+    with _directory_lock(directory):
+        _fold_exited(directory, gauges)
+        values = read_values(directory, live_only=gauges)
+
+    per_metric = defaultdict(dict)
+    for key, value in values.items():
+        name, labels = json.loads(key)
+        labels = tuple((label, value if label != 'le' else float(value)) for label, value in labels)
+        for metric_name in (name, name.rsplit('_', 1)[0]):
+            if metric_name in _registry:
+                per_metric[metric_name][(name, labels)] = value
+                break
+
+    lines = []
+    for name, metric in _registry.items():
+        lines.append(f'# HELP {name} {metric.description}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for sample_name, labels, value in metric.samples(per_metric[name]):
+            label_text = ','.join(
+                f'{label}="{_format_number(value) if label == "le" else _escape(value)}"' for label, value in labels
+            )
+            lines.append(f'{sample_name}{{{label_text}}} {_format_number(value)}' if label_text
+                         else f'{sample_name} {_format_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+http_requests = Counter('kanban_http_requests_total', 'HTTP requests by route and status.')
+http_request_duration = Histogram(
+    'kanban_http_request_duration_seconds', 'Time to produce the response headers.', LATENCY_BUCKETS)
+http_response_size = Histogram(
+    'kanban_http_response_size_bytes', 'Response body size, when known up front.', SIZE_BUCKETS)
+db_queries_per_request = Histogram(
+    'kanban_db_queries_per_request', 'SQL statements executed per request.', QUERY_COUNT_BUCKETS)
+db_time_per_request = Histogram(
+    'kanban_db_time_per_request_seconds', 'Time spent in SQL statements per request.', LATENCY_BUCKETS)
+argon2_duration = Histogram(
+    'kanban_argon2_duration_seconds', 'Argon2 hash/verify time, excluding pool wait.', ARGON2_BUCKETS)
+slow_queries = Counter('kanban_slow_queries_total', 'SQL statements slower than KANBAN_SLOW_QUERY_MS.')
+slow_requests = Counter('kanban_slow_requests_total', 'Requests slower than KANBAN_SLOW_REQUEST_MS.')
+fragment_cache_lookups = Counter(
+    'kanban_fragment_cache_lookups_total', 'Serialized task cache lookups by result (hit or miss).')
+fragment_cache_evictions = Counter(
+    'kanban_fragment_cache_evictions_total', 'Serialized tasks evicted to stay within KANBAN_FRAGMENT_CACHE_BYTES.')
+fragment_cache_bytes = Gauge('kanban_fragment_cache_bytes', 'Memory held by the serialized task cache.')
+fragment_cache_entries = Gauge('kanban_fragment_cache_entries', 'Tasks in the serialized task cache.')
+compressed_responses = Counter('kanban_compressed_responses_total', 'Responses sent compressed, by encoding.')
+compression_cache_lookups = Counter(
+    'kanban_compression_cache_lookups_total', 'Compressed body cache lookups by result (hit or miss).')
+rate_limit_decisions = Counter(
+    'kanban_rate_limit_decisions_total', 'Rate limit checks by rule and outcome (allowed, limited, dry_run_limited).')
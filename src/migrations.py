@@ -0,0 +1,149 @@
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from src.stats import RECOMPUTE_STATEMENTS, TRIGGER_STATEMENTS
+
+
+def add_column(table, column, definition):
+    """ALTER TABLE ... ADD COLUMN, skipped when the column exists (create_all adds it to new tables).
+
+    Two workers starting together can both find the column missing; the
+    loser's duplicate column error is ignored.
+    """
+    def apply(conn):
+        if column in {existing['name'] for existing in inspect(conn).get_columns(table)}:
+            return
+        try:
+            with conn.begin_nested():
+                conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {definition}'))
+        except OperationalError as e:
+            if 'duplicate column' not in str(e).lower():
+                raise
+    return apply
+
+
+# Versioned schema changes applied on top of Base.metadata.create_all().
+# Each entry is (version, description, statements); never edit a shipped
+# entry, append a new version instead. Statements must be idempotent so a
+# migration interrupted half way can simply be re-run. statements is either a
+# list for every dialect or {dialect_name: [...]} for dialect specific
+# changes; other dialects only record the version. A statement is SQL or a
+# function called with the connection.
+MIGRATIONS = [
+    (1, 'Add indexes for assignment lookups and column listings', [
+        # Task.to_dict / serialize_tasks: WHERE task_id IN (...) ORDER BY id
+        'CREATE INDEX IF NOT EXISTS idx_assignments_task ON user_task_assignments (task_id)',
+        # User.to_dict / serialize_users and delete_user
+        'CREATE INDEX IF NOT EXISTS idx_assignments_user ON user_task_assignments (user_id)',
+        # GET /api/tasks?column=... (rowid is implicitly appended, so keyset order is free)
+        'CREATE INDEX IF NOT EXISTS idx_tasks_column ON tasks (current_column)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_column_created ON tasks (current_column, date_created)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks (deadline)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (date_completed)',
+    ]),
+    (2, 'Add FTS5 full-text index over task titles and descriptions', {'sqlite': [
+        # External content table: the text lives in tasks only, tasks_fts holds the index.
+        # unicode61 case-folds Cyrillic as well as Latin; prefix indexes keep "ab*" fast
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+        "title, description, content='tasks', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        'CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN '
+        'INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description); '
+        'END',
+        'CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN '
+        "INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+        'END',
+        # Moves and other field changes do not touch the index
+        'CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN '
+        "INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+        'INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description); '
+        'END',
+        # Index the tasks that existed before the triggers
+        "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+    ]}),
+    (3, 'Add index for sorting tasks by creation date', [
+        # GET /api/tasks?sort=-date_created without a column filter
+        'CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (date_created)',
+    ]),
+    # Trigger SQL is generated from the bucket and metric definitions in src/stats.py
+    (4, 'Add trigger-maintained board stats', {
+        'sqlite': TRIGGER_STATEMENTS + RECOMPUTE_STATEMENTS,
+    }),
+    (5, 'Add per-task version for the serialized task cache', [
+        add_column('tasks', 'version', "INTEGER NOT NULL DEFAULT 0"),
+    ]),
+    # Other dialects keep version 0, so the task cache is only used on SQLite
+    (6, 'Bump task versions on task and assignment changes', {'sqlite': [
+        # The WHEN clause skips the trigger's own version update
+        'CREATE TRIGGER IF NOT EXISTS tasks_version_update AFTER UPDATE ON tasks '
+        'WHEN new.version = old.version BEGIN '
+        'UPDATE tasks SET version = old.version + 1 WHERE id = new.id; '
+        'END',
+        'CREATE TRIGGER IF NOT EXISTS tasks_version_assign AFTER INSERT ON user_task_assignments BEGIN '
+        'UPDATE tasks SET version = version + 1 WHERE id = new.task_id; '
+        'END',
+        'CREATE TRIGGER IF NOT EXISTS tasks_version_unassign AFTER DELETE ON user_task_assignments BEGIN '
+        'UPDATE tasks SET version = version + 1 WHERE id = old.task_id; '
+        'END',
+    ]}),
+]
+
+
+def _ensure_migrations_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_migrations ('
+            'version INTEGER PRIMARY KEY, '
+            'description VARCHAR(255) NOT NULL, '
+            'applied_at INTEGER NOT NULL)'
+        ))
+
+
+def applied_versions(engine):
+    """Versions already recorded in schema_migrations."""
+    _ensure_migrations_table(engine)
+    with engine.connect() as conn:
+        return {version for (version,) in conn.execute(text('SELECT version FROM schema_migrations'))}
+
+
+def upgrade(engine):
+    """Apply every pending migration in order.
+
+    A migration is not atomic: pysqlite runs DDL outside of a transaction,
+    so an interrupted migration can leave some statements applied. Re-running
+    it is safe only because every statement is idempotent.
+
+    Returns the list of versions applied by this call.
+    """
+    applied = applied_versions(engine)
+    newly_applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        if isinstance(statements, dict):
+            statements = statements.get(engine.dialect.name, [])
+        try:
+            with engine.begin() as conn:
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(text(statement))
+                conn.execute(
+                    text('INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)'),
+                    {'v': version, 'd': description, 't': int(time.time())}
+                )
+        except IntegrityError:
+            # Another worker applied the same migration concurrently
+            continue
+        newly_applied.append(version)
+    return newly_applied
+
+
+def status(engine):
+    """Return [(version, description, applied)] for every known migration."""
+    applied = applied_versions(engine)
+    return [(version, description, version in applied) for version, description, _ in MIGRATIONS]
@@ -21,10 +21,16 @@ class User(Base):
     created_at = Column(DateTime, nullable=False, default=func.now())
     
     # Relationship to tasks through bridge table
-    task_assignments = relationship("UserTaskAssignment", back_populates="user", cascade="all, delete-orphan")
+    task_assignments = relationship("UserTaskAssignment", back_populates="user", cascade="all, delete-orphan",
+                                    order_by="UserTaskAssignment.id")
     
-    def to_dict(self):
-        """Convert the user to a dictionary."""
+    def to_dict(self, task_ids=None):
+        """Convert the user to a dictionary.
+        
+        task_ids can be passed in by batched serializers to skip the lazy load of task_assignments.
+        """
+        if task_ids is None:
+            task_ids = [assignment.task_id for assignment in self.task_assignments]
         return {
             'id': str(self.id),  # Convert to string to prevent JS precision loss
             'username': self.username,
@@ -33,7 +39,7 @@ class User(Base):
             'is_admin': self.is_admin,
             'date_created': self.date_created,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'tasks_assigned': [str(assignment.task_id) for assignment in self.task_assignments]  # Convert to strings
+            'tasks_assigned': [str(task_id) for task_id in task_ids]  # Convert to strings
         }
     
     def __repr__(self):
@@ -53,12 +59,19 @@ class Task(Base):
     date_completed = Column(Integer)  # Unix timestamp
     current_column = Column(String(20), nullable=False, default='todo')  # Changed default from 'pool' to 'todo'
     created_at = Column(DateTime, nullable=False, default=func.now())
+    version = Column(Integer, nullable=False, default=0, server_default='0')  # Bumped when the task or its assignees change
     
     # Relationship to users through bridge table
-    user_assignments = relationship("UserTaskAssignment", back_populates="task", cascade="all, delete-orphan")
+    user_assignments = relationship("UserTaskAssignment", back_populates="task", cascade="all, delete-orphan",
+                                    order_by="UserTaskAssignment.id")
     
-    def to_dict(self):
-        """Convert the task to a dictionary."""
+    def to_dict(self, assignee_ids=None):
+        """Convert the task to a dictionary.
+        
+        assignee_ids can be passed in by batched serializers to skip the lazy load of user_assignments.
+        """
+        if assignee_ids is None:
+            assignee_ids = [assignment.user_id for assignment in self.user_assignments]
         return {
             'id': str(self.id),  # Convert large IDs to strings to prevent JS precision loss
             'title': self.title,  # Changed from 'name' to 'title'
@@ -69,7 +82,7 @@ class Task(Base):
             'date_completed': self.date_completed,
             'current_column': self.current_column,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'assignees': [str(assignment.user_id) for assignment in self.user_assignments]  # Convert to strings
+            'assignees': [str(user_id) for user_id in assignee_ids]  # Convert to strings
         }
     
     def __repr__(self):
@@ -103,3 +116,54 @@ class UserTaskAssignment(Base):
     
     def __repr__(self):
         return f"<UserTaskAssignment(user_id={self.user_id}, task_id={self.task_id})>"
+
+
+class TaskChange(Base):
+    """SQLAlchemy model for task_changes log table used by delta sync."""
+    __tablename__ = 'task_changes'
+    
+    # AUTOINCREMENT so sequence numbers are never reused after compaction
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(Integer, nullable=False)
+    kind = Column(String(10), nullable=False)  # 'upsert' or 'delete'
+    date_created = Column(Integer, nullable=False)  # Unix timestamp
+    
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    def __repr__(self):
+        return f"<TaskChange(seq={self.seq}, task_id={self.task_id}, kind='{self.kind}')>"
+
+
+class RevokedToken(Base):
+    """SQLAlchemy model for revoked_tokens table (logged out or rotated session tokens)."""
+    __tablename__ = 'revoked_tokens'
+    
+    jti = Column(String(32), primary_key=True)  # Token ID claim
+    expires_at = Column(Integer, nullable=False)  # Unix timestamp, row can be purged after this
+    
+    def __repr__(self):
+        return f"<RevokedToken(jti='{self.jti}', expires_at={self.expires_at})>"
+
+
+class TaskStat(Base):
+    """SQLAlchemy model for task_stats aggregates, kept current by SQLite triggers (see src/stats.py)."""
+    __tablename__ = 'task_stats'
+    
+    metric = Column(String(20), primary_key=True)  # 'column', 'priority', 'wip', 'cycle_time' or 'throughput'
+    key = Column(String(40), primary_key=True)  # Column, priority, user ID, histogram bucket or week start
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<TaskStat(metric='{self.metric}', key='{self.key}', count={self.count})>"
+
+
+class IdLease(Base):
+    """SQLAlchemy model for id_leases table (snowflake instance IDs leased by worker processes)."""
+    __tablename__ = 'id_leases'
+    
+    instance_id = Column(Integer, primary_key=True, autoincrement=False)  # 0-1023
+    owner = Column(String(255), nullable=False)  # host:pid:nonce of the leasing process
+    expires_at = Column(Integer, nullable=False)  # Unix timestamp
+    
+    def __repr__(self):
+        return f"<IdLease(instance_id={self.instance_id}, owner='{self.owner}', expires_at={self.expires_at})>"
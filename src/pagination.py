@@ -0,0 +1,126 @@
+import base64
+import binascii
+import json
+
+from sqlalchemy import and_, or_
+
+# Types a sort value can have in a cursor: those of the sortable columns
+_SORT_VALUE_TYPES = (str, int, float, type(None))
+
+# Page size used when the client does not pass ?limit=
+DEFAULT_PAGE_SIZE = 100
+# Hard cap on ?limit= so a single request can never pull a whole table
+MAX_PAGE_SIZE = 500
+# Explicit opt-in for the legacy unbounded list response
+UNBOUNDED_LIMIT = 'all'
+
+
+def encode_cursor(position):
+    """Encode a keyset position as an opaque cursor string.
+
+    position is the last seen snowflake ID, or [sort_value, id] for lists
+    sorted by another column. Both are stored as JSON, so ID cursors are the
+    same as before sorting existed.
+    """
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor back into its position."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if isinstance(position, list) and len(position) == 2 and type(position[1]) is int \
+            and type(position[0]) in _SORT_VALUE_TYPES:
+        return position
+    if type(position) is int:
+        return position
+    raise ValueError('Invalid cursor')
+
+
+def parse_page_args(args):
+    """Read limit/after from the query string.
+
+    Returns (limit, after). limit is None when the client explicitly asked for
+    the unbounded list with ?limit=all. Raises ValueError on bad input.
+    """
+    raw_limit = args.get('limit')
+    if raw_limit == UNBOUNDED_LIMIT:
+        limit = None
+    elif raw_limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValueError('Invalid limit')
+        if limit < 1:
+            raise ValueError('Invalid limit')
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    after = args.get('after')
+    if after is not None:
+        after = decode_cursor(after)
+
+    return limit, after
+
+
+def _after_condition(id_column, sort_column, descending, after):
+    """Rows strictly after the cursor position in (sort_column, id_column) order.
+
+    SQLite sorts NULLs first ascending and last descending, and the
+    conditions follow that so nullable columns like deadline page correctly.
+    """
+    if sort_column is None:
+        return id_column < after if descending else id_column > after
+
+    if not isinstance(after, list):
+        raise ValueError('Cursor does not match sort')
+    value, last_id = after
+    id_after = id_column < last_id if descending else id_column > last_id
+    if value is None:
+        if descending:
+            return and_(sort_column.is_(None), id_after)
+        return or_(and_(sort_column.is_(None), id_after), sort_column.is_not(None))
+    value_after = sort_column < value if descending else sort_column > value
+    tie_after = and_(sort_column == value, id_after)
+    if descending:
+        return or_(value_after, tie_after, sort_column.is_(None))
+    return or_(value_after, tie_after)
+
+
+def paginate(query, id_column, limit, after, sort_column=None, descending=False):
+    """Apply keyset pagination on (sort_column, id_column) to a query.
+
+    sort_column None (or id_column itself) pages by ID alone. Returns
+    (rows, next_cursor); next_cursor is None on the last page. Raises
+    ValueError for a cursor taken from a list with a different sort.
+    """
+    if sort_column is not None and sort_column is id_column:
+        sort_column = None
+
+    if after is not None:
+        if sort_column is None and not isinstance(after, int):
+            raise ValueError('Cursor does not match sort')
+        query = query.filter(_after_condition(id_column, sort_column, descending, after))
+
+    order = [id_column.desc() if descending else id_column]
+    if sort_column is not None:
+        order.insert(0, sort_column.desc() if descending else sort_column)
+    query = query.order_by(*order)
+
+    if limit is None:
+        return query.all(), None
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if sort_column is None:
+            return rows, encode_cursor(last.id)
+        return rows, encode_cursor([getattr(last, sort_column.key), last.id])
+    return rows, None
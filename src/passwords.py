@@ -0,0 +1,77 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+from src import config
+from src.instrumentation import record_argon2
+
+# Single hasher shared by every blueprint so cost parameters live in one place
+ph = PasswordHasher(
+    time_cost=config.ARGON2_TIME_COST,
+    memory_cost=config.ARGON2_MEMORY_COST,
+    parallelism=config.ARGON2_PARALLELISM,
+)
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool and its queue are full."""
+
+
+class HashingPool:
+    """Size-limited executor for Argon2 work.
+
+    At most `workers` hashes run at once (argon2-cffi releases the GIL) and
+    at most `queue_depth` more wait for a slot. Anything beyond that fails
+    fast with HasherBusy instead of piling up memory-hungry hashes.
+    """
+
+    def __init__(self, workers, queue_depth):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='argon2')
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+
+    def run(self, operation, fn, *args):
+        """Run fn(*args) on the pool, wait for its result and record its timing under operation."""
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            start = time.perf_counter()
+            result, compute_time = self._executor.submit(_timed, fn, *args).result()
+            record_argon2(operation, compute_time, time.perf_counter() - start)
+            return result
+        finally:
+            self._slots.release()
+
+
+def _timed(fn, *args):
+    """Call fn(*args) and return (result, seconds it took), excluding the wait for a worker."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+hashing_pool = HashingPool(config.HASH_WORKERS, config.HASH_QUEUE_DEPTH)
+
+
+def hash_password(password):
+    """Hash a password with the configured Argon2id parameters."""
+    return hashing_pool.run('hash', ph.hash, password)
+
+
+def _verify(password_hash, password):
+    try:
+        return ph.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def verify_password(password_hash, password):
+    """Check a password against its stored hash."""
+    return hashing_pool.run('verify', _verify, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """Whether a stored hash was made with outdated parameters (cheap, no hashing)."""
+    return ph.check_needs_rehash(password_hash)
@@ -0,0 +1,130 @@
+from sqlalchemy import and_, exists, or_
+from werkzeug.datastructures import MultiDict
+
+from src.changelog import MAX_CHANGES_PER_REQUEST
+from src.export import export_query
+from src.filters import parse_sort, parse_task_filters
+from src.models import Task, TaskChange, TaskStat, User, UserTaskAssignment
+from src.pagination import DEFAULT_PAGE_SIZE
+from src.reads import task_list_query
+from src.stats import METRIC_COLUMN, METRIC_CYCLE_TIME, METRIC_PRIORITY, METRIC_THROUGHPUT, METRIC_WIP
+
+# Plan steps that do not read a table
+_HARMLESS_SCANS = ('SCAN CONSTANT ROW',)
+
+
+def _task_list_query(db, query_string='', after=None):
+    """The query GET /api/tasks runs for a filter/sort query string, first page unless after is given."""
+    args = MultiDict(pair.split('=', 1) for pair in query_string.split('&') if pair)
+    sort_column, descending = parse_sort(args)
+    query = task_list_query(db, sort_column, parse_task_filters(args))
+    if after is not None:
+        # Cursor condition of the default ID order
+        query = query.filter(Task.id > after)
+    # paginate() would run the query; rebuild its ORDER BY/LIMIT instead
+    order = [Task.id.desc() if descending else Task.id]
+    if sort_column is not Task.id:
+        order.insert(0, sort_column.desc() if descending else sort_column)
+    return query.order_by(*order).limit(DEFAULT_PAGE_SIZE + 1)
+
+
+def hot_queries(db):
+    """Queries issued by the API, as (endpoint, query, allowed_scan_reason).
+
+    allowed_scan_reason is None for queries that must be answered from an
+    index; a full scan of those is reported as a problem.
+    """
+    page = DEFAULT_PAGE_SIZE + 1
+    return [
+        ('GET /api/tasks', _task_list_query(db), 'first page stops after LIMIT rows in rowid order'),
+        ('GET /api/tasks?after=', _task_list_query(db, after=1), None),
+        ('GET /api/tasks?column=', _task_list_query(db, 'column=todo'), None),
+        ('GET /api/tasks?assignee=', _task_list_query(db, 'assignee=1,2'), None),
+        ('GET /api/tasks?assignee=none', _task_list_query(db, 'assignee=none'),
+         'unassigned tasks are found by probing each task, stops after LIMIT rows'),
+        ('GET /api/tasks?priority=', _task_list_query(db, 'priority=high'), None),
+        # Range filters in ID order: SQLite prefers walking the rowid and stopping
+        # after LIMIT matches over sorting the whole index range
+        ('GET /api/tasks?deadline_before=', _task_list_query(db, 'deadline_before=2025-01-01'),
+         'ID order, stops after LIMIT matching rows'),
+        ('GET /api/tasks?completed=', _task_list_query(db, 'completed=true'),
+         'ID order, stops after LIMIT matching rows'),
+        ('GET /api/tasks?created_after=', _task_list_query(db, 'created_after=1700000000'),
+         'ID order, stops after LIMIT matching rows'),
+        ('GET /api/tasks?deadline_before=&sort=deadline',
+         _task_list_query(db, 'deadline_before=2025-01-01&sort=deadline'), None),
+        ('GET /api/tasks?sort=-date_created', _task_list_query(db, 'sort=-date_created'),
+         'walks idx_tasks_created in sort order, stops after LIMIT rows'),
+        ('GET /api/tasks?sort=deadline', _task_list_query(db, 'sort=deadline'),
+         'walks idx_tasks_deadline in sort order, stops after LIMIT rows'),
+        ('GET /api/tasks?column=&sort=', _task_list_query(db, 'column=todo&sort=-date_created'), None),
+        ('GET /api/tasks/export', export_query(db, []), 'exports every task in rowid order'),
+        ('GET /api/tasks/export?column=', export_query(db, [Task.current_column == 'todo']), None),
+        ('GET /api/tasks/<id>', db.query(Task).filter(Task.id == 1), None),
+        ('serialize_tasks',
+         db.query(UserTaskAssignment.task_id, UserTaskAssignment.user_id)
+         .filter(UserTaskAssignment.task_id.in_([1, 2])).order_by(UserTaskAssignment.id), None),
+        ('GET /api/users', db.query(User).order_by(User.id).limit(page),
+         'first page stops after LIMIT rows in rowid order'),
+        ('GET /api/users?after=', db.query(User).filter(User.id > 1).order_by(User.id).limit(page), None),
+        ('GET /api/users/<id>', db.query(User).filter(User.id == 1), None),
+        ('serialize_users',
+         db.query(UserTaskAssignment.user_id, UserTaskAssignment.task_id)
+         .filter(UserTaskAssignment.user_id.in_([1, 2])).order_by(UserTaskAssignment.id), None),
+        ('POST /api/auth/login', db.query(User).filter(User.username == 'admin'), None),
+        ('POST /api/tasks/<id>/assign', db.query(
+            exists().where(Task.id == 1),
+            exists().where(User.id == 1),
+            exists().where(and_(UserTaskAssignment.task_id == 1, UserTaskAssignment.user_id == 1))
+        ), None),
+        ('POST /api/tasks/<id>/unassign', db.query(UserTaskAssignment).filter(
+            UserTaskAssignment.user_id == 1, UserTaskAssignment.task_id == 1), None),
+        ('PUT /api/tasks/<id>/assignees',
+         db.query(UserTaskAssignment.user_id).filter(UserTaskAssignment.task_id == 1), None),
+        ('DELETE /api/users/<id>',
+         db.query(UserTaskAssignment.task_id).filter(UserTaskAssignment.user_id == 1), None),
+        ('GET /api/tasks/changes',
+         db.query(TaskChange.seq, TaskChange.task_id, TaskChange.kind)
+         .filter(TaskChange.seq > 1).order_by(TaskChange.seq).limit(MAX_CHANGES_PER_REQUEST), None),
+        ('GET /api/stats', db.query(TaskStat.metric, TaskStat.key, TaskStat.count).filter(or_(
+            TaskStat.metric.in_([METRIC_COLUMN, METRIC_PRIORITY, METRIC_WIP, METRIC_CYCLE_TIME]),
+            and_(TaskStat.metric == METRIC_THROUGHPUT, TaskStat.key >= '2025-01-06')
+        )), None),
+        ('GET /api/board', db.query(Task).order_by(Task.id), 'returns the whole board'),
+        ('GET /api/assignments', db.query(UserTaskAssignment), 'returns every assignment'),
+    ]
+
+
+def explain_hot_queries(db):
+    """Run EXPLAIN QUERY PLAN for every hot query (SQLite only).
+
+    Returns [(endpoint, plan_details, allowed_scan, problem)] where problem is
+    None or a description of an unexpected full scan.
+    """
+    report = []
+    for endpoint, query, allowed_scan in hot_queries(db):
+        sql = str(query.statement.compile(bind=db.get_bind(), compile_kwargs={'literal_binds': True}))
+        plan = [row[-1] for row in db.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+        scans = [detail for detail in plan if detail.startswith('SCAN ') and detail not in _HARMLESS_SCANS]
+        problem = None
+        if scans and allowed_scan is None:
+            problem = f'full scan: {"; ".join(scans)}'
+        report.append((endpoint, plan, allowed_scan if scans else None, problem))
+    return report
+
+
+def print_query_plan_report(db):
+    """Print the query plan of every hot query; returns the number of problems."""
+    problems = 0
+    for endpoint, plan, allowed_scan, problem in explain_hot_queries(db):
+        if problem:
+            status = 'FULL SCAN'
+        elif allowed_scan:
+            status = f'ok (scan: {allowed_scan})'
+        else:
+            status = 'ok'
+        print(f'{endpoint:<32} {status}')
+        for detail in plan:
+            print(f'    {detail}')
+        problems += problem is not None
+    return problems
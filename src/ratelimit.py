@@ -0,0 +1,167 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify, request
+
+from src import config
+from src.metrics import rate_limit_decisions
+
+logger = logging.getLogger(__name__)
+
+MODE_ENFORCE = 'enforce'
+MODE_DRY_RUN = 'dry-run'
+MODE_OFF = 'off'
+
+# Per-route budgets: key kind -> (burst capacity, seconds to refill the whole bucket)
+RATE_LIMITS = {
+    'auth.login': {
+        'ip': (20, 60),
+        'username': (5, 60),
+    },
+    'users.write': {
+        'ip': (10, 60),
+    },
+}
+
+# Buckets idle for this long are deleted (seconds)
+BUCKET_IDLE_TTL = 3600
+# Checks between opportunistic cleanups in one process
+CLEANUP_EVERY = 1000
+
+# One atomic statement per check: refill, take a token if there is one, report
+_TAKE_SQL = '''
+INSERT INTO buckets (key, tokens, updated, allowed) VALUES (:key, :capacity - 1, :now, 1)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = MIN(:capacity, tokens + (:now - updated) * :rate)
+        - (MIN(:capacity, tokens + (:now - updated) * :rate) >= 1),
+    allowed = MIN(:capacity, tokens + (:now - updated) * :rate) >= 1,
+    updated = :now
+RETURNING tokens, allowed
+'''
+
+
+class BucketStore:
+    """Token buckets in a small SQLite file shared by the worker processes of a host.
+
+    Kept apart from the main database so limiter writes never contend with
+    API writes. Durability does not matter here, so it runs with
+    synchronous=OFF and every check is one short transaction of UPSERTs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=1)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, allowed INTEGER NOT NULL)'
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, buckets):
+        """Take one token from every (key, capacity, period) bucket, or from none of them.
+
+        Returns seconds until every bucket has a token, or 0 if taken. A
+        request rejected by one bucket does not drain the others.
+        """
+        now = time.time()
+        conn = self._connection()
+        retry_after = 0
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for key, capacity, period in buckets:
+                rate = capacity / period
+                tokens, allowed = conn.execute(
+                    _TAKE_SQL, {'key': key, 'capacity': capacity, 'rate': rate, 'now': now}
+                ).fetchone()
+                if not allowed:
+                    retry_after = max(retry_after, 1, math.ceil((1 - tokens) / rate))
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        # Undoing the debits also undoes the refills, which are recomputed on the next check
+        conn.execute('ROLLBACK' if retry_after else 'COMMIT')
+
+        with self._lock:
+            self._checks += 1
+            cleanup = self._checks % CLEANUP_EVERY == 0
+        if cleanup:
+            conn.execute('DELETE FROM buckets WHERE updated < ?', (now - BUCKET_IDLE_TTL,))
+
+        return retry_after
+
+
+class RateLimiter:
+    """Checks requests against RATE_LIMITS and counts the decisions in /api/metrics."""
+
+    def __init__(self, store, mode):
+        self.store = store
+        self.mode = mode
+
+    def _count(self, rule, outcome):
+        # outcome is 'allowed', 'limited' or 'dry_run_limited'
+        rate_limit_decisions.inc(rule=rule, outcome=outcome)
+
+    def check(self, rule, keys):
+        """Take a token for every (kind, value) key of a rule, only if all of them have one.
+
+        Returns the Retry-After seconds when the request must be rejected, else None.
+        """
+        if self.mode == MODE_OFF:
+            return None
+
+        try:
+            retry_after = self.store.take([
+                (f'{rule}:{kind}:{value}', *RATE_LIMITS[rule][kind]) for kind, value in keys
+            ])
+        except sqlite3.Error:
+            # Never let the limiter take the API down: fail open
+            logger.exception('Rate limiter store unavailable')
+            return None
+
+        if not retry_after:
+            self._count(rule, 'allowed')
+            return None
+        if self.mode == MODE_DRY_RUN:
+            self._count(rule, 'dry_run_limited')
+            logger.info('Rate limit %s would reject %s (retry after %ss)', rule, keys, retry_after)
+            return None
+        self._count(rule, 'limited')
+        return retry_after
+
+
+limiter = RateLimiter(BucketStore(config.RATE_LIMIT_DB), config.RATE_LIMIT_MODE)
+
+
+def rate_limited(rule):
+    """Apply the RATE_LIMITS budget of a rule to a view, keyed by client IP and, if the rule has one, username."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            keys = [('ip', request.remote_addr)]
+            if 'username' in RATE_LIMITS[rule]:
+                data = request.get_json(silent=True)
+                if isinstance(data, dict) and isinstance(data.get('username'), str):
+                    keys.append(('username', data['username'].lower()))
+
+            retry_after = limiter.check(rule, keys)
+            if retry_after is not None:
+                return jsonify({'error': 'Too many requests'}), 429, {'Retry-After': str(retry_after)}
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
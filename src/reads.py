@@ -0,0 +1,65 @@
+from src.filters import parse_sort, parse_task_filters
+from src.fragments import encode_fragment
+from src.models import Task, User, UserTaskAssignment
+from src.pagination import parse_page_args, paginate
+from src.serializers import serialize_task_fragments, serialize_users
+
+# Read endpoints shared by the Flask blueprints and the async app in src/asgi.py.
+# They only use the synchronous Session API, so the async app runs them
+# unchanged through AsyncSession.run_sync() without blocking a thread.
+
+
+def task_list_query(db, sort_column, filters):
+    """The query GET /api/tasks pages through: IDs and versions, plus the sort column."""
+    columns = [Task.id, Task.version] + ([sort_column] if sort_column is not Task.id else [])
+    return db.query(*columns).filter(*filters)
+
+
+def list_tasks(db, args):
+    """Response body of GET /api/tasks, as JSON bytes. Raises ValueError on bad query arguments.
+
+    Only IDs and versions are queried; the tasks themselves come from the
+    serialized task cache, so unchanged tasks are neither loaded nor encoded.
+    """
+    limit, after = parse_page_args(args)
+    sort_column, descending = parse_sort(args)
+
+    query = task_list_query(db, sort_column, parse_task_filters(args))
+    rows, next_cursor = paginate(query, Task.id, limit, after, sort_column, descending)
+    items = b'[' + b','.join(serialize_task_fragments(db, [(row.id, row.version) for row in rows])) + b']'
+    if limit is None:
+        # Legacy unbounded response, only when explicitly requested
+        return items + b'\n'
+    # Keys in sorted order, like jsonify
+    return b'{"items":' + items + b',"next_cursor":' + encode_fragment(next_cursor) + b'}\n'
+
+
+def get_task(db, task_id):
+    """Response body of GET /api/tasks/<id>, or None if the task does not exist."""
+    task = db.query(Task).filter(Task.id == task_id).first()
+    return task.to_dict() if task else None
+
+
+def list_users(db, args):
+    """Response body of GET /api/users. Raises ValueError on bad query arguments."""
+    limit, after = parse_page_args(args)
+
+    users, next_cursor = paginate(db.query(User), User.id, limit, after)
+    if limit is None:
+        # Legacy unbounded response, only when explicitly requested
+        return serialize_users(db, users)
+    return {
+        'items': serialize_users(db, users),
+        'next_cursor': next_cursor
+    }
+
+
+def get_user(db, user_id):
+    """Response body of GET /api/users/<id>, or None if the user does not exist."""
+    user = db.query(User).filter(User.id == user_id).first()
+    return user.to_dict() if user else None
+
+
+def list_assignments(db):
+    """Response body of GET /api/assignments."""
+    return [assignment.to_dict() for assignment in db.query(UserTaskAssignment).all()]
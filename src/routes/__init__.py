@@ -1,23 +1,99 @@
-from flask import Flask, jsonify, g
+import logging
+import os
+import secrets
+
+from flask import Flask, jsonify, g, request
 from flask_cors import CORS
 
-from src.database import SessionLocal
+from src import config
+from src.compression import compress_response
+from src.database import engine
+from src.instrumentation import UNMATCHED_ROUTE, finish_request, instrument_engine, start_request
+from src.tokens import InvalidToken, bearer_token, decode_token
 from .users import users_bp
 from .tasks import tasks_bp
 from .auth import auth_bp
 from .health import health_bp
+from .board import board_bp
+from .events import events_bp
+from .stats import stats_bp
+from .metrics import metrics_bp
+
+logger = logging.getLogger(__name__)
+
+
+def _secret_key(debug):
+    """KANBAN_SECRET_KEY; in debug mode a random key is made up instead, with a warning.
+
+    A per-process key would make every worker reject the others' tokens, so
+    outside debug mode a missing key fails the start.
+    """
+    if config.SECRET_KEY:
+        return config.SECRET_KEY
+    if not debug:
+        raise RuntimeError('KANBAN_SECRET_KEY must be set (or KANBAN_DEBUG enabled)')
+    logger.warning('KANBAN_SECRET_KEY is not set; using a random key, tokens will not survive a restart')
+    # Inherited by the debug reloader's processes, so a reload keeps everyone logged in
+    return os.environ.setdefault('KANBAN_SECRET_KEY', secrets.token_hex(32))
+
 
-def create_app():
-    """Create and configure the Flask application."""
+def create_app(debug=None):
+    """Create and configure the Flask application (debug defaults to KANBAN_DEBUG)."""
+    debug = config.DEBUG if debug is None else debug
     app = Flask(__name__)
     CORS(app, origins='*')
-    app.config['SECRET_KEY'] = 'your-secret-key-here'  # Change this in production
+    app.config['SECRET_KEY'] = _secret_key(debug)
+    app.config['DEBUG'] = debug
 
     # Register blueprints
     app.register_blueprint(users_bp)
     app.register_blueprint(tasks_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(health_bp)
+    app.register_blueprint(board_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(metrics_bp)
+
+    instrument_engine(engine)
+
+    # Registered first so requests rejected by later hooks are timed too
+    @app.before_request
+    def start_timing():
+        """Start counting statements and time for the request metrics."""
+        g.timings = start_request(request.method, request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE)
+
+    @app.before_request
+    def load_token_claims():
+        """Validate the bearer token, if any, in memory and expose its claims as g.token_claims.
+
+        An invalid token leaves the request anonymous, so a stale token does
+        not lock a client out of logging in; login_required rejects it.
+        """
+        g.token_claims = None
+        g.token_error = None
+        token = bearer_token(request)
+        if token is None:
+            return None
+        try:
+            g.token_claims = decode_token(token, app.config['SECRET_KEY'])
+        except InvalidToken as e:
+            g.token_error = str(e)
+
+    @app.after_request
+    def finish_timing(response):
+        """Record the request metrics and add the Server-Timing header."""
+        timings = g.pop('timings', None)
+        if timings is not None:
+            # Streamed bodies have no known size and are timed up to their headers
+            response.headers['Server-Timing'] = finish_request(timings, response.status_code, response.content_length)
+        return response
+
+    # Registered after finish_timing, so it runs first and the metrics see the size sent
+    @app.after_request
+    def compress(response):
+        """Compress the body for the client's Accept-Encoding."""
+        return compress_response(response, request.headers.get('Accept-Encoding'))
 
     @app.teardown_appcontext
     def close_db(error):
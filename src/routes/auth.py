@@ -1,15 +1,12 @@
-from flask import Blueprint, request, jsonify, g
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
-
+from flask import Blueprint, current_app, request, jsonify, g
 from src.database import SessionLocal
 from src.models import User
+from src.passwords import HasherBusy, hash_password, needs_rehash, verify_password
+from src.ratelimit import rate_limited
+from src.tokens import TOKEN_REFRESH, InvalidToken, decode_token, issue_token_pair, login_required, revocations
 
 auth_bp = Blueprint('auth', __name__)
 
-# Password hasher
-ph = PasswordHasher()
-
 def get_db_session():
     """Get database session for current request."""
     if 'db' not in g:
@@ -17,6 +14,7 @@ def get_db_session():
     return g.db
 
 @auth_bp.route('/api/auth/login', methods=['POST'])
+@rate_limited('auth.login')
 def login():
     """Authenticate a user."""
     data = request.get_json()
@@ -30,12 +28,71 @@ def login():
         return jsonify({'error': 'Invalid credentials'}), 401
     
     try:
-        ph.verify(user.password, data['password'])
-        # this practically just does nothing right now lol
-        # ideally id need to pass a jwt token here and then work with that 
+        if not verify_password(user.password, data['password']):
+            return jsonify({'error': 'Invalid credentials'}), 401
+        
+        # Upgrade hashes made with older Argon2 parameters while we have the plaintext
+        if needs_rehash(user.password):
+            try:
+                user.password = hash_password(data['password'])
+                db.commit()
+            except HasherBusy:
+                db.rollback()
+        
         return jsonify({
             'message': 'Login successful',
-            'user': user.to_dict()
+            'user': user.to_dict(),
+            **issue_token_pair(user, current_app.config['SECRET_KEY'])
         }), 200
-    except VerifyMismatchError:
+    except HasherBusy:
+        return jsonify({'error': 'Server busy, try again later'}), 503, {'Retry-After': '1'}
+
+
+@auth_bp.route('/api/auth/refresh', methods=['POST'])
+def refresh():
+    """Exchange a refresh token for a new token pair (the old refresh token is revoked)."""
+    data = request.get_json()
+    if not data or 'refresh_token' not in data:
+        return jsonify({'error': 'Missing refresh_token'}), 400
+    
+    secret = current_app.config['SECRET_KEY']
+    try:
+        claims = decode_token(data['refresh_token'], secret, TOKEN_REFRESH)
+    except InvalidToken as e:
+        return jsonify({'error': str(e)}), 401
+    
+    # Refreshing is rare, so this is where deleted users and admin changes are picked up
+    db = get_db_session()
+    user = db.query(User).filter(User.id == int(claims['sub'])).first()
+    if not user:
         return jsonify({'error': 'Invalid credentials'}), 401
+    
+    revocations.revoke(db, [claims])
+    return jsonify(issue_token_pair(user, secret)), 200
+
+@auth_bp.route('/api/auth/logout', methods=['POST'])
+@login_required
+def logout():
+    """Revoke the current access token and, if sent, its refresh token."""
+    revoked = [g.token_claims]
+    data = request.get_json(silent=True) or {}
+    if data.get('refresh_token'):
+        try:
+            revoked.append(decode_token(data['refresh_token'], current_app.config['SECRET_KEY'], TOKEN_REFRESH))
+        except InvalidToken:
+            pass
+    
+    revocations.revoke(get_db_session(), revoked)
+    return jsonify({'message': 'Logout successful'}), 200
+
+@auth_bp.route('/api/auth/me', methods=['GET'])
+@login_required
+def me():
+    """Get the identity carried by the access token, without a database lookup."""
+    claims = g.token_claims
+    return jsonify({
+        'id': claims['sub'],
+        'username': claims['name'],
+        'is_admin': claims['adm'],
+        'expires_at': claims['exp']
+    })
\ No newline at end of file
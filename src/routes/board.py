@@ -0,0 +1,53 @@
+from flask import Blueprint, current_app, g
+
+from src.cache import board_cache
+from src.conditional import etag_cached
+from src.database import SessionLocal
+from src.models import Task, User, UserTaskAssignment
+from src.types.task import VALID_COLUMNS
+
+board_bp = Blueprint('board', __name__)
+
+def get_db_session():
+    """Get database session for current request."""
+    if 'db' not in g:
+        g.db = SessionLocal()
+    return g.db
+
+def build_board(version):
+    """Build the serialized board snapshot in two queries."""
+    db = get_db_session()
+    
+    # Assignee summaries for every assignment, joined in a single query
+    assignee_ids = {}
+    assignee_users = {}
+    rows = (
+        db.query(UserTaskAssignment.task_id, User.id, User.username, User.display_name, User.profile_picture)
+        .join(User, User.id == UserTaskAssignment.user_id)
+        .order_by(UserTaskAssignment.id)
+    )
+    for task_id, user_id, username, display_name, profile_picture in rows:
+        assignee_ids.setdefault(task_id, []).append(user_id)
+        assignee_users.setdefault(task_id, []).append({
+            'id': str(user_id),  # Convert to string to prevent JS precision loss
+            'username': username,
+            'display_name': display_name,
+            'profile_picture': profile_picture
+        })
+    
+    columns = {column: [] for column in VALID_COLUMNS}
+    for task in db.query(Task).order_by(Task.id):
+        if task.current_column not in columns:
+            continue
+        task_dict = task.to_dict(assignee_ids=assignee_ids.get(task.id, []))
+        task_dict['assignee_users'] = assignee_users.get(task.id, [])
+        columns[task.current_column].append(task_dict)
+    
+    return current_app.json.dumps({'version': version, 'columns': columns})
+
+@board_bp.route('/api/board', methods=['GET'])
+@etag_cached('tasks', 'users', 'assignments')
+def get_board():
+    """Get all tasks grouped by column with assignee summaries inline."""
+    body = board_cache.get_or_build(build_board)
+    return current_app.response_class(body, mimetype='application/json')
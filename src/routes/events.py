@@ -0,0 +1,30 @@
+from flask import Blueprint, Response, jsonify
+
+from src.events import EVICTED, broker, subscribe
+
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/api/events', methods=['GET'])
+def stream_events():
+    """Stream task and assignment events as server-sent events."""
+    subscriber = subscribe()
+    if subscriber is None:
+        return jsonify({'error': 'Too many event subscribers'}), 503
+    
+    def generate():
+        try:
+            # Ask EventSource clients to reconnect quickly after eviction or restarts
+            yield 'retry: 3000\n\n'
+            while True:
+                message = subscriber.next_message()
+                if message is None:
+                    yield EVICTED
+                    return
+                yield message
+        finally:
+            broker.unsubscribe(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Disable proxy buffering
+    })
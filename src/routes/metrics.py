@@ -0,0 +1,10 @@
+from flask import Blueprint, Response
+
+from src.metrics import CONTENT_TYPE, render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics of every worker process."""
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
\ No newline at end of file
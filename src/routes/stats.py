@@ -0,0 +1,25 @@
+from flask import Blueprint, request, jsonify, g
+
+from src.database import SessionLocal
+from src.stats import StatsUnavailable, load_stats, parse_weeks
+
+stats_bp = Blueprint('stats', __name__)
+
+def get_db_session():
+    """Get database session for current request."""
+    if 'db' not in g:
+        g.db = SessionLocal()
+    return g.db
+
+@stats_bp.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Get board counts, assignee WIP, cycle time percentiles and weekly throughput."""
+    try:
+        weeks = parse_weeks(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        return jsonify(load_stats(get_db_session(), weeks))
+    except StatsUnavailable as e:
+        return jsonify({'error': str(e)}), 501
\ No newline at end of file
@@ -1,17 +1,25 @@
 import time
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, request, jsonify, g
 from sqlalchemy.exc import IntegrityError
-import snowflake
 
+from src.assignments import check_assignment, parse_user_ids, replace_task_assignees, resolve_user_ids
+from src.batch import MAX_BATCH_SIZE, apply_task_batch
+from src.changelog import CHANGE_DELETE, ChangeLogExpired, current_seq, load_changes, maybe_compact_changes, record_task_changes
+from src.conditional import etag_cached
+from src.counters import change_counters
 from src.database import SessionLocal
-from src.models import User, Task, UserTaskAssignment
+from src.events import publish_event
+from src.export import MIMETYPES, parse_export_args, stream_tasks
+from src.fragments import task_fragments
+from src.ids import next_id
+from src.models import Task, UserTaskAssignment
+from src.reads import get_task as read_task, list_assignments, list_tasks
+from src.search import SearchUnavailable, search_tasks
+from src.serializers import serialize_tasks
 from src.types.task import VALID_PRIORITIES, VALID_COLUMNS, PRIORITY_MEDIUM, COLUMN_TODO
 
 tasks_bp = Blueprint('tasks', __name__)
 
-# Snowflake ID generator
-snowflake_gen = snowflake.SnowflakeGenerator(42)
-
 def get_db_session():
     """Get database session for current request."""
     if 'db' not in g:
@@ -20,17 +28,67 @@ def get_db_session():
 
 # Task routes
 @tasks_bp.route('/api/tasks', methods=['GET'])
+@etag_cached('tasks', 'assignments')
 def get_tasks():
-    """Get all tasks."""
+    """Get a page of tasks ordered by ID (?limit=all for the full list)."""
+    try:
+        return Response(list_tasks(get_db_session(), request.args), mimetype='application/json')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@tasks_bp.route('/api/tasks/changes', methods=['GET'])
+def get_task_changes():
+    """Get tasks changed since a change log version (?since=latest to start syncing)."""
     db = get_db_session()
-    column = request.args.get('column')  # Filter by column if provided
+    since = request.args.get('since')
+    if since == 'latest':
+        since = current_seq(db)
+    else:
+        try:
+            since = int(since)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Missing or invalid since'}), 400
+    
+    maybe_compact_changes(db)
+    try:
+        upserted, deleted, version, has_more = load_changes(db, since)
+    except ChangeLogExpired:
+        return jsonify({'error': 'Changes since this version were compacted, refetch the full task list'}), 410
     
-    query = db.query(Task)
-    if column:
-        query = query.filter(Task.current_column == column)
+    tasks = db.query(Task).filter(Task.id.in_(upserted)).order_by(Task.id).all() if upserted else []
+    # Tasks deleted after the last entry of this batch are reported as tombstones too
+    found = {task.id for task in tasks}
+    deleted += [task_id for task_id in upserted if task_id not in found]
+    
+    return jsonify({
+        'version': version,
+        'has_more': has_more,
+        'tasks': serialize_tasks(db, tasks),
+        'deleted': [str(task_id) for task_id in deleted]
+    })
+
+@tasks_bp.route('/api/tasks/search', methods=['GET'])
+@etag_cached('tasks', 'assignments')
+def search():
+    """Full-text search over task titles and descriptions, best matches first."""
+    try:
+        return jsonify(search_tasks(get_db_session(), request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except SearchUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+
+@tasks_bp.route('/api/tasks/export', methods=['GET'])
+def export_tasks():
+    """Stream the tasks matching the filters as NDJSON (default) or CSV (?format=csv)."""
+    try:
+        file_format, conditions = parse_export_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    tasks = query.all()
-    return jsonify([task.to_dict() for task in tasks])
+    return Response(stream_tasks(file_format, conditions), mimetype=MIMETYPES[file_format], headers={
+        'Content-Disposition': f'attachment; filename="tasks.{file_format}"'
+    })
 
 @tasks_bp.route('/api/tasks/<task_id>', methods=['GET'])
 def get_task(task_id):
@@ -40,11 +98,10 @@ def get_task(task_id):
     except ValueError:
         return jsonify({'error': 'Invalid task ID'}), 400
     
-    db = get_db_session()
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    task = read_task(get_db_session(), task_id)
+    if task is None:
         return jsonify({'error': 'Task not found'}), 404
-    return jsonify(task.to_dict())
+    return jsonify(task)
 
 @tasks_bp.route('/api/tasks', methods=['POST'])
 def create_task():
@@ -60,7 +117,7 @@ def create_task():
     
     try:
         # Generate snowflake ID
-        task_id = next(snowflake_gen)
+        task_id = next_id()
         
         # Validate priority if provided
         priority = data.get('priority', PRIORITY_MEDIUM)
@@ -80,23 +137,28 @@ def create_task():
         )
         
         db.add(task)
-        db.commit()
         
-        # Handle assignees if provided
+        # Handle assignees if provided, skipping unknown users
+        assignee_ids = []
         if 'assignees' in data and data['assignees']:
-            for user_id in data['assignees']:
-                # Check if user exists
-                user = db.query(User).filter(User.id == user_id).first()
-                if user:
-                    assignment = UserTaskAssignment(user_id=user_id, task_id=task_id)
-                    db.add(assignment)
-            db.commit()
+            assignee_ids = resolve_user_ids(db, parse_user_ids(data['assignees']))
+            db.add_all([UserTaskAssignment(user_id=user_id, task_id=task_id) for user_id in assignee_ids])
         
-        return jsonify(task.to_dict()), 201
-    
+        # Task and assignments go in together
+        record_task_changes(db, [task_id])
+        db.commit()
+        if assignee_ids:
+            change_counters.bump('tasks', 'assignments')
+        else:
+            change_counters.bump('tasks')
+        
+        task_dict = task.to_dict(assignee_ids=assignee_ids)
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    publish_event('task.created', {'task': task_dict})
+    return jsonify(task_dict), 201
 
 @tasks_bp.route('/api/tasks/<task_id>', methods=['PUT'])
 def update_task(task_id):
@@ -116,6 +178,8 @@ def update_task(task_id):
         return jsonify({'error': 'Task not found'}), 404
     
     try:
+        previous_column = task.current_column
+        
         # Update fields if provided
         if 'title' in data:  # Changed from 'name' to 'title'
             task.title = data['title']
@@ -143,12 +207,21 @@ def update_task(task_id):
             if data['current_column'] == 'done' and not task.date_completed:
                 task.date_completed = int(time.time())
         
+        record_task_changes(db, [task_id])
         db.commit()
-        return jsonify(task.to_dict())
-    
+        change_counters.bump('tasks')
+        task_fragments.discard([task_id])
+        
+        task_dict = task.to_dict()
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    if task.current_column != previous_column:
+        publish_event('task.moved', {'from': previous_column, 'task': task_dict})
+    else:
+        publish_event('task.updated', {'task': task_dict})
+    return jsonify(task_dict)
 
 @tasks_bp.route('/api/tasks/<task_id>', methods=['DELETE'])
 def delete_task(task_id):
@@ -165,11 +238,65 @@ def delete_task(task_id):
     
     try:
         db.delete(task)
+        record_task_changes(db, [task_id], CHANGE_DELETE)
         db.commit()
-        return jsonify({'message': 'Task deleted successfully'}), 200
+        change_counters.bump('tasks', 'assignments')
+        task_fragments.discard([task_id])
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    publish_event('task.deleted', {'id': str(task_id)})
+    return jsonify({'message': 'Task deleted successfully'}), 200
+
+@tasks_bp.route('/api/tasks/batch', methods=['POST'])
+def batch_tasks():
+    """Create, update, move and delete many tasks in one transaction."""
+    data = request.get_json()
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not operations or not isinstance(operations, list):
+        return jsonify({'error': 'No operations provided'}), 400
+    
+    if len(operations) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Too many operations. Maximum is {MAX_BATCH_SIZE}'}), 400
+    
+    db = get_db_session()
+    
+    try:
+        results, created_ids, updated_ids, moved, deleted_ids = apply_task_batch(
+            db, operations, next_id
+        )
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    if created_ids or deleted_ids:
+        change_counters.bump('tasks', 'assignments')
+    elif updated_ids:
+        change_counters.bump('tasks')
+    task_fragments.discard(updated_ids + deleted_ids)
+    
+    # Attach the stored state of created and updated tasks to their results
+    touched_ids = created_ids + updated_ids
+    tasks = db.query(Task).filter(Task.id.in_(touched_ids)).all() if touched_ids else []
+    task_dicts = dict(zip([task.id for task in tasks], serialize_tasks(db, tasks)))
+    for result in results:
+        if 'id' in result:
+            if result['id'] in task_dicts:
+                result['task'] = task_dicts[result['id']]
+            result['id'] = str(result['id'])
+    
+    for task_id in created_ids:
+        publish_event('task.created', {'task': task_dicts[task_id]})
+    for task_id in updated_ids:
+        if task_id in moved:
+            publish_event('task.moved', {'from': moved[task_id], 'task': task_dicts[task_id]})
+        else:
+            publish_event('task.updated', {'task': task_dicts[task_id]})
+    for task_id in deleted_ids:
+        publish_event('task.deleted', {'id': str(task_id)})
+    
+    return jsonify({'results': results})
 
 # Task assignment routes
 @tasks_bp.route('/api/tasks/<task_id>/assign', methods=['POST'])
@@ -184,35 +311,80 @@ def assign_task(task_id):
     if not data or 'user_id' not in data:
         return jsonify({'error': 'Missing user_id'}), 400
     
+    try:
+        user_id = int(data['user_id'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid user ID'}), 400
+    
     db = get_db_session()
     
-    # Check if task exists
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    # Check task, user and existing assignment in a single query
+    task_exists, user_exists, already_assigned = check_assignment(db, task_id, user_id)
+    if not task_exists:
         return jsonify({'error': 'Task not found'}), 404
     
-    # Check if user exists
-    user = db.query(User).filter(User.id == data['user_id']).first()
-    if not user:
+    if not user_exists:
         return jsonify({'error': 'User not found'}), 404
     
-    # Check if assignment already exists
-    existing_assignment = db.query(UserTaskAssignment).filter(
-        UserTaskAssignment.user_id == data['user_id'],
-        UserTaskAssignment.task_id == task_id
-    ).first()
-    
-    if existing_assignment:
+    if already_assigned:
         return jsonify({'error': 'User already assigned to this task'}), 400
     
     try:
-        assignment = UserTaskAssignment(user_id=data['user_id'], task_id=task_id)
+        assignment = UserTaskAssignment(user_id=user_id, task_id=task_id)
         db.add(assignment)
+        record_task_changes(db, [task_id])
+        db.commit()
+        change_counters.bump('assignments')
+        task_fragments.discard([task_id])
+        
+        assignment_dict = assignment.to_dict()
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    publish_event('task.assigned', assignment_dict)
+    return jsonify(assignment_dict), 201
+
+@tasks_bp.route('/api/tasks/<task_id>/assignees', methods=['PUT'])
+def replace_assignees(task_id):
+    """Replace the whole assignee set of a task."""
+    try:
+        task_id = int(task_id)
+    except ValueError:
+        return jsonify({'error': 'Invalid task ID'}), 400
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('assignees'), list):
+        return jsonify({'error': 'Missing assignees'}), 400
+    
+    try:
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in data['assignees']))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid user ID'}), 400
+    
+    db = get_db_session()
+    task = db.query(Task).filter(Task.id == task_id).first()
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    try:
+        # Unknown users are skipped, like in create_task
+        added, removed, assignee_ids = replace_task_assignees(db, task_id, resolve_user_ids(db, user_ids))
+        if added or removed:
+            record_task_changes(db, [task_id])
         db.commit()
-        return jsonify(assignment.to_dict()), 201
+        
+        task_dict = task.to_dict(assignee_ids=assignee_ids)
+        if added or removed:
+            change_counters.bump('assignments')
+            task_fragments.discard([task_id])
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    if added or removed:
+        publish_event('task.updated', {'task': task_dict})
+    return jsonify(task_dict)
 
 @tasks_bp.route('/api/tasks/<task_id>/unassign', methods=['POST'])
 def unassign_task(task_id):
@@ -237,16 +409,21 @@ def unassign_task(task_id):
         return jsonify({'error': 'Assignment not found'}), 404
     
     try:
+        assignment_dict = assignment.to_dict()
         db.delete(assignment)
+        record_task_changes(db, [task_id])
         db.commit()
-        return jsonify({'message': 'User unassigned successfully'}), 200
+        change_counters.bump('assignments')
+        task_fragments.discard([task_id])
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    publish_event('task.unassigned', assignment_dict)
+    return jsonify({'message': 'User unassigned successfully'}), 200
 
 @tasks_bp.route('/api/assignments', methods=['GET'])
+@etag_cached('assignments')
 def get_assignments():
     """Get all task assignments."""
-    db = get_db_session()
-    assignments = db.query(UserTaskAssignment).all()
-    return jsonify([assignment.to_dict() for assignment in assignments])
+    return jsonify(list_assignments(get_db_session()))
@@ -1,20 +1,21 @@
 import time
 from flask import Blueprint, request, jsonify, g
 from sqlalchemy.exc import IntegrityError
-from argon2 import PasswordHasher
-import snowflake
 
+from src.changelog import record_task_changes
+from src.conditional import etag_cached
+from src.counters import change_counters
 from src.database import SessionLocal
+from src.events import publish_event
+from src.fragments import task_fragments
+from src.ids import next_id
 from src.models import User
+from src.passwords import HasherBusy, hash_password
+from src.ratelimit import rate_limited
+from src.reads import get_user as read_user, list_users
 
 users_bp = Blueprint('users', __name__)
 
-# Password hasher
-ph = PasswordHasher()
-
-# Snowflake ID generator
-snowflake_gen = snowflake.SnowflakeGenerator(42)
-
 def get_db_session():
     """Get database session for current request."""
     if 'db' not in g:
@@ -23,22 +24,24 @@ def get_db_session():
 
 # User routes
 @users_bp.route('/api/users', methods=['GET'])
+@etag_cached('users', 'assignments')
 def get_users():
-    """Get all users."""
-    db = get_db_session()
-    users = db.query(User).all()
-    return jsonify([user.to_dict() for user in users])
+    """Get a page of users ordered by ID (?limit=all for the full list)."""
+    try:
+        return jsonify(list_users(get_db_session(), request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @users_bp.route('/api/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     """Get a specific user by ID."""
-    db = get_db_session()
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    user = read_user(get_db_session(), user_id)
+    if user is None:
         return jsonify({'error': 'User not found'}), 404
-    return jsonify(user.to_dict())
+    return jsonify(user)
 
 @users_bp.route('/api/users', methods=['POST'])
+@rate_limited('users.write')
 def create_user():
     """Create a new user."""
     data = request.get_json()
@@ -59,10 +62,10 @@ def create_user():
     
     try:
         # Hash password
-        hashed_password = ph.hash(data['password'])
+        hashed_password = hash_password(data['password'])
         
         # Generate snowflake ID
-        user_id = next(snowflake_gen)
+        user_id = next_id()
         
         # Create user
         user = User(
@@ -78,9 +81,13 @@ def create_user():
         
         db.add(user)
         db.commit()
+        change_counters.bump('users')
         
         return jsonify(user.to_dict()), 201
     
+    except HasherBusy:
+        db.rollback()
+        return jsonify({'error': 'Server busy, try again later'}), 503, {'Retry-After': '1'}
     except IntegrityError:
         db.rollback()
         return jsonify({'error': 'Username already exists'}), 400
@@ -89,6 +96,7 @@ def create_user():
         return jsonify({'error': str(e)}), 500
 
 @users_bp.route('/api/users/<int:user_id>', methods=['PUT'])
+@rate_limited('users.write')
 def update_user(user_id):
     """Update an existing user."""
     data = request.get_json()
@@ -110,7 +118,7 @@ def update_user(user_id):
             user.username = data['username']
         
         if 'password' in data:
-            user.password = ph.hash(data['password'])
+            user.password = hash_password(data['password'])
         
         if 'display_name' in data:
             user.display_name = data['display_name']
@@ -122,8 +130,12 @@ def update_user(user_id):
             user.is_admin = data['is_admin']
         
         db.commit()
+        change_counters.bump('users')
         return jsonify(user.to_dict())
     
+    except HasherBusy:
+        db.rollback()
+        return jsonify({'error': 'Server busy, try again later'}), 503, {'Retry-After': '1'}
     except IntegrityError:
         db.rollback()
         return jsonify({'error': 'Username already exists'}), 400
@@ -140,9 +152,18 @@ def delete_user(user_id):
         return jsonify({'error': 'User not found'}), 404
     
     try:
+        # Tasks lose this assignee through the cascade, so they count as changed
+        assignments = [assignment.to_dict() for assignment in user.task_assignments]
+        task_ids = [assignment.task_id for assignment in user.task_assignments]
         db.delete(user)
+        record_task_changes(db, task_ids)
         db.commit()
-        return jsonify({'message': 'User deleted successfully'}), 200
+        change_counters.bump('users', 'assignments')
+        task_fragments.discard(task_ids)
     except Exception as e:
         db.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+    
+    for assignment_dict in assignments:
+        publish_event('task.unassigned', assignment_dict)
+    return jsonify({'message': 'User deleted successfully'}), 200
\ No newline at end of file
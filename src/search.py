@@ -0,0 +1,161 @@
+import html
+import re
+
+from sqlalchemy import text
+
+from src.models import Task
+from src.pagination import MAX_PAGE_SIZE
+from src.serializers import serialize_tasks
+from src.types.task import VALID_COLUMNS
+
+# FTS5 index over tasks.title and tasks.description (migration 2)
+SEARCH_TABLE = 'tasks_fts'
+
+# Results per page when the client does not pass ?limit=
+DEFAULT_SEARCH_LIMIT = 20
+# bm25() column weights: a match in the title outranks one in the description
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+# Tokens of description context around the matches
+SNIPPET_TOKENS = 16
+
+# Match markers used inside SQL; the text is HTML-escaped before they become <mark> tags
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+# "quoted phrase" or a bare word
+_QUERY_TERM = re.compile(r'"([^"]*)"|([^\s"]+)')
+
+_SEARCH_SQL = f"""
+    SELECT {SEARCH_TABLE}.rowid AS id,
+           highlight({SEARCH_TABLE}, 0, :mark_start, :mark_end) AS title,
+           snippet({SEARCH_TABLE}, 1, :mark_start, :mark_end, '…', :snippet_tokens) AS description
+    FROM {SEARCH_TABLE}
+    {{join}}
+    WHERE {SEARCH_TABLE} MATCH :match {{where}}
+    ORDER BY bm25({SEARCH_TABLE}, :title_weight, :description_weight)
+    LIMIT :limit OFFSET :offset
+"""
+
+
+class SearchUnavailable(Exception):
+    """The database has no full-text index (only SQLite gets one)."""
+
+
+def build_match_query(q):
+    """Turn user input into an FTS5 MATCH expression, or None if it has no words.
+
+    Every word is a prefix query ("канб" finds "канбан"), "quoted text" is an
+    exact phrase and all terms must match. Input is always quoted, so FTS5
+    operators and punctuation are matched as text instead of raising errors.
+    """
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(q):
+        term = phrase or word.rstrip('*')
+        if not any(char.isalnum() for char in term):
+            continue
+        terms.append(f'"{term}"' if phrase else f'"{term}"*')
+    return ' '.join(terms) or None
+
+
+def _render_highlight(value):
+    """HTML-escape highlighted text and turn the match markers into <mark> tags."""
+    return html.escape(value or '').replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def parse_search_args(args):
+    """Read q/limit/offset/column from the query string. Raises ValueError on bad input."""
+    q = (args.get('q') or '').strip()
+    if not q:
+        raise ValueError('Missing search query q')
+
+    try:
+        limit = int(args.get('limit', DEFAULT_SEARCH_LIMIT))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        raise ValueError('Invalid limit or offset')
+    if limit < 1 or offset < 0:
+        raise ValueError('Invalid limit or offset')
+
+    column = args.get('column')
+    if column and column not in VALID_COLUMNS:
+        raise ValueError(f'Invalid column. Must be one of: {VALID_COLUMNS}')
+
+    return q, min(limit, MAX_PAGE_SIZE), offset, column
+
+
+def search_tasks(db, args):
+    """Response body of GET /api/tasks/search: tasks ranked by bm25 with highlights.
+
+    Raises ValueError on bad query arguments and SearchUnavailable when the
+    database is not SQLite.
+    """
+    q, limit, offset, column = parse_search_args(args)
+    if db.get_bind().dialect.name != 'sqlite':
+        raise SearchUnavailable('Full-text search requires SQLite')
+
+    match = build_match_query(q)
+    if match is None:
+        return {'items': [], 'next_offset': None}
+
+    join, where = '', ''
+    params = {
+        'match': match,
+        'mark_start': _MARK_START,
+        'mark_end': _MARK_END,
+        'snippet_tokens': SNIPPET_TOKENS,
+        'title_weight': TITLE_WEIGHT,
+        'description_weight': DESCRIPTION_WEIGHT,
+        # One extra row tells whether another page exists
+        'limit': limit + 1,
+        'offset': offset,
+    }
+    if column:
+        join = f'JOIN tasks ON tasks.id = {SEARCH_TABLE}.rowid'
+        where = 'AND tasks.current_column = :column'
+        params['column'] = column
+
+    hits = db.execute(text(_SEARCH_SQL.format(join=join, where=where)), params).all()
+    next_offset = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_offset = offset + limit
+
+    # Full task rows in one query, returned in rank order
+    tasks = {}
+    if hits:
+        tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_([hit.id for hit in hits]))}
+    ranked = [tasks[hit.id] for hit in hits if hit.id in tasks]
+
+    items = []
+    highlights = {hit.id: hit for hit in hits}
+    for task, task_dict in zip(ranked, serialize_tasks(db, ranked)):
+        hit = highlights[task.id]
+        task_dict['highlight'] = {
+            'title': _render_highlight(hit.title),
+            'description': _render_highlight(hit.description),
+        }
+        items.append(task_dict)
+
+    return {'items': items, 'next_offset': next_offset}
+
+
+def rebuild_search_index(db_engine):
+    """Re-index every task and merge the index b-trees; returns the number of indexed tasks."""
+    if db_engine.dialect.name != 'sqlite':
+        raise SearchUnavailable('Full-text search requires SQLite')
+    with db_engine.begin() as conn:
+        index_all_tasks(conn)
+        return conn.execute(text('SELECT count(*) FROM tasks')).scalar()
+
+
+def index_all_tasks(conn, optimize=True):
+    """Rebuild the search index in the connection's transaction (SQLite only).
+
+    optimize=False skips merging the index b-trees, which takes about as long
+    as the rebuild itself on large tables; FTS5 automerge then merges segments
+    as tasks change, or `main.py reindex` merges them at once.
+    """
+    conn.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')"))
+    if optimize:
+        conn.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"))
@@ -0,0 +1,81 @@
+from collections import defaultdict
+
+from src.fragments import encode_fragment, task_fragments
+from src.models import Task, UserTaskAssignment
+
+# Max IDs bound into a single IN (...) clause; a full page always fits in one query
+IN_CHUNK_SIZE = 500
+
+
+def _chunks(ids, size=IN_CHUNK_SIZE):
+    """Split a list of IDs into IN-clause sized chunks."""
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def load_assignment_map(db, key_column, value_column, ids):
+    """Group assignment rows by key_column for the given IDs.
+
+    Returns {key: [value, ...]} with values in assignment order, which matches
+    the order_by on the Task/User relationships.
+    """
+    grouped = defaultdict(list)
+    for chunk in _chunks(list(ids)):
+        rows = (
+            db.query(key_column, value_column)
+            .filter(key_column.in_(chunk))
+            .order_by(UserTaskAssignment.id)
+        )
+        for key, value in rows:
+            grouped[key].append(value)
+    return grouped
+
+
+def load_task_assignees(db, task_ids):
+    """Map task ID -> list of assigned user IDs."""
+    return load_assignment_map(db, UserTaskAssignment.task_id, UserTaskAssignment.user_id, task_ids)
+
+
+def load_user_tasks(db, user_ids):
+    """Map user ID -> list of assigned task IDs."""
+    return load_assignment_map(db, UserTaskAssignment.user_id, UserTaskAssignment.task_id, user_ids)
+
+
+def serialize_tasks(db, tasks):
+    """Serialize tasks using one grouped assignment query instead of one lazy load per task."""
+    assignees = load_task_assignees(db, [task.id for task in tasks])
+    return [task.to_dict(assignee_ids=assignees.get(task.id, [])) for task in tasks]
+
+
+def serialize_task_fragments(db, keys):
+    """JSON fragments of tasks from (task_id, version) keys, in order.
+
+    Cached fragments are reused when their version matches; only the other
+    tasks are loaded and serialized. Tasks deleted since their key was read
+    are left out. Task versions are only maintained on SQLite, so elsewhere
+    nothing is cached.
+    """
+    cache = task_fragments if task_fragments.enabled and db.get_bind().dialect.name == 'sqlite' else None
+    if cache is not None:
+        fragments, missing = cache.get_many(keys)
+    else:
+        fragments, missing = {}, [task_id for task_id, _ in keys]
+
+    if missing:
+        tasks = []
+        for chunk in _chunks(missing):
+            tasks += db.query(Task).filter(Task.id.in_(chunk)).all()
+        # Stored under the version loaded with the row: the assignees read
+        # after it can only be newer, so a fragment is never older than its version
+        loaded = [(task.id, task.version, encode_fragment(task_dict))
+                  for task, task_dict in zip(tasks, serialize_tasks(db, tasks))]
+        fragments.update((task_id, fragment) for task_id, _, fragment in loaded)
+        if cache is not None:
+            cache.put_many(loaded)
+    return [fragments[task_id] for task_id, _ in keys if task_id in fragments]
+
+
+def serialize_users(db, users):
+    """Serialize users using one grouped assignment query instead of one lazy load per user."""
+    task_ids = load_user_tasks(db, [user.id for user in users])
+    return [user.to_dict(task_ids=task_ids.get(user.id, [])) for user in users]
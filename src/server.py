@@ -0,0 +1,204 @@
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+
+from werkzeug.serving import make_server
+from werkzeug.wsgi import ClosingIterator
+
+from src.database import engine
+from src.metrics import fold_exited_processes
+
+# Master loop tick while waiting for signals and exited workers (seconds)
+ARBITER_TICK = 0.5
+# A worker that dies faster than this is respawned with a delay, to avoid a fork loop
+MIN_WORKER_LIFETIME = 1.0
+
+
+class RequestTracker:
+    """WSGI middleware counting handled and in-flight requests of one worker."""
+
+    def __init__(self, app, max_requests, on_limit):
+        self.app = app
+        self.max_requests = max_requests
+        self.on_limit = on_limit
+        self.handled = 0
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.handled += 1
+            self.active += 1
+            handled = self.handled
+        if self.max_requests and handled == self.max_requests:
+            self.on_limit()
+        try:
+            return ClosingIterator(self.app(environ, start_response), self._finished)
+        except BaseException:
+            self._finished()
+            raise
+
+    def _finished(self):
+        with self._lock:
+            self.active -= 1
+
+
+def run_worker(listener, app, max_requests, graceful_timeout):
+    """Serve requests from the shared listening socket until stopped or recycled."""
+    stopping = threading.Event()
+
+    def stop(*_):
+        if not stopping.is_set():
+            stopping.set()
+            # shutdown() blocks until serve_forever() returns, so it can't run on that thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    tracker = RequestTracker(app, max_requests, stop)
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, tracker, threaded=True, fd=listener.fileno())
+
+    signal.signal(signal.SIGTERM, stop)
+    # Ctrl+C reaches the whole process group; the master decides what happens
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    server.serve_forever()
+
+    # Let in-flight requests finish; long-lived streams are cut at the deadline
+    deadline = time.monotonic() + graceful_timeout
+    while tracker.active and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+
+class Arbiter:
+    """Preforking master: owns the listening socket and keeps N workers alive.
+
+    SIGTERM/SIGINT stop gracefully, SIGHUP replaces every worker with a fresh
+    one (new workers start before old ones drain). Workers exit on their own
+    after max_requests (plus jitter) and are respawned.
+    """
+
+    def __init__(self, app, host, port, workers, max_requests=0, max_requests_jitter=0, graceful_timeout=30):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.workers = {}  # pid -> start time
+        self.listener = None
+        self._stopping = False
+        self._reloading = False
+
+    def spawn_worker(self):
+        max_requests = self.max_requests
+        if max_requests:
+            max_requests += random.randint(0, self.max_requests_jitter)
+
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+
+        # Worker process: exits via SystemExit, never returns into the master loop
+        status = 0
+        try:
+            random.seed()
+            run_worker(self.listener, self.app, max_requests, self.graceful_timeout)
+        except Exception:
+            traceback.print_exc()
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        sys.exit(status)
+
+    def _signal_workers(self, pids, sig):
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self):
+        """Collect exited workers and fold their metrics; returns how many died suspiciously fast."""
+        crashed = reaped = 0
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            reaped += 1
+            started = self.workers.pop(pid, None)
+            if started is not None and time.monotonic() - started < MIN_WORKER_LIFETIME:
+                crashed += 1
+        if reaped:
+            try:
+                fold_exited_processes()
+            except OSError:
+                # Scrapes fold them too; never let metrics stop the master
+                traceback.print_exc()
+        return crashed
+
+    def _handle_stop(self, *_):
+        self._stopping = True
+
+    def _handle_reload(self, *_):
+        self._reloading = True
+
+    def run(self):
+        self.listener = socket.create_server((self.host, self.port), backlog=2048)
+        self.listener.set_inheritable(True)
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        # Connections opened by the master (e.g. init_db) must not leak into workers
+        engine.dispose()
+
+        print(f"Master {os.getpid()} listening on http://{self.host}:{self.port} with {self.num_workers} workers")
+        # Workers leave spawn_worker() through SystemExit, which must unwind
+        # straight out of the child without running the master's cleanup
+        try:
+            self._loop()
+        except Exception:
+            self.stop()
+            raise
+        self.stop()
+
+    def _loop(self):
+        while not self._stopping:
+            if self._reap():
+                time.sleep(MIN_WORKER_LIFETIME)
+
+            if self._reloading:
+                self._reloading = False
+                old = list(self.workers)
+                for _ in range(self.num_workers):
+                    self.spawn_worker()
+                self._signal_workers(old, signal.SIGTERM)
+
+            while len(self.workers) < self.num_workers and not self._stopping:
+                self.spawn_worker()
+
+            time.sleep(ARBITER_TICK)
+
+    def stop(self):
+        """Ask every worker to drain, then kill the ones that outlive the grace period."""
+        self._signal_workers(list(self.workers), signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        self._signal_workers(list(self.workers), signal.SIGKILL)
+        self._reap()
+        self.listener.close()
@@ -0,0 +1,234 @@
+import time
+
+from sqlalchemy import and_, or_, text
+
+from src.models import TaskStat
+from src.types.task import COLUMN_DONE, VALID_COLUMNS, VALID_PRIORITIES
+
+# Aggregates in task_stats, one row per (metric, key)
+METRIC_COLUMN = 'column'  # key: current_column
+METRIC_PRIORITY = 'priority'  # key: priority
+METRIC_WIP = 'wip'  # key: user ID; assigned tasks outside the done column
+METRIC_CYCLE_TIME = 'cycle_time'  # key: histogram bucket of date_completed - date_created
+METRIC_THROUGHPUT = 'throughput'  # key: YYYY-MM-DD of the Monday starting the completion week
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+# Upper bounds (seconds) of the cycle time histogram buckets; one more open
+# bucket holds everything slower. Stored rows refer to these by index, so
+# changing them needs a new migration that recomputes the stats.
+CYCLE_TIME_BUCKETS = (
+    HOUR, 2 * HOUR, 4 * HOUR, 8 * HOUR, 12 * HOUR,
+    DAY, 2 * DAY, 3 * DAY, 5 * DAY, 7 * DAY, 10 * DAY, 14 * DAY, 21 * DAY,
+    30 * DAY, 45 * DAY, 60 * DAY, 90 * DAY, 180 * DAY, 365 * DAY,
+)
+CYCLE_TIME_PERCENTILES = (50, 75, 90, 95)
+
+# Weeks of throughput returned by GET /api/stats
+DEFAULT_THROUGHPUT_WEEKS = 12
+MAX_THROUGHPUT_WEEKS = 104
+
+# 1970-01-05, the first Monday after the epoch
+_FIRST_MONDAY = 4 * DAY
+
+
+class StatsUnavailable(Exception):
+    """The database keeps no stats (only SQLite has the triggers)."""
+
+
+def _bucket_sql(row):
+    """SQL for the zero-padded cycle time bucket of a tasks row."""
+    cycle_time = f'({row}.date_completed - {row}.date_created)'
+    cases = ' '.join(f"WHEN {cycle_time} <= {bound} THEN '{index:02d}'" for index, bound in enumerate(CYCLE_TIME_BUCKETS))
+    return f"CASE {cases} ELSE '{len(CYCLE_TIME_BUCKETS):02d}' END"
+
+
+def _week_sql(row):
+    """SQL for the Monday (YYYY-MM-DD, UTC) of the week a tasks row was completed in."""
+    completed = f'{row}.date_completed'
+    return f"strftime('%Y-%m-%d', {completed} - (({completed} - {_FIRST_MONDAY}) % {WEEK}), 'unixepoch')"
+
+
+def _bump(metric, key_sql, delta, source='WHERE true'):
+    """Upsert adding delta to one counter per selected row.
+
+    source is the FROM/WHERE tail of the SELECT; SQLite needs a WHERE for
+    an upsert from a SELECT to parse.
+    """
+    return (
+        f"INSERT INTO task_stats (metric, key, count) SELECT '{metric}', {key_sql}, {delta} {source} "
+        'ON CONFLICT (metric, key) DO UPDATE SET count = count + excluded.count;'
+    )
+
+
+def _completion(row, delta):
+    completed = f'WHERE {row}.date_completed IS NOT NULL'
+    return (
+        _bump(METRIC_CYCLE_TIME, _bucket_sql(row), delta, completed)
+        + _bump(METRIC_THROUGHPUT, _week_sql(row), delta, completed)
+    )
+
+
+# (name, event, body). Every write path (handlers, batch, imports, raw SQL)
+# goes through these, inside the writing transaction.
+STATS_TRIGGERS = [
+    ('task_stats_insert', 'AFTER INSERT ON tasks',
+     _bump(METRIC_COLUMN, 'new.current_column', 1)
+     + _bump(METRIC_PRIORITY, 'new.priority', 1)
+     + _completion('new', 1)),
+    # Assignments deleted after their task are no longer counted by task_stats_unassign
+    ('task_stats_delete', 'AFTER DELETE ON tasks',
+     _bump(METRIC_COLUMN, 'old.current_column', -1)
+     + _bump(METRIC_PRIORITY, 'old.priority', -1)
+     + _completion('old', -1)
+     + _bump(METRIC_WIP, 'CAST(user_id AS TEXT)', -1,
+             f"FROM user_task_assignments WHERE task_id = old.id AND old.current_column != '{COLUMN_DONE}'")),
+    ('task_stats_move', 'AFTER UPDATE OF current_column ON tasks WHEN old.current_column IS NOT new.current_column',
+     _bump(METRIC_COLUMN, 'old.current_column', -1)
+     + _bump(METRIC_COLUMN, 'new.current_column', 1)
+     + _bump(METRIC_WIP, 'CAST(user_id AS TEXT)', f"CASE WHEN new.current_column = '{COLUMN_DONE}' THEN -1 ELSE 1 END",
+             f"FROM user_task_assignments WHERE task_id = new.id "
+             f"AND (old.current_column = '{COLUMN_DONE}') != (new.current_column = '{COLUMN_DONE}')")),
+    ('task_stats_priority', 'AFTER UPDATE OF priority ON tasks WHEN old.priority IS NOT new.priority',
+     _bump(METRIC_PRIORITY, 'old.priority', -1)
+     + _bump(METRIC_PRIORITY, 'new.priority', 1)),
+    ('task_stats_complete',
+     'AFTER UPDATE OF date_completed, date_created ON tasks '
+     'WHEN old.date_completed IS NOT new.date_completed OR old.date_created IS NOT new.date_created',
+     _completion('old', -1) + _completion('new', 1)),
+    ('task_stats_assign', 'AFTER INSERT ON user_task_assignments',
+     _bump(METRIC_WIP, 'CAST(new.user_id AS TEXT)', 1,
+           f"FROM tasks WHERE tasks.id = new.task_id AND tasks.current_column != '{COLUMN_DONE}'")),
+    ('task_stats_unassign', 'AFTER DELETE ON user_task_assignments',
+     _bump(METRIC_WIP, 'CAST(old.user_id AS TEXT)', -1,
+           f"FROM tasks WHERE tasks.id = old.task_id AND tasks.current_column != '{COLUMN_DONE}'")),
+]
+
+TRIGGER_STATEMENTS = [
+    f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END'
+    for name, event, body in STATS_TRIGGERS
+]
+
+# Full recompute from the tasks and assignments tables
+RECOMPUTE_STATEMENTS = [
+    'DELETE FROM task_stats',
+    f"INSERT INTO task_stats (metric, key, count) SELECT '{METRIC_COLUMN}', current_column, count(*) FROM tasks GROUP BY 2",
+    f"INSERT INTO task_stats (metric, key, count) SELECT '{METRIC_PRIORITY}', priority, count(*) FROM tasks GROUP BY 2",
+    f"INSERT INTO task_stats (metric, key, count) SELECT '{METRIC_WIP}', CAST(a.user_id AS TEXT), count(*) "
+    f"FROM user_task_assignments a JOIN tasks ON tasks.id = a.task_id "
+    f"WHERE tasks.current_column != '{COLUMN_DONE}' GROUP BY 2",
+    f"INSERT INTO task_stats (metric, key, count) SELECT '{METRIC_CYCLE_TIME}', {_bucket_sql('tasks')}, count(*) "
+    'FROM tasks WHERE date_completed IS NOT NULL GROUP BY 2',
+    f"INSERT INTO task_stats (metric, key, count) SELECT '{METRIC_THROUGHPUT}', {_week_sql('tasks')}, count(*) "
+    'FROM tasks WHERE date_completed IS NOT NULL GROUP BY 2',
+]
+
+
+def week_start(timestamp):
+    """Unix time of the Monday 00:00 UTC starting the week of timestamp."""
+    return timestamp - (timestamp - _FIRST_MONDAY) % WEEK
+
+
+def _percentiles(histogram):
+    """Estimate cycle time percentiles (seconds) from {bucket_index: count}.
+
+    Values are interpolated linearly inside their bucket; the open-ended
+    last bucket reports its lower bound.
+    """
+    total = sum(histogram.values())
+    result = {f'p{percentile}': None for percentile in CYCLE_TIME_PERCENTILES}
+    if total <= 0:
+        return result
+
+    for percentile in CYCLE_TIME_PERCENTILES:
+        target = total * percentile / 100
+        seen = 0
+        for index in range(len(CYCLE_TIME_BUCKETS) + 1):
+            count = histogram.get(index, 0)
+            if count <= 0 or seen + count < target:
+                seen += max(count, 0)
+                continue
+            lower = CYCLE_TIME_BUCKETS[index - 1] if index else 0
+            if index == len(CYCLE_TIME_BUCKETS):
+                result[f'p{percentile}'] = lower
+            else:
+                upper = CYCLE_TIME_BUCKETS[index]
+                result[f'p{percentile}'] = int(lower + (upper - lower) * (target - seen) / count)
+            break
+    return result
+
+
+def parse_weeks(args):
+    """Read ?weeks= (throughput history length). Raises ValueError on bad input."""
+    try:
+        weeks = int(args.get('weeks', DEFAULT_THROUGHPUT_WEEKS))
+    except ValueError:
+        raise ValueError('Invalid weeks')
+    if not 1 <= weeks <= MAX_THROUGHPUT_WEEKS:
+        raise ValueError(f'Invalid weeks. Must be between 1 and {MAX_THROUGHPUT_WEEKS}')
+    return weeks
+
+
+def load_stats(db, weeks=DEFAULT_THROUGHPUT_WEEKS, now=None):
+    """Response body of GET /api/stats, read from task_stats in one query.
+
+    The cost depends on the number of columns, priorities, assignees,
+    histogram buckets and weeks, never on the number of tasks.
+    """
+    if db.get_bind().dialect.name != 'sqlite':
+        raise StatsUnavailable('Board stats require SQLite')
+
+    this_week = week_start(int(now if now is not None else time.time()))
+    week_keys = [
+        time.strftime('%Y-%m-%d', time.gmtime(this_week - offset * WEEK))
+        for offset in reversed(range(weeks))
+    ]
+
+    rows = db.query(TaskStat.metric, TaskStat.key, TaskStat.count).filter(or_(
+        TaskStat.metric.in_([METRIC_COLUMN, METRIC_PRIORITY, METRIC_WIP, METRIC_CYCLE_TIME]),
+        and_(TaskStat.metric == METRIC_THROUGHPUT, TaskStat.key >= week_keys[0])
+    ))
+
+    columns = dict.fromkeys(VALID_COLUMNS, 0)
+    priorities = dict.fromkeys(VALID_PRIORITIES, 0)
+    wip = {}
+    histogram = {}
+    throughput = dict.fromkeys(week_keys, 0)
+    for metric, key, count in rows:
+        if metric == METRIC_COLUMN:
+            columns[key] = count
+        elif metric == METRIC_PRIORITY:
+            priorities[key] = count
+        elif metric == METRIC_WIP:
+            if count > 0:
+                wip[key] = count
+        elif metric == METRIC_CYCLE_TIME:
+            histogram[int(key)] = count
+        elif key in throughput:
+            throughput[key] = count
+
+    return {
+        'total': sum(columns.values()),
+        'columns': columns,
+        'priorities': priorities,
+        'wip': dict(sorted(wip.items(), key=lambda item: int(item[0]))),
+        'cycle_time': {'completed': sum(histogram.values()), **_percentiles(histogram)},
+        'throughput': [{'week': week, 'completed': count} for week, count in throughput.items()],
+    }
+
+
+def recompute_stats(db_engine):
+    """Rebuild task_stats from scratch, e.g. after editing tasks outside SQLite triggers.
+
+    Returns the number of tasks counted.
+    """
+    if db_engine.dialect.name != 'sqlite':
+        raise StatsUnavailable('Board stats require SQLite')
+    with db_engine.begin() as conn:
+        for statement in RECOMPUTE_STATEMENTS:
+            conn.execute(text(statement))
+        return conn.execute(text(
+            f"SELECT coalesce(sum(count), 0) FROM task_stats WHERE metric = '{METRIC_COLUMN}'"
+        )).scalar()
@@ -0,0 +1,172 @@
+import base64
+import functools
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+
+from flask import g, jsonify
+
+from src import config
+from src.counters import change_counters
+from src.database import SessionLocal
+from src.models import RevokedToken
+
+TOKEN_ACCESS = 'access'
+TOKEN_REFRESH = 'refresh'
+
+_HEADER = {'alg': 'HS256', 'typ': 'JWT'}
+
+
+class InvalidToken(Exception):
+    """Raised for malformed, forged, expired, revoked or wrong-type tokens."""
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def _sign(signing_input, secret):
+    return hmac.new(secret.encode('utf-8'), signing_input, hashlib.sha256).digest()
+
+
+_ENCODED_HEADER = _b64encode(json.dumps(_HEADER, separators=(',', ':')).encode('utf-8'))
+
+
+def issue_token(user, token_type, secret, ttl):
+    """Issue an HS256 JWT for a user. Returns (token, claims)."""
+    now = int(time.time())
+    claims = {
+        'sub': str(user.id),
+        'name': user.username,
+        'adm': bool(user.is_admin),
+        'typ': token_type,
+        'iat': now,
+        'exp': now + ttl,
+        'jti': secrets.token_hex(16),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    signing_input = f'{_ENCODED_HEADER}.{payload}'.encode('ascii')
+    return f'{_ENCODED_HEADER}.{payload}.{_b64encode(_sign(signing_input, secret))}', claims
+
+
+def issue_token_pair(user, secret):
+    """Issue an access token and a refresh token for a user."""
+    access_token, _ = issue_token(user, TOKEN_ACCESS, secret, config.ACCESS_TOKEN_TTL)
+    refresh_token, _ = issue_token(user, TOKEN_REFRESH, secret, config.REFRESH_TOKEN_TTL)
+    return {
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+        'token_type': 'Bearer',
+        'expires_in': config.ACCESS_TOKEN_TTL,
+    }
+
+
+@functools.lru_cache(maxsize=config.TOKEN_CACHE_SIZE)
+def _verified_claims(token, secret):
+    """Check the signature and parse the claims; cached so repeat requests skip HMAC and JSON."""
+    try:
+        header, payload, signature = token.split('.')
+        if header != _ENCODED_HEADER:
+            raise InvalidToken('Unsupported token header')
+        expected = _sign(f'{header}.{payload}'.encode('ascii'), secret)
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise InvalidToken('Invalid token signature')
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, UnicodeError):
+        raise InvalidToken('Malformed token')
+    if not isinstance(claims, dict) or not {'sub', 'typ', 'exp', 'jti'} <= claims.keys():
+        raise InvalidToken('Malformed token')
+    return claims
+
+
+class RevocationList:
+    """In-memory copy of revoked_tokens, reloaded only when another write revoked a token.
+
+    The 'revoked_tokens' change counter is shared by every worker process, so
+    checking for new revocations is a memory read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._revoked = frozenset()
+
+    @property
+    def stale(self):
+        """True when a token was revoked since the last reload."""
+        return change_counters.get('revoked_tokens') != self._version
+
+    def sync(self):
+        """Reload the revoked token IDs if another write changed them."""
+        version = change_counters.get('revoked_tokens')
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            db = SessionLocal()
+            try:
+                rows = db.query(RevokedToken.jti).filter(RevokedToken.expires_at > int(time.time()))
+                self._revoked = frozenset(jti for (jti,) in rows)
+            finally:
+                db.close()
+            self._version = version
+
+    def is_revoked(self, jti):
+        self.sync()
+        return jti in self._revoked
+
+    def revoke(self, db, claims_list):
+        """Persist revocations for the given claims and tell every worker to reload."""
+        now = int(time.time())
+        for claims in claims_list:
+            db.merge(RevokedToken(jti=claims['jti'], expires_at=claims['exp']))
+        # Expired tokens are rejected anyway, so their rows are no longer needed
+        db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+        db.commit()
+        change_counters.bump('revoked_tokens')
+
+
+revocations = RevocationList()
+
+
+def decode_token(token, secret, token_type=TOKEN_ACCESS):
+    """Validate a token in memory and return its claims.
+
+    Raises InvalidToken. No database round trip unless a token was revoked
+    since the last check.
+    """
+    claims = _verified_claims(token, secret)
+    if claims['typ'] != token_type:
+        raise InvalidToken('Wrong token type')
+    if claims['exp'] <= time.time():
+        raise InvalidToken('Token expired')
+    if revocations.is_revoked(claims['jti']):
+        raise InvalidToken('Token revoked')
+    return claims
+
+
+def bearer_token(request):
+    """Extract the token from an 'Authorization: Bearer ...' header, if any."""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    return token.strip()
+
+
+def login_required(view):
+    """Reject requests without a valid access token (validated by the app's before_request hook)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if g.get('token_claims') is None:
+            error = g.get('token_error') or 'Authentication required'
+            return jsonify({'error': error}), 401, {'WWW-Authenticate': 'Bearer'}
+        return view(*args, **kwargs)
+    return wrapper
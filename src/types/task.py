@@ -13,6 +13,14 @@ COLUMN_REVIEW = "review"
 COLUMN_DONE = "done"
 VALID_COLUMNS = [COLUMN_TODO, COLUMN_PROGRESS, COLUMN_REVIEW, COLUMN_DONE]
 
+# Generated titles and descriptions (add_sample_data.py, benchmark.py) are made
+# of these; the Cyrillic ones exercise the search tokenizer
+SAMPLE_WORDS = (
+    'board', 'sprint', 'release', 'review', 'deploy', 'bug', 'feature', 'design', 'api', 'database',
+    'frontend', 'backend', 'test', 'docs', 'refactor', 'migration', 'search', 'cache', 'login', 'export',
+    'задача', 'проект', 'компонент', 'интерфейс', 'ревью', 'релиз', 'документация', 'настройка',
+)
+
 class Task:
     """Represents a task in a task management system.
     Attributes:
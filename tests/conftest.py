@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from src.environment import configure_environment
+
+# src reads its settings when it is imported, so every file the app writes is
+# pointed at a temporary directory before any test module imports it
+WORKDIR = tempfile.mkdtemp(prefix='kanban-tests-')
+configure_environment(WORKDIR, 'test-secret-key')
+os.environ.update({
+    # Cheap hashes; the cost parameters are not what these tests check
+    'KANBAN_ARGON2_TIME_COST': '1',
+    'KANBAN_ARGON2_MEMORY_COST': '8',
+    'KANBAN_ARGON2_PARALLELISM': '1',
+    'KANBAN_COMPRESSION': 'gzip',
+})
+
+PASSWORD = 'test-password'
+
+# Tables emptied between tests. id_leases holds this process' lease, and an
+# emptied task_changes would make every sync version look compacted.
+CLEARED_TABLES = ('user_task_assignments', 'tasks', 'users', 'revoked_tokens')
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from src.database import init_db
+    from src.routes import create_app
+
+    init_db()
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture(autouse=True)
+def clean_database(app):
+    """Start every test from empty tables and caches."""
+    from sqlalchemy import text
+
+    from src.counters import COUNTER_TABLES, change_counters
+    from src.database import engine
+    from src.fragments import task_fragments
+    from src.stats import recompute_stats
+
+    with engine.begin() as conn:
+        for table in CLEARED_TABLES:
+            conn.execute(text(f'DELETE FROM {table}'))
+        # Bulk loads run ANALYZE; statistics of a few rows would change the
+        # plans test_migrations checks
+        analyzed = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")).first()
+        if analyzed:
+            conn.execute(text('DROP TABLE sqlite_stat1'))
+    if analyzed:
+        engine.dispose()
+    recompute_stats(engine)
+    change_counters.bump(*COUNTER_TABLES)
+    task_fragments.clear()
+    yield
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db():
+    from src.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def create_user(client):
+    """Create a user through the API and return its JSON."""
+    def create(username, **fields):
+        response = client.post('/api/users', json={
+            'username': username, 'password': PASSWORD, 'display_name': username.title(), **fields
+        })
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()
+    return create
+
+
+@pytest.fixture
+def create_task(client):
+    """Create a task through the API and return its JSON."""
+    def create(title='Task', **fields):
+        response = client.post('/api/tasks', json={'title': title, **fields})
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()
+    return create
+
+
+@pytest.fixture
+def query_count():
+    """SQL statements a request ran, read from its Server-Timing header."""
+    def count(response):
+        return int(response.headers['Server-Timing'].split('desc="')[1].split(' ')[0])
+    return count
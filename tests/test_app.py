@@ -0,0 +1,30 @@
+import logging
+
+import pytest
+
+from src import config
+from src.routes import create_app
+
+
+@pytest.fixture
+def no_secret_key(monkeypatch):
+    monkeypatch.setattr(config, 'SECRET_KEY', None)
+    monkeypatch.delenv('KANBAN_SECRET_KEY')
+
+
+def test_secret_key_from_environment():
+    assert create_app().config['SECRET_KEY'] == config.SECRET_KEY
+
+
+def test_missing_secret_key_fails_start(no_secret_key):
+    with pytest.raises(RuntimeError, match='KANBAN_SECRET_KEY'):
+        create_app(debug=False)
+
+
+def test_missing_secret_key_warns_in_debug_mode(no_secret_key, caplog):
+    with caplog.at_level(logging.WARNING):
+        app = create_app(debug=True)
+    assert 'KANBAN_SECRET_KEY is not set' in caplog.text
+    assert app.debug
+    # Kept for the reloader's next process
+    assert create_app(debug=True).config['SECRET_KEY'] == app.config['SECRET_KEY']
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from src import asgi
+
+
+@pytest.fixture(scope='module')
+def loop():
+    # One loop for the module: the async engine's pooled connections belong to it
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(asgi.async_engine.dispose())
+    loop.close()
+
+
+@pytest.fixture
+def call(loop):
+    """Send one HTTP request to the ASGI app; returns (status, headers, body bytes)."""
+    def call(path, method='GET', headers=None, json_body=None):
+        path, _, query = path.partition('?')
+        headers = dict(headers or {})
+        body = b''
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers.update({'Content-Type': 'application/json', 'Content-Length': str(len(body))})
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+            'query_string': query.encode(), 'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+            'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        loop.run_until_complete(asgi.app(scope, receive, send))
+        start = messages[0]
+        response_headers = {name.decode().lower(): value.decode() for name, value in start['headers']}
+        return start['status'], response_headers, b''.join(m.get('body', b'') for m in messages[1:])
+    return call
+
+
+@pytest.mark.parametrize('path', [
+    '/api/tasks', '/api/tasks?limit=all', '/api/tasks?priority=high&sort=-date_created',
+    '/api/tasks/{task}', '/api/users', '/api/users/{user}', '/api/assignments',
+])
+def test_reads_match_flask(client, create_user, create_task, call, path):
+    user = create_user('alice')
+    task = create_task('First', priority='high', assignees=[user['id']])
+    create_task('Second')
+    path = path.format(task=task['id'], user=user['id'])
+
+    status, headers, body = call(path)
+    expected = client.get(path)
+    assert status == expected.status_code == 200
+    assert json.loads(body) == expected.get_json()
+    assert headers.get('etag') == expected.headers.get('ETag')
+    assert headers['access-control-allow-origin'] == '*'
+    assert 'server-timing' in headers
+
+
+def test_not_modified(call, create_task):
+    create_task()
+    _, headers, _ = call('/api/tasks')
+    status, _, body = call('/api/tasks', headers={'If-None-Match': headers['etag']})
+    assert (status, body) == (304, b'')
+
+
+@pytest.mark.parametrize('path, status', [
+    ('/api/tasks/1', 404), ('/api/users/1', 404), ('/api/tasks?limit=0', 400), ('/api/tasks?after=%25', 400),
+])
+def test_errors_match_flask(client, call, path, status):
+    got_status, _, body = call(path)
+    expected = client.get(path)
+    assert got_status == expected.status_code == status
+    assert json.loads(body) == expected.get_json()
+
+
+def test_other_requests_go_to_flask(call):
+    status, _, body = call('/api/tasks', method='POST', json_body={'title': 'Through Flask'})
+    assert status == 201
+    task_id = json.loads(body)['id']
+
+    status, _, body = call(f'/api/tasks/{task_id}')
+    assert json.loads(body)['title'] == 'Through Flask'
+
+
+def test_stale_token_does_not_block_reads(call):
+    status, _, _ = call('/api/tasks', headers={'Authorization': 'Bearer garbage'})
+    assert status == 200
+
+
+def test_lifespan(loop):
+    received = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+    sent = []
+
+    async def receive():
+        return next(received)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    loop.run_until_complete(asgi.app({'type': 'lifespan'}, receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
@@ -0,0 +1,55 @@
+from src.assignments import parse_user_ids, replace_task_assignees
+
+
+def test_parse_user_ids_drops_duplicates_and_malformed_ids():
+    assert parse_user_ids(['3', 1, 'x', None, 3]) == [3, 1]
+
+
+def test_replace_assignees_writes_only_the_difference(client, create_user, create_task):
+    alice, bob, carol = create_user('alice'), create_user('bob'), create_user('carol')
+    task = create_task(assignees=[alice['id'], bob['id']])
+
+    response = client.put(f"/api/tasks/{task['id']}/assignees", json={'assignees': [carol['id'], bob['id']]})
+    assert response.status_code == 200
+    # Kept assignees stay in assignment order, new ones follow
+    assert response.get_json()['assignees'] == [bob['id'], carol['id']]
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['assignees'] == [bob['id'], carol['id']]
+
+
+def test_replace_assignees_returns_assignment_order(db, create_user, create_task):
+    users = [int(create_user(name)['id']) for name in ('alice', 'bob', 'carol')]
+    assigned = list(reversed(users))
+    task_id = int(create_task(assignees=[str(user_id) for user_id in assigned])['id'])
+
+    # Assignment order, not user ID or request order
+    added, removed, assignee_ids = replace_task_assignees(db, task_id, users)
+    assert (added, removed, assignee_ids) == ([], [], assigned)
+
+
+def test_unknown_users_are_skipped_everywhere(client, create_user, create_task):
+    alice = create_user('alice')
+    task = create_task(assignees=[alice['id'], '42'])
+    assert task['assignees'] == [alice['id']]
+
+    response = client.put(f"/api/tasks/{task['id']}/assignees", json={'assignees': ['42']})
+    assert response.status_code == 200
+    assert response.get_json()['assignees'] == []
+
+
+def test_replace_assignees_validation(client, create_task):
+    task = create_task()
+    assert client.put(f"/api/tasks/{task['id']}/assignees", json={}).status_code == 400
+    assert client.put(f"/api/tasks/{task['id']}/assignees", json={'assignees': ['x']}).status_code == 400
+    assert client.put('/api/tasks/1/assignees', json={'assignees': []}).status_code == 404
+
+
+def test_assign_and_unassign(client, create_user, create_task):
+    alice = create_user('alice')
+    task = create_task()
+    url = f"/api/tasks/{task['id']}"
+
+    assert client.post(f'{url}/assign', json={'user_id': alice['id']}).status_code == 201
+    assert client.post(f'{url}/assign', json={'user_id': alice['id']}).status_code == 400
+    assert client.post(f'{url}/assign', json={'user_id': '42'}).status_code == 404
+    assert client.post(f'{url}/unassign', json={'user_id': alice['id']}).status_code == 200
+    assert client.post(f'{url}/unassign', json={'user_id': alice['id']}).status_code == 404
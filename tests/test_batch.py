@@ -0,0 +1,49 @@
+from src.batch import MAX_BATCH_SIZE
+
+
+def batch(client, *operations):
+    response = client.post('/api/tasks/batch', json={'operations': list(operations)})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['results']
+
+
+def test_batch_applies_every_kind_of_operation(client, create_user, create_task):
+    alice = create_user('alice')
+    renamed, moved, deleted = create_task('Old title'), create_task('Moving'), create_task('Gone', assignees=[alice['id']])
+
+    results = batch(
+        client,
+        {'op': 'create', 'title': 'New', 'assignees': [alice['id'], '1']},
+        {'op': 'update', 'id': renamed['id'], 'title': 'New title'},
+        {'op': 'move', 'id': moved['id'], 'current_column': 'done'},
+        {'op': 'delete', 'id': deleted['id']},
+    )
+    assert [result['status'] for result in results] == [201, 200, 200, 200]
+    assert results[0]['task']['assignees'] == [alice['id']]
+    assert results[1]['task']['title'] == 'New title'
+    assert results[2]['task']['date_completed'] is not None
+
+    assert client.get(f"/api/tasks/{deleted['id']}").status_code == 404
+    assert all(assignment['task_id'] != deleted['id'] for assignment in client.get('/api/assignments').get_json())
+
+
+def test_invalid_operations_are_skipped(client, create_task):
+    task = create_task()
+    results = batch(
+        client,
+        {'op': 'explode', 'id': task['id']},
+        {'op': 'update', 'id': '123', 'title': 'Missing'},
+        {'op': 'move', 'id': task['id']},
+        {'op': 'update', 'id': task['id'], 'priority': 'urgent'},
+        {'op': 'update', 'id': task['id'], 'title': 'Applied'},
+        {'op': 'delete', 'id': task['id']},
+    )
+    assert [result['status'] for result in results] == [400, 404, 400, 400, 200, 400]
+    assert results[5]['error'] == 'Duplicate task ID in batch'
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['title'] == 'Applied'
+
+
+def test_batch_limits(client):
+    assert client.post('/api/tasks/batch', json={'operations': []}).status_code == 400
+    operations = [{'op': 'create', 'title': 'x'}] * (MAX_BATCH_SIZE + 1)
+    assert client.post('/api/tasks/batch', json={'operations': operations}).status_code == 400
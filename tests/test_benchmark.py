@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from benchmark import (
+    EXPENSIVE_SCENARIOS, SCENARIOS, InProcessDriver, compare_to_baseline, percentile, run_endpoints,
+    run_profile, seed_database, summarize,
+)
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([], 50) is None
+
+
+def test_summarize():
+    results = [('tasks.get', 200, 0.002, 2), ('tasks.get', 404, 0.004, 1), ('tasks.get', 200, 0.010, None)]
+    summary = summarize(results, wall_seconds=0.5)
+    assert summary['requests'] == 3 and summary['errors'] == 1
+    assert summary['statuses'] == {'200': 2, '404': 1}
+    assert summary['throughput_rps'] == 6.0
+    assert (summary['p50_ms'], summary['p99_ms']) == (4.0, 10.0)
+    assert summary['queries_per_request'] == 1.5
+
+
+def result(p95_ms=10.0, throughput_rps=100.0, queries_per_request=2.0, errors=0):
+    return {'p95_ms': p95_ms, 'throughput_rps': throughput_rps, 'queries_per_request': queries_per_request,
+            'errors': errors}
+
+
+@pytest.mark.parametrize('current, regressed', [
+    (result(), False),
+    (result(p95_ms=11.5), False),  # Within tolerance
+    (result(p95_ms=13.0), True),
+    (result(throughput_rps=70.0), True),
+    (result(queries_per_request=3.0), True),
+    (result(errors=1), True),
+])
+def test_compare_to_baseline(current, regressed):
+    regressions = compare_to_baseline({'results': {'board': current}}, {'results': {'board': result()}},
+                                      tolerance=0.2, min_delta_ms=1.0)
+    assert bool(regressions) == regressed
+
+
+def test_small_latency_changes_are_noise():
+    regressions = compare_to_baseline({'results': {'health': result(p95_ms=0.5)}},
+                                      {'results': {'health': result(p95_ms=0.2)}}, tolerance=0.2, min_delta_ms=1.0)
+    assert regressions == []
+
+
+@pytest.fixture
+def seeded():
+    rng = random.Random(1)
+    return seed_database(users=5, tasks=30, assignees_per_task=2, rng=rng), rng
+
+
+def test_every_scenario_succeeds(seeded, capsys):
+    state, rng = seeded
+    summaries = run_endpoints(InProcessDriver(), state, list(SCENARIOS), requests=3, expensive_requests=1,
+                              warmup=1, rng=rng)
+    assert {name: summary['errors'] for name, summary in summaries.items()} == dict.fromkeys(SCENARIOS, 0)
+    assert all(summaries[name]['requests'] == 1 for name in EXPENSIVE_SCENARIOS)
+
+
+def test_profile_reports_total(seeded, capsys):
+    state, rng = seeded
+    summaries = run_profile(InProcessDriver(), state, 'mixed', requests=30, warmup=0, rng=rng)
+    assert summaries['total']['requests'] == 30
+    assert summaries['total']['errors'] == 0
+    assert 'total' in capsys.readouterr().out
@@ -0,0 +1,28 @@
+from src.types.task import VALID_COLUMNS
+
+
+def test_board_groups_tasks_with_assignee_summaries(client, create_user, create_task):
+    alice = create_user('alice')
+    todo = create_task('Write docs', assignees=[alice['id']])
+    done = create_task('Ship it', current_column='done')
+
+    board = client.get('/api/board').get_json()
+    assert set(board['columns']) == set(VALID_COLUMNS)
+    assert [task['id'] for task in board['columns']['todo']] == [todo['id']]
+    assert [task['id'] for task in board['columns']['done']] == [done['id']]
+    assert board['columns']['todo'][0]['assignee_users'] == [{
+        'id': alice['id'], 'username': 'alice', 'display_name': 'Alice', 'profile_picture': alice['profile_picture']
+    }]
+
+
+def test_board_is_rebuilt_after_writes(client, create_task, query_count):
+    task = create_task('Before')
+    first = client.get('/api/board')
+    cached = client.get('/api/board')
+    assert query_count(cached) == 0
+    assert cached.get_data() == first.get_data()
+
+    client.put(f"/api/tasks/{task['id']}", json={'title': 'After'})
+    board = client.get('/api/board').get_json()
+    assert board['columns']['todo'][0]['title'] == 'After'
+    assert board['version'] != first.get_json()['version']
@@ -0,0 +1,86 @@
+import json
+import random
+
+import pytest
+
+from src.bulk import InvalidRecord, _id_list, generate_tasks, generate_users, load, read_records, task_row, validated
+from src.database import engine
+from src.models import Task, UserTaskAssignment
+
+
+def test_read_records_csv_and_ndjson(tmp_path):
+    csv_path = tmp_path / 'tasks.csv'
+    csv_path.write_text('title,assignees\nFirst,1;2\nSecond,\n', encoding='utf-8')
+    assert list(read_records(str(csv_path))) == [(2, {'title': 'First', 'assignees': '1;2'}),
+                                                 (3, {'title': 'Second', 'assignees': ''})]
+
+    ndjson_path = tmp_path / 'tasks.ndjson'
+    ndjson_path.write_text(json.dumps({'title': 'First'}) + '\n\n{broken\n', encoding='utf-8')
+    records = read_records(str(ndjson_path))
+    assert next(records) == (1, {'title': 'First'})
+    with pytest.raises(InvalidRecord, match='line 3'):
+        next(records)
+
+
+@pytest.mark.parametrize('value, ids', [('1;2;1', [1, 2]), ('3, 4', [3, 4]), ([5, '6'], [5, 6]), ('', []), (None, [])])
+def test_id_list(value, ids):
+    assert _id_list(value) == ids
+
+
+@pytest.mark.parametrize('record, error', [
+    ({}, 'Missing title'),
+    ({'title': 'x', 'priority': 'urgent'}, 'Invalid priority'),
+    ({'title': 'x', 'current_column': 'later'}, 'Invalid column'),
+    ({'title': 'x', 'deadline': 'tomorrow'}, 'Invalid deadline'),
+    ({'title': 'x', 'assignees': 'a;b'}, 'Invalid assignees'),
+])
+def test_invalid_task_records(record, error):
+    with pytest.raises(InvalidRecord, match=error):
+        task_row(record, now=0)
+
+
+def test_skip_invalid_counts():
+    skipped = {}
+    records = [(1, {'title': 'ok'}), (2, {}), (3, {'title': 'also ok'})]
+    assert [row['title'] for row in validated(records, lambda r: task_row(r, 0), 'tasks.csv', skipped)] == ['ok', 'also ok']
+    assert skipped == {'tasks.csv': 1}
+
+
+@pytest.mark.parametrize('defer', [True, False])
+def test_load_generated_data(client, db, defer):
+    rng = random.Random(1)
+    users = list(generate_users(3, 'hash', rng))
+    user_ids = [user['id'] for user in users]
+    counts = load(engine, users, generate_tasks(20, user_ids, 2, rng), batch_size=7, defer=defer)
+    assert counts == {'users': 3, 'tasks': 20, 'assignments': 40}
+
+    assert db.query(Task).count() == 20
+    assert client.get('/api/stats').get_json()['total'] == 20
+    word = db.query(Task.title).first()[0].split()[0]
+    assert client.get(f'/api/tasks/search?q={word}').get_json()['items']
+
+
+def test_load_assignments(db, create_user, create_task):
+    user = int(create_user('alice')['id'])
+    task = int(create_task()['id'])
+    counts = load(engine, assignments=[{'task_id': task, 'user_id': user}] * 2)
+    assert counts['assignments'] == 2
+    assert db.query(UserTaskAssignment).filter_by(task_id=task).count() == 1
+
+
+@pytest.mark.parametrize('unknown', ['task', 'user'])
+def test_load_rejects_assignments_to_unknown_rows(db, create_user, create_task, unknown):
+    user = int(create_user('alice')['id'])
+    task = int(create_task()['id'])
+    rows = [{'task_id': task, 'user_id': user},
+            {'task_id': task + 1 if unknown == 'task' else task, 'user_id': user + 1 if unknown == 'user' else user}]
+
+    with pytest.raises(InvalidRecord, match=f'unknown {unknown}'):
+        load(engine, assignments=rows)
+    # The whole batch is rolled back
+    assert db.query(UserTaskAssignment).count() == 0
+
+
+def test_load_rejects_tasks_assigned_to_unknown_users():
+    with pytest.raises(InvalidRecord, match='unknown user 42'):
+        load(engine, tasks=[task_row({'title': 'x', 'assignees': [42]}, 0)])
@@ -0,0 +1,53 @@
+from src.changelog import compact_changes, current_seq, load_changes
+
+
+def changes(client, since):
+    response = client.get(f'/api/tasks/changes?since={since}')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_delta_sync_reports_upserts_and_tombstones(client, create_task):
+    start = changes(client, 'latest')['version']
+    kept = create_task('Kept')
+    removed = create_task('Removed')
+    client.put(f"/api/tasks/{kept['id']}", json={'title': 'Kept, renamed'})
+    client.delete(f"/api/tasks/{removed['id']}")
+
+    delta = changes(client, start)
+    assert [task['title'] for task in delta['tasks']] == ['Kept, renamed']
+    assert delta['deleted'] == [removed['id']]
+    assert delta['has_more'] is False
+
+    assert changes(client, delta['version']) == {
+        'version': delta['version'], 'has_more': False, 'tasks': [], 'deleted': []
+    }
+
+
+def test_delta_sync_pages_with_has_more(db, create_task):
+    start = current_seq(db)
+    tasks = [create_task(f'Task {i}')['id'] for i in range(5)]
+
+    upserted, _, version, has_more = load_changes(db, start, limit=3)
+    assert has_more and len(upserted) == 3
+    upserted_rest, _, _, has_more = load_changes(db, version, limit=3)
+    assert not has_more
+    assert sorted(map(str, upserted + upserted_rest)) == sorted(tasks)
+
+
+def test_compacted_versions_are_gone(client, db, create_task):
+    start = current_seq(db)
+    create_task('Old')
+    create_task('Newest')
+    assert compact_changes(db, retention=-60) > 0
+
+    response = client.get(f'/api/tasks/changes?since={start}')
+    assert response.status_code == 410
+
+    # The newest entry is kept, so clients that saw it can still sync
+    assert changes(client, changes(client, 'latest')['version'])['tasks'] == []
+
+
+def test_since_is_required(client):
+    assert client.get('/api/tasks/changes').status_code == 400
+    assert client.get('/api/tasks/changes?since=abc').status_code == 400
@@ -0,0 +1,88 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+from src import compression
+from src.compression import GZIP_WBITS, _codecs, compressed_bodies, negotiate
+
+
+@pytest.fixture
+def many_tasks(create_task):
+    for i in range(30):
+        create_task(f'Task {i}', description='A description long enough to pass the minimum size')
+
+
+def test_large_json_is_gzipped(client, many_tasks):
+    plain = client.get('/api/tasks')
+    response = client.get('/api/tasks', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.get_data())) == plain.get_json()
+    # Compressed bytes differ from the plain representation
+    assert response.headers['ETag'] == f'W/{plain.headers["ETag"]}'
+
+    # The weak ETag still revalidates
+    response = client.get('/api/tasks', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+
+
+def test_compressed_body_is_cached_by_etag(client, many_tasks):
+    compressed_bodies.clear()
+    first = client.get('/api/tasks', headers={'Accept-Encoding': 'gzip'})
+    etag = first.headers['ETag'].removeprefix('W/').strip('"')
+    assert compressed_bodies.get(etag, 'gzip') == first.get_data()
+
+
+def test_small_and_unwanted_bodies_are_sent_as_is(client, create_task):
+    create_task()
+    assert 'Content-Encoding' not in client.get('/api/tasks', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/api/tasks').headers
+
+
+def test_stream_is_compressed_incrementally(client, many_tasks):
+    response = client.get('/api/tasks/export', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    body = b''.join(decompressor.decompress(chunk) for chunk in response.response)
+    assert body == client.get('/api/tasks/export').get_data()
+
+
+@pytest.mark.parametrize('accept, encoding', [
+    ('gzip, br, zstd', 'zstd'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('*', 'zstd'),
+    ('br;q=0, *;q=0.1', 'zstd'),
+    ('identity', None),
+    ('', None),
+])
+def test_negotiate(monkeypatch, accept, encoding):
+    monkeypatch.setattr(compression, 'CODECS', dict.fromkeys(['zstd', 'br', 'gzip']))
+    assert negotiate(accept) == encoding
+
+
+def decoder(name):
+    """Decompress function of an encoding; skips the test when its package is missing."""
+    if name == 'br':
+        return pytest.importorskip('brotli').decompress
+    if name == 'zstd':
+        zstandard = pytest.importorskip('zstandard')
+        return lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return gzip.decompress
+
+
+@pytest.mark.parametrize('name', ['gzip', 'br', 'zstd'])
+def test_codec_round_trip(name):
+    decode = decoder(name)
+    codec = _codecs(name)[name]
+    data = b'{"title":"Task"}' * 200
+    assert decode(codec.compress(data)) == data
+
+    write, finish = codec.stream()
+    assert decode(write(data[:1000]) + write(data[1000:]) + finish()) == data
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError, match='Unknown compression encoding'):
+        _codecs('gzip,lzma')
@@ -0,0 +1,34 @@
+import pytest
+
+
+@pytest.mark.parametrize('path', ['/api/tasks', '/api/users', '/api/assignments', '/api/board'])
+def test_unchanged_list_is_not_modified(client, create_task, query_count, path):
+    create_task()
+    first = client.get(path)
+    etag = first.headers['ETag']
+
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert query_count(response) == 0
+
+
+def test_write_changes_the_etag(client, create_task):
+    task = create_task()
+    etag = client.get('/api/tasks').headers['ETag']
+
+    client.put(f"/api/tasks/{task['id']}", json={'title': 'Renamed'})
+    response = client.get('/api/tasks', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_etag_depends_on_query_string(client, create_task):
+    create_task()
+    assert client.get('/api/tasks?limit=1').headers['ETag'] != client.get('/api/tasks?limit=2').headers['ETag']
+
+
+def test_errors_carry_no_etag(client):
+    response = client.get('/api/tasks?limit=0')
+    assert response.status_code == 400
+    assert 'ETag' not in response.headers
@@ -0,0 +1,27 @@
+from sqlalchemy import text
+
+from src import config
+from src.database import async_database_url, create_db_engine, engine
+
+
+def test_configured_pragmas_are_applied():
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == config.SQLITE_PRAGMAS['journal_mode'].lower()
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == int(config.SQLITE_PRAGMAS['busy_timeout'])
+        # NORMAL
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1
+
+
+def test_unset_pragma_keeps_the_sqlite_default(monkeypatch):
+    monkeypatch.setitem(config.SQLITE_PRAGMAS, 'temp_store', None)
+    memory_engine = create_db_engine('sqlite://')
+    with memory_engine.connect() as conn:
+        # DEFAULT rather than MEMORY
+        assert conn.execute(text('PRAGMA temp_store')).scalar() == 0
+    memory_engine.dispose()
+
+
+def test_async_url_swaps_the_driver():
+    assert str(async_database_url('sqlite:///./assets/main.db')) == 'sqlite+aiosqlite:///./assets/main.db'
+    assert str(async_database_url('postgresql://u@db/kanban')) == 'postgresql+psycopg://u@db/kanban'
+    assert str(async_database_url('postgresql+asyncpg://u@db/kanban')) == 'postgresql+psycopg://u@db/kanban'
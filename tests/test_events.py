@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from src import events
+from src.events import broker, format_event
+
+
+@pytest.fixture
+def subscriber():
+    subscriber = broker.subscribe()
+    yield subscriber
+    broker.unsubscribe(subscriber)
+
+
+def received(subscriber):
+    """(event type, data) of every queued message."""
+    messages = []
+    while not subscriber.queue.empty():
+        event_line, data_line, _, _ = subscriber.queue.get_nowait().split('\n')
+        messages.append((event_line.removeprefix('event: '), json.loads(data_line.removeprefix('data: '))))
+    return messages
+
+
+def test_format_event():
+    assert format_event('task.deleted', {'id': '1'}) == 'event: task.deleted\ndata: {"id":"1"}\n\n'
+
+
+def test_writes_publish_events(client, subscriber, create_user, create_task):
+    alice = create_user('alice')
+    task = create_task()
+    client.put(f"/api/tasks/{task['id']}", json={'current_column': 'done'})
+    client.post(f"/api/tasks/{task['id']}/assign", json={'user_id': alice['id']})
+    client.delete(f"/api/tasks/{task['id']}")
+
+    assert [event_type for event_type, _ in received(subscriber)] == [
+        'task.created', 'task.moved', 'task.assigned', 'task.deleted'
+    ]
+
+
+def test_deleting_a_user_unassigns_their_tasks(client, subscriber, create_user, create_task):
+    alice = create_user('alice')
+    task = create_task(assignees=[alice['id']])
+    received(subscriber)
+
+    client.delete(f"/api/users/{alice['id']}")
+    [(event_type, data)] = received(subscriber)
+    assert event_type == 'task.unassigned'
+    assert (data['task_id'], data['user_id']) == (task['id'], alice['id'])
+
+
+def test_failed_publish_does_not_fail_the_write(client, create_task, monkeypatch):
+    task = create_task()
+
+    def broken_deliver(message):
+        raise RuntimeError('broker down')
+    monkeypatch.setattr(events.broker, 'deliver', broken_deliver)
+
+    response = client.put(f"/api/tasks/{task['id']}", json={'title': 'Saved anyway'})
+    assert response.status_code == 200
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['title'] == 'Saved anyway'
+
+
+def test_slow_subscriber_is_evicted(subscriber):
+    for i in range(broker.queue_size + 1):
+        broker.deliver(format_event('task.deleted', {'id': str(i)}))
+    assert subscriber.evicted
+    assert subscriber.next_message() is None
+
+
+def test_stream_starts_with_retry_hint(client):
+    response = client.get('/api/events')
+    assert response.mimetype == 'text/event-stream'
+    assert next(response.response) == b'retry: 3000\n\n'
+    response.close()
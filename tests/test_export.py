@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+
+import pytest
+
+from src.bulk import load, read_records, task_row, validated
+from src.database import engine
+from src.export import CSV_FIELDS, stream_tasks
+
+
+def export(client, query=''):
+    response = client.get(f'/api/tasks/export?{query}')
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response
+
+
+def test_ndjson_matches_task_endpoint(client, create_user, create_task):
+    alice = create_user('alice')['id']
+    created = [create_task(f'Задача {i}', assignees=[alice] if i else [])['id'] for i in range(3)]
+
+    response = export(client)
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == [client.get(f'/api/tasks/{task_id}').get_json() for task_id in created]
+    # Non-ASCII text is written as is
+    assert 'Задача 0' in lines[0]
+
+
+def test_csv_export(client, create_user, create_task):
+    alice = create_user('alice')['id']
+    bob = create_user('bob')['id']
+    task_id = create_task('Comma, "quoted"', assignees=[alice, bob])['id']
+
+    response = export(client, 'format=csv')
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert list(rows[0]) == list(CSV_FIELDS)
+    assert rows[0]['id'] == task_id and rows[0]['title'] == 'Comma, "quoted"'
+    assert rows[0]['assignees'].split(';') == client.get(f'/api/tasks/{task_id}').get_json()['assignees']
+
+
+def test_filters_apply(client, create_task):
+    done = create_task('Done', current_column='done')['id']
+    create_task('Todo', current_column='todo')
+    lines = export(client, 'column=done').get_data(as_text=True).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [done]
+
+
+@pytest.mark.parametrize('query', ['format=xml', 'sort=-id', 'limit=5', 'column=later'])
+def test_bad_export_arguments(client, query):
+    assert client.get(f'/api/tasks/export?{query}').status_code == 400
+
+
+def test_streamed_in_batches(create_task):
+    for i in range(5):
+        create_task(f'Task {i}')
+    chunks = list(stream_tasks('ndjson', [], batch_size=2))
+    assert [chunk.count('\n') for chunk in chunks] == [2, 2, 1]
+
+
+@pytest.mark.parametrize('file_format', ['ndjson', 'csv'])
+def test_export_loads_back(client, db, create_user, create_task, tmp_path, file_format):
+    alice = create_user('alice')['id']
+    create_task('Round trip', description='Text', priority='high', deadline='2025-05-01', assignees=[alice])
+    before = export(client).get_data(as_text=True)
+    path = tmp_path / f'tasks.{file_format}'
+    path.write_bytes(export(client, f'format={file_format}').get_data())
+
+    client.delete(f'/api/tasks/{json.loads(before)["id"]}')
+    load(engine, tasks=validated(read_records(str(path)), lambda record: task_row(record, 0), str(path), None))
+
+    after = json.loads(export(client).get_data(as_text=True))
+    expected = json.loads(before)
+    for field in ('id', 'title', 'description', 'priority', 'deadline', 'date_created', 'current_column', 'assignees'):
+        assert after[field] == expected[field]
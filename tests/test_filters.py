@@ -0,0 +1,66 @@
+import pytest
+
+from src.pagination import encode_cursor
+
+
+def task_ids(client, query):
+    response = client.get(f'/api/tasks?{query}')
+    assert response.status_code == 200, response.get_json()
+    return [task['id'] for task in response.get_json()['items']]
+
+
+def test_filters_combine(client, create_user, create_task):
+    alice = create_user('alice')['id']
+    match = create_task('Match', priority='high', current_column='todo', assignees=[alice])['id']
+    create_task('Wrong priority', priority='low', current_column='todo', assignees=[alice])
+    create_task('Unassigned', priority='high', current_column='todo')
+
+    assert task_ids(client, f'priority=high&column=todo,done&assignee={alice}') == [match]
+
+
+def test_unassigned_and_deadline_filters(client, create_user, create_task):
+    alice = create_user('alice')['id']
+    create_task('Assigned', assignees=[alice], deadline='2025-01-10')
+    early = create_task('Early', deadline='2025-01-05')['id']
+    create_task('Late', deadline='2025-03-01')
+
+    assert task_ids(client, 'assignee=none&deadline_before=2025-02-01') == [early]
+
+
+def all_pages(client, query):
+    ids, cursor = [], None
+    while True:
+        response = client.get(f'/api/tasks?{query}&limit=2' + (f'&after={cursor}' if cursor else ''))
+        body = response.get_json()
+        ids += [task['id'] for task in body['items']]
+        cursor = body['next_cursor']
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize('sort', ['deadline', '-deadline'])
+def test_sorted_pages_place_missing_deadlines(client, create_task, sort):
+    march = create_task('March', deadline='2025-03-01')['id']
+    none_1 = create_task('No deadline')['id']
+    january = create_task('January', deadline='2025-01-01')['id']
+    none_2 = create_task('No deadline either')['id']
+    march_2 = create_task('March too', deadline='2025-03-01')['id']
+
+    expected = [none_1, none_2, january, march, march_2]
+    if sort.startswith('-'):
+        expected.reverse()
+    assert all_pages(client, f'sort={sort}') == expected
+
+
+@pytest.mark.parametrize('query', [
+    'priority=urgent', 'colum=todo', 'deadline_before=soon', 'created_after=yesterday',
+    'completed=maybe', 'assignee=alice', 'sort=title',
+    f'sort=-deadline&after={encode_cursor(5)}',
+    f'sort=-deadline&after={encode_cursor([{"a": 1}, 5])}',
+    f'sort=date_created&after={encode_cursor([[1], 5])}',
+])
+def test_bad_filters_and_cursors(client, create_task, query):
+    create_task(deadline='2025-01-01')
+    response = client.get(f'/api/tasks?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,70 @@
+from sqlalchemy import text
+
+from src.fragments import ENTRY_OVERHEAD, FragmentCache, task_fragments
+
+
+def version(db, task_id):
+    return db.execute(text('SELECT version FROM tasks WHERE id = :id'), {'id': int(task_id)}).scalar()
+
+
+def test_lookups_match_version():
+    cache = FragmentCache(max_bytes=1 << 20)
+    cache.put_many([(1, 0, b'{"id":1}'), (2, 3, b'{"id":2}')])
+    assert cache.get_many([(1, 0), (2, 4), (3, 0)]) == ({1: b'{"id":1}'}, [2, 3])
+
+
+def test_least_recently_used_is_evicted():
+    fragment = b'x' * 100
+    cache = FragmentCache(max_bytes=2 * (len(fragment) + 33 + ENTRY_OVERHEAD))
+    cache.put_many([(1, 0, fragment), (2, 0, fragment)])
+    cache.get_many([(1, 0)])
+    cache.put_many([(3, 0, fragment)])
+    assert cache.get_many([(1, 0), (2, 0), (3, 0)])[1] == [2]
+
+
+def test_disabled_cache_stores_nothing():
+    cache = FragmentCache(max_bytes=0)
+    cache.put_many([(1, 0, b'{}')])
+    assert cache.get_many([(1, 0)]) == ({}, [1])
+
+
+def test_every_change_bumps_the_version(client, db, create_user, create_task):
+    alice = create_user('alice')['id']
+    task_id = create_task()['id']
+    versions = [version(db, task_id)]
+
+    for change in (
+        lambda: client.put(f'/api/tasks/{task_id}', json={'title': 'Renamed'}),
+        lambda: client.post(f'/api/tasks/{task_id}/assign', json={'user_id': alice}),
+        lambda: client.post(f'/api/tasks/{task_id}/unassign', json={'user_id': alice}),
+        lambda: client.put(f'/api/tasks/{task_id}/assignees', json={'assignees': [alice]}),
+        lambda: client.delete(f'/api/users/{alice}'),
+    ):
+        assert change().status_code in (200, 201)
+        db.rollback()
+        versions.append(version(db, task_id))
+    assert versions == sorted(set(versions))
+
+
+def test_list_serves_cached_fragments_until_a_change(client, db, create_user, create_task):
+    alice = create_user('alice')['id']
+    task_id = create_task('Original')['id']
+
+    first = client.get('/api/tasks').get_json()['items']
+    cached, _ = task_fragments.get_many([(int(task_id), version(db, task_id))])
+    assert list(cached) == [int(task_id)]
+    assert client.get('/api/tasks').get_json()['items'] == first
+
+    client.post(f'/api/tasks/{task_id}/assign', json={'user_id': alice})
+    assert client.get('/api/tasks').get_json()['items'][0]['assignees'] == [alice]
+    client.put(f'/api/tasks/{task_id}', json={'title': 'Changed'})
+    assert client.get('/api/tasks').get_json()['items'][0]['title'] == 'Changed'
+
+
+def test_raw_sql_writes_invalidate(client, db, create_task):
+    task_id = create_task('Original')['id']
+    client.get('/api/tasks')
+    # A write the cache never hears of is picked up through the version trigger
+    db.execute(text("UPDATE tasks SET title = 'Raw' WHERE id = :id"), {'id': int(task_id)})
+    db.commit()
+    assert client.get('/api/tasks').get_json()['items'][0]['title'] == 'Raw'
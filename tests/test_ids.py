@@ -0,0 +1,90 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, update
+
+from src import ids
+from src.ids import INSTANCE_BITS, SEQUENCE_BITS, ClockMovedBackwards, IdAllocator, InstanceLease, LeaseLost
+from src.models import IdLease
+
+TTL = 60
+SKEW = 5
+TIMESTAMP_SHIFT = INSTANCE_BITS + SEQUENCE_BITS
+
+
+@pytest.fixture
+def lease_engine(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "ids.db"}')
+    IdLease.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def new_lease(lease_engine):
+    leases = []
+
+    def new():
+        leases.append(InstanceLease(lease_engine, TTL, SKEW))
+        return leases[-1]
+    yield new
+    for lease in leases:
+        lease.release()
+
+
+def test_leases_take_the_lowest_free_id(new_lease):
+    assert [new_lease().acquire() for _ in range(3)] == [0, 1, 2]
+
+
+def test_released_id_is_reused_after_the_skew_margin(lease_engine, new_lease, monkeypatch):
+    monkeypatch.setattr(ids, 'MAX_INSTANCE', 1)
+    first = new_lease()
+    first.acquire()
+    first.release()
+    assert new_lease().acquire() == 1
+
+    with pytest.raises(LeaseLost, match='released too recently'):
+        new_lease().acquire()
+
+    with lease_engine.begin() as conn:
+        conn.execute(update(IdLease).where(IdLease.instance_id == 0).values(expires_at=int(time.time()) - SKEW - 1))
+    assert new_lease().acquire() == 0
+
+
+def test_acquire_backs_off_and_gives_up(new_lease, monkeypatch):
+    sleeps, sleep = [], time.sleep
+    monkeypatch.setattr(ids, 'ACQUIRE_TIMEOUT', 0.05)
+    monkeypatch.setattr(InstanceLease, '_claim', lambda self, conn, now: None)
+    monkeypatch.setattr(ids.time, 'sleep', lambda seconds: sleeps.append(seconds) or sleep(seconds))
+
+    with pytest.raises(LeaseLost, match='could be leased within'):
+        new_lease().acquire()
+    assert sleeps and all(0.001 <= seconds <= 0.02 for seconds in sleeps)
+
+
+@pytest.fixture
+def allocator(lease_engine):
+    allocator = IdAllocator(lease_engine, TTL, SKEW)
+    yield allocator
+    if allocator._lease is not None:
+        allocator._lease.release()
+
+
+def test_ids_increase(allocator):
+    # More than one millisecond's worth of sequence numbers
+    generated = [allocator.next_id() for _ in range(3 << SEQUENCE_BITS)]
+    assert generated == sorted(set(generated))
+    assert generated[-1] >> TIMESTAMP_SHIFT <= int(time.time() * 1000)
+
+
+def test_small_clock_step_back_is_waited_out(allocator):
+    allocator.next_id()
+    allocator._last_ms = int(time.time() * 1000) + 5
+    assert allocator.next_id() >> TIMESTAMP_SHIFT >= allocator._last_ms
+
+
+def test_clock_behind_last_id_refuses(allocator):
+    allocator.next_id()
+    allocator._last_ms = int(time.time() * 1000) + 1000
+    with pytest.raises(ClockMovedBackwards):
+        allocator.next_id()
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src import metrics
+from src.metrics import (
+    AGGREGATE_FILE, ProcessValues, _sample_key, fold_exited_processes, read_values, render_metrics,
+)
+
+COUNTER = _sample_key('kanban_slow_queries_total', {})
+GAUGE = _sample_key('kanban_fragment_cache_bytes', {})
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / 'metrics')
+
+
+def write_exited_process_file(directory, counter, gauge):
+    """A metrics file named after a process that has exited."""
+    values = ProcessValues(directory)
+    values.inc(COUNTER, counter)
+    values.set(GAUGE, gauge)
+    values._map.flush()
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    path = os.path.join(directory, f'{exited.stdout.strip()}-{os.urandom(4).hex()}.bin')
+    os.rename(values._path, path)
+    return path
+
+
+def bin_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.bin'))
+
+
+def test_exited_files_are_folded(directory):
+    first = write_exited_process_file(directory, 3, 100)
+    second = write_exited_process_file(directory, 4, 100)
+    live = ProcessValues(directory)
+    live.inc(COUNTER, 1)
+    live.set(GAUGE, 7)
+
+    fold_exited_processes(directory)
+    assert not os.path.exists(first) and not os.path.exists(second)
+    assert bin_files(directory) == [os.path.basename(live._path)]
+    assert read_values(directory) == {COUNTER: 8, GAUGE: 7}
+
+    # Folding again changes nothing
+    fold_exited_processes(directory)
+    assert read_values(directory) == {COUNTER: 8, GAUGE: 7}
+
+    write_exited_process_file(directory, 2, 100)
+    fold_exited_processes(directory)
+    assert read_values(directory)[COUNTER] == 10
+
+
+def test_folded_file_left_behind_is_not_counted_twice(directory):
+    path = write_exited_process_file(directory, 5, 0)
+    name = os.path.basename(path)
+    # As if the folding process died after writing the aggregate but before deleting the file
+    with open(os.path.join(directory, AGGREGATE_FILE), 'w') as f:
+        json.dump({'values': {COUNTER: 5}, 'folded': [name]}, f)
+
+    assert read_values(directory) == {COUNTER: 5}
+    fold_exited_processes(directory)
+    assert bin_files(directory) == []
+    assert read_values(directory) == {COUNTER: 5}
+
+
+def test_scrape_folds(directory):
+    write_exited_process_file(directory, 6, 100)
+    text = render_metrics(directory)
+    assert 'kanban_slow_queries_total 6' in text
+    assert 'kanban_fragment_cache_bytes 100' not in text
+    assert bin_files(directory) == []
+
+
+def test_without_fcntl_files_are_summed_not_folded(directory, monkeypatch):
+    monkeypatch.setattr(metrics, 'fcntl', None)
+    exited = write_exited_process_file(directory, 3, 100)
+    assert 'kanban_slow_queries_total 3' in render_metrics(directory)
+    fold_exited_processes(directory)
+    assert os.path.exists(exited)
+    assert read_values(directory) == {COUNTER: 3, GAUGE: 100}
+
+
+def test_app_imports_without_fcntl():
+    # As on Windows, where importing fcntl fails
+    code = (
+        "import sys; sys.modules['fcntl'] = None\n"
+        "from src.routes import create_app\n"
+        "create_app()\n"
+        "from src.metrics import render_metrics; render_metrics()\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_metrics_endpoint(client):
+    client.get('/api/tasks')
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert 'kanban_http_requests_total{method="GET",route="/api/tasks",status="200"}' in response.get_data(as_text=True)
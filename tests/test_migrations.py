@@ -0,0 +1,50 @@
+from sqlalchemy import create_engine, inspect, text
+
+from src import migrations
+from src.database import engine
+from src.query_plans import explain_hot_queries
+
+
+def test_upgrade_applies_every_migration_once():
+    fresh = create_engine('sqlite://')
+    with fresh.begin() as conn:
+        conn.execute(text('CREATE TABLE tasks (id INTEGER PRIMARY KEY)'))
+    try:
+        # Only the migrations that do not need the full schema
+        pending = [(5, 'Add per-task version', [migrations.add_column('tasks', 'version', 'INTEGER NOT NULL DEFAULT 0')])]
+        original, migrations.MIGRATIONS = migrations.MIGRATIONS, pending
+        try:
+            assert migrations.upgrade(fresh) == [5]
+            assert migrations.upgrade(fresh) == []
+            assert migrations.status(fresh) == [(5, 'Add per-task version', True)]
+        finally:
+            migrations.MIGRATIONS = original
+        assert 'version' in {column['name'] for column in inspect(fresh).get_columns('tasks')}
+    finally:
+        fresh.dispose()
+
+
+def test_add_column_skips_existing_columns():
+    with engine.begin() as conn:
+        migrations.add_column('tasks', 'version', 'INTEGER NOT NULL DEFAULT 0')(conn)
+
+
+def test_test_database_is_fully_migrated():
+    assert all(applied for _, _, applied in migrations.status(engine))
+
+
+def test_hot_queries_use_indexes(db):
+    problems = [(endpoint, problem) for endpoint, _, _, problem in explain_hot_queries(db) if problem]
+    assert problems == []
+
+
+def test_add_column_tolerates_a_concurrent_add(monkeypatch):
+    class NoColumns:
+        """What a worker that checked before the other worker's ALTER saw."""
+        def get_columns(self, table):
+            return []
+
+    monkeypatch.setattr(migrations, 'inspect', lambda conn: NoColumns())
+    with engine.begin() as conn:
+        migrations.add_column('tasks', 'version', 'INTEGER NOT NULL DEFAULT 0')(conn)
+        conn.execute(text('SELECT version FROM tasks'))
@@ -0,0 +1,59 @@
+import pytest
+
+from src import pagination
+from src.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(7517039223996850176)) == 7517039223996850176
+    assert decode_cursor(encode_cursor(['2026-01-31', 42])) == ['2026-01-31', 42]
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!', encode_cursor('7'), encode_cursor([1, 2, 3]), encode_cursor([1, 'x']),
+    encode_cursor([{'a': 1}, 5]), encode_cursor([[1], 5]), encode_cursor([True, 5]),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_every_task_once(client, create_task):
+    created = [create_task(f'Task {i}')['id'] for i in range(7)]
+
+    seen, cursor = [], None
+    while True:
+        response = client.get('/api/tasks?limit=3' + (f'&after={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page['items']) <= 3
+        seen += [task['id'] for task in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == sorted(created, key=int)
+
+
+@pytest.mark.parametrize('query', ['', f'?limit={MAX_PAGE_SIZE + 1}'])
+def test_default_and_capped_limit(client, create_user, monkeypatch, query):
+    monkeypatch.setattr(pagination, 'DEFAULT_PAGE_SIZE', 2)
+    monkeypatch.setattr(pagination, 'MAX_PAGE_SIZE', 3)
+    for name in ('alice', 'bob', 'carol', 'dave'):
+        create_user(name)
+
+    page = client.get(f'/api/users{query}').get_json()
+    assert len(page['items']) == (3 if query else 2)
+    assert page['next_cursor'] is not None
+
+
+def test_limit_all_returns_plain_list(client, create_task):
+    create_task()
+    body = client.get('/api/tasks?limit=all').get_json()
+    assert isinstance(body, list) and len(body) == 1
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=abc', 'after=%%%'])
+def test_bad_page_arguments(client, query):
+    response = client.get(f'/api/users?{query}')
+    assert response.status_code == 400
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+from argon2 import PasswordHasher
+
+from src.models import User
+from src.passwords import HasherBusy, HashingPool, hash_password, needs_rehash, verify_password
+
+
+def test_hash_and_verify():
+    password_hash = hash_password('secret')
+    assert verify_password(password_hash, 'secret')
+    assert not verify_password(password_hash, 'wrong')
+    assert not verify_password('not a hash', 'secret')
+    assert not needs_rehash(password_hash)
+
+
+def test_full_pool_fails_fast():
+    pool = HashingPool(workers=1, queue_depth=0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=pool.run, args=('hash', slow))
+    worker.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(HasherBusy):
+            pool.run('hash', lambda: None)
+    finally:
+        release.set()
+        worker.join()
+    assert pool.run('hash', lambda: 'done') == 'done'
+
+
+def test_login_upgrades_outdated_hashes(client, db, create_user):
+    user = create_user('alice')
+    old_hash = PasswordHasher(time_cost=2, memory_cost=16, parallelism=1).hash('test-password')
+    db.query(User).filter(User.id == int(user['id'])).update({'password': old_hash})
+    db.commit()
+
+    response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'test-password'})
+    assert response.status_code == 200
+
+    new_hash = db.query(User.password).filter(User.id == int(user['id'])).scalar()
+    assert new_hash != old_hash and not needs_rehash(new_hash)
+
+
+def test_busy_hasher_returns_503(client, create_user, monkeypatch):
+    create_user('alice')
+
+    def busy(*args):
+        raise HasherBusy()
+    monkeypatch.setattr('src.routes.auth.verify_password', busy)
+
+    response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'test-password'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from src import ratelimit
+from src.ratelimit import MODE_DRY_RUN, MODE_ENFORCE, BucketStore, RateLimiter
+
+from tests.conftest import PASSWORD
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BucketStore(str(tmp_path / 'ratelimit.db'))
+
+
+def decisions(client, rule, outcome):
+    """The kanban_rate_limit_decisions_total sample scraped from /api/metrics."""
+    sample = f'kanban_rate_limit_decisions_total{{outcome="{outcome}",rule="{rule}"}} '
+    for line in client.get('/api/metrics').get_data(as_text=True).splitlines():
+        if line.startswith(sample):
+            return float(line[len(sample):])
+    return 0
+
+
+@pytest.fixture
+def enforce(monkeypatch, store):
+    """Enforce the limits of the app's limiter, with fresh buckets."""
+    monkeypatch.setattr(ratelimit.limiter, 'store', store)
+    monkeypatch.setattr(ratelimit.limiter, 'mode', MODE_ENFORCE)
+
+
+def test_bucket_empties_and_reports_wait(store):
+    assert [store.take([('k', 2, 60)]) for _ in range(3)] == [0, 0, 30]
+
+
+def test_rejected_check_takes_no_tokens(store):
+    assert store.take([('ip', 3, 60), ('name', 1, 60)]) == 0
+    # The exhausted username bucket rejects these without draining the IP bucket
+    for _ in range(5):
+        assert store.take([('ip', 3, 60), ('name', 1, 60)]) > 0
+    assert store.take([('ip', 3, 60)]) == 0
+    assert store.take([('ip', 3, 60)]) == 0
+    assert store.take([('ip', 3, 60)]) > 0
+
+
+def test_dry_run_counts_without_rejecting(client, store, monkeypatch):
+    monkeypatch.setitem(ratelimit.RATE_LIMITS, 'test', {'ip': (1, 60)})
+    allowed = decisions(client, 'test', 'allowed')
+    dry_run_limited = decisions(client, 'test', 'dry_run_limited')
+
+    limiter = RateLimiter(store, MODE_DRY_RUN)
+    assert limiter.check('test', [('ip', '1.2.3.4')]) is None
+    assert limiter.check('test', [('ip', '1.2.3.4')]) is None
+    assert decisions(client, 'test', 'allowed') == allowed + 1
+    assert decisions(client, 'test', 'dry_run_limited') == dry_run_limited + 1
+
+
+def test_checks_are_counted_across_threads(store, monkeypatch):
+    monkeypatch.setattr(ratelimit, 'CLEANUP_EVERY', 10**9)
+
+    def check():
+        for i in range(50):
+            store.take([(f'key{i}', 100, 60)])
+
+    threads = [threading.Thread(target=check) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store._checks == 400
+
+
+def test_login_limited_per_username_keeps_ip_budget(client, create_user, enforce, store):
+    create_user('alice')
+    limited = decisions(client, 'auth.login', 'limited')
+    ip_limit = ratelimit.RATE_LIMITS['auth.login']['ip']
+    username_capacity, _ = ratelimit.RATE_LIMITS['auth.login']['username']
+
+    statuses = [
+        client.post('/api/auth/login', json={'username': 'alice', 'password': 'wrong'}).status_code
+        for _ in range(username_capacity + 10)
+    ]
+    assert statuses == [401] * username_capacity + [429] * 10
+
+    response = client.post('/api/auth/login', json={'username': 'alice', 'password': PASSWORD})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert decisions(client, 'auth.login', 'limited') == limited + 11
+
+    # Only the attempts that were let through were taken from the IP bucket
+    remaining = ip_limit[0] - username_capacity
+    ip_bucket = [('auth.login:ip:127.0.0.1', *ip_limit)]
+    waits = [store.take(ip_bucket) for _ in range(remaining + 1)]
+    assert waits[:-1] == [0] * remaining and waits[-1] > 0
@@ -0,0 +1,67 @@
+import pytest
+
+from src.search import build_match_query
+
+
+@pytest.mark.parametrize('q, match', [
+    ('kanban board', '"kanban"* "board"*'),
+    ('"exact phrase" word*', '"exact phrase" "word"*'),
+    ('NOT OR ( ) - *', '"NOT"* "OR"*'),
+    ('!!! ...', None),
+])
+def test_build_match_query(q, match):
+    assert build_match_query(q) == match
+
+
+def search(client, query):
+    response = client.get(f'/api/tasks/search?{query}')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_title_matches_rank_first(client, create_task):
+    in_description = create_task('Unrelated', description='Mentions the deploy script')['id']
+    in_title = create_task('Deploy script')['id']
+    create_task('Something else')
+
+    body = search(client, 'q=deplo')
+    assert [task['id'] for task in body['items']] == [in_title, in_description]
+    assert body['items'][0]['highlight']['title'] == '<mark>Deploy</mark> script'
+    assert '<mark>deploy</mark>' in body['items'][1]['highlight']['description']
+
+
+def test_highlights_are_html_escaped(client, create_task):
+    create_task('<b>bold</b> claim')
+    assert search(client, 'q=bold')['items'][0]['highlight']['title'] == '&lt;b&gt;<mark>bold</mark>&lt;/b&gt; claim'
+
+
+def test_index_follows_updates_and_deletes(client, create_task):
+    task_id = create_task('Old title')['id']
+    client.put(f'/api/tasks/{task_id}', json={'title': 'New title'})
+    assert search(client, 'q=old')['items'] == []
+    assert len(search(client, 'q=new')['items']) == 1
+
+    client.delete(f'/api/tasks/{task_id}')
+    assert search(client, 'q=new')['items'] == []
+
+
+def test_column_filter_and_paging(client, create_task):
+    for i in range(3):
+        create_task(f'Report {i}', current_column='done')
+    create_task('Report draft', current_column='todo')
+
+    first = search(client, 'q=report&column=done&limit=2')
+    assert len(first['items']) == 2 and first['next_offset'] == 2
+    rest = search(client, 'q=report&column=done&limit=2&offset=2')
+    assert len(rest['items']) == 1 and rest['next_offset'] is None
+    assert {task['current_column'] for task in first['items'] + rest['items']} == {'done'}
+
+
+@pytest.mark.parametrize('query', ['', 'q=%20', 'q=x&limit=0', 'q=x&offset=-1', 'q=x&column=nope'])
+def test_bad_search_arguments(client, query):
+    assert client.get(f'/api/tasks/search?{query}').status_code == 400
+
+
+def test_cyrillic_prefix_ignores_case(client, create_task):
+    create_task('Обновление Компонентов')
+    assert len(search(client, 'q=комп')['items']) == 1
@@ -0,0 +1,24 @@
+def test_lists_carry_assignees_in_assignment_order(client, create_user, create_task):
+    alice, bob = create_user('alice'), create_user('bob')
+    task = create_task(assignees=[bob['id'], alice['id']])
+
+    tasks = client.get('/api/tasks').get_json()['items']
+    assert tasks[0]['assignees'] == [bob['id'], alice['id']]
+
+    users = {user['username']: user for user in client.get('/api/users').get_json()['items']}
+    assert users['alice']['tasks_assigned'] == [task['id']]
+    assert users['bob']['tasks_assigned'] == [task['id']]
+
+
+def test_user_list_queries_do_not_grow_with_page_size(client, create_user, create_task, query_count):
+    def list_queries():
+        return query_count(client.get('/api/users?limit=all'))
+
+    user = create_user('alice')
+    create_task(assignees=[user['id']])
+    few = list_queries()
+
+    for i in range(5):
+        user = create_user(f'user{i}')
+        create_task(assignees=[user['id']])
+    assert list_queries() == few
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from src.database import engine
+from src.stats import CYCLE_TIME_BUCKETS, DAY, HOUR, WEEK, _percentiles, load_stats, recompute_stats, week_start
+
+
+def stats(client, query=''):
+    response = client.get(f'/api/stats{query}')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_counts_follow_writes(client, create_user, create_task):
+    alice = create_user('alice')['id']
+    bob = create_user('bob')['id']
+    task = create_task(priority='high', current_column='todo', assignees=[alice, bob])['id']
+    create_task(priority='low', current_column='in_progress', assignees=[alice])
+
+    body = stats(client)
+    assert body['total'] == 2
+    assert (body['columns']['todo'], body['columns']['in_progress']) == (1, 1)
+    assert (body['priorities']['high'], body['priorities']['low']) == (1, 1)
+    assert body['wip'] == {str(alice): 2, str(bob): 1}
+
+    client.put(f'/api/tasks/{task}', json={'current_column': 'done'})
+    body = stats(client)
+    assert body['wip'] == {str(alice): 1}
+    assert body['cycle_time']['completed'] == 1
+
+    client.delete(f'/api/tasks/{task}')
+    body = stats(client)
+    assert body['total'] == 1 and body['columns']['done'] == 0
+    assert body['cycle_time']['completed'] == 0
+
+
+def test_triggers_match_recompute(client, create_user, create_task, db):
+    alice = create_user('alice')['id']
+    now = int(time.time())
+    for i in range(5):
+        task = create_task(f'Task {i}', priority='medium', assignees=[alice])['id']
+        if i % 2:
+            client.put(f'/api/tasks/{task}', json={'current_column': 'done', 'date_completed': now + i * DAY})
+    client.delete(f'/api/users/{alice}')
+
+    incremental = load_stats(db)
+    db.rollback()
+    assert recompute_stats(engine) == 5
+    assert load_stats(db) == incremental
+
+
+def test_throughput_weeks(client, create_task, db):
+    now = int(time.time())
+    create_task(current_column='done', date_completed=now)
+    create_task(current_column='done', date_completed=now - WEEK)
+
+    body = load_stats(db, weeks=3, now=now)
+    assert [week['completed'] for week in body['throughput']] == [0, 1, 1]
+    assert body['throughput'][-1]['week'] == time.strftime('%Y-%m-%d', time.gmtime(week_start(now)))
+
+
+def test_week_start_is_monday():
+    assert time.gmtime(week_start(int(time.time()))).tm_wday == 0
+
+
+def test_percentiles():
+    # Ten tasks in the first bucket (up to an hour), interpolated linearly
+    assert _percentiles({0: 10}) == {'p50': HOUR // 2, 'p75': 3 * HOUR // 4, 'p90': 9 * HOUR // 10, 'p95': 57 * 60}
+    # The open bucket reports its lower bound
+    assert _percentiles({len(CYCLE_TIME_BUCKETS): 1})['p50'] == CYCLE_TIME_BUCKETS[-1]
+    assert _percentiles({}) == dict.fromkeys(['p50', 'p75', 'p90', 'p95'])
+
+
+@pytest.mark.parametrize('weeks', ['0', '105', 'many'])
+def test_bad_weeks(client, weeks):
+    assert client.get(f'/api/stats?weeks={weeks}').status_code == 400
@@ -0,0 +1,89 @@
+import pytest
+
+from src.models import User
+from src.tokens import TOKEN_ACCESS, TOKEN_REFRESH, issue_token
+
+from tests.conftest import PASSWORD
+
+
+@pytest.fixture
+def login(client, create_user):
+    create_user('alice')
+    response = client.post('/api/auth/login', json={'username': 'alice', 'password': PASSWORD})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.fixture
+def expired_token(app, db, login):
+    user = db.query(User).filter(User.username == 'alice').one()
+    token, _ = issue_token(user, TOKEN_ACCESS, app.config['SECRET_KEY'], ttl=-1)
+    return token
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_me_reads_claims(client, login):
+    response = client.get('/api/auth/me', headers=bearer(login['access_token']))
+    assert response.status_code == 200
+    assert response.get_json()['username'] == 'alice'
+
+
+def test_login_and_refresh_ignore_expired_bearer_token(client, login, expired_token):
+    response = client.post('/api/auth/login', json={'username': 'alice', 'password': PASSWORD},
+                           headers=bearer(expired_token))
+    assert response.status_code == 200
+
+    response = client.post('/api/auth/refresh', json={'refresh_token': login['refresh_token']},
+                           headers=bearer(expired_token))
+    assert response.status_code == 200
+
+
+def test_public_endpoints_ignore_garbage_bearer_token(client):
+    assert client.get('/api/tasks', headers=bearer('garbage')).status_code == 200
+
+
+@pytest.mark.parametrize('path, method', [('/api/auth/me', 'get'), ('/api/auth/logout', 'post')])
+def test_protected_endpoints_report_token_error(client, expired_token, path, method):
+    response = getattr(client, method)(path, headers=bearer(expired_token))
+    assert response.status_code == 401
+    assert response.get_json() == {'error': 'Token expired'}
+    assert response.headers['WWW-Authenticate'] == 'Bearer'
+
+    response = getattr(client, method)(path)
+    assert response.get_json() == {'error': 'Authentication required'}
+
+
+def test_refresh_token_is_single_use(client, login):
+    body = {'refresh_token': login['refresh_token']}
+    assert client.post('/api/auth/refresh', json=body).status_code == 200
+
+    response = client.post('/api/auth/refresh', json=body)
+    assert response.status_code == 401
+    assert response.get_json() == {'error': 'Token revoked'}
+
+
+def test_logout_revokes_access_token(client, login):
+    headers = bearer(login['access_token'])
+    assert client.post('/api/auth/logout', headers=headers).status_code == 200
+
+    response = client.get('/api/auth/me', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json() == {'error': 'Token revoked'}
+
+
+def test_wrong_token_type(client, login):
+    response = client.get('/api/auth/me', headers=bearer(login['refresh_token']))
+    assert response.get_json() == {'error': 'Wrong token type'}
+
+    response = client.post('/api/auth/refresh', json={'refresh_token': login['access_token']})
+    assert response.status_code == 401
+
+
+def test_forged_signature(app, db, client, login):
+    user = db.query(User).filter(User.username == 'alice').one()
+    token, _ = issue_token(user, TOKEN_REFRESH, 'not-the-secret', ttl=60)
+    response = client.post('/api/auth/refresh', json={'refresh_token': token})
+    assert response.get_json() == {'error': 'Invalid token signature'}